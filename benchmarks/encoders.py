@@ -0,0 +1,106 @@
+"""Micro-benchmark of the obs encoders against their original one-vector-at-a-time versions.
+
+Run with ``python -m benchmarks.encoders``.
+"""
+
+import argparse
+from timeit import timeit
+
+import numpy as np
+import rlgym.rocket_league.common_values as cv
+from numpy.linalg import norm
+
+from env.encoders import fourier_encoder, planar_angle
+
+
+def legacy_fourier_encoder(low, high, value: float | np.ndarray, frequencies=4, periodic=False):
+    n_range = np.arange(frequencies)
+    if periodic:
+        n_range += 1
+    freqs = np.exp2(n_range)
+
+    value = np.array(value).reshape(-1, 1)
+    trig_params = (value - (low + high) / 2) * freqs * (2 * np.pi / (2 * (high - low)))
+    sin_terms = np.sin(trig_params)
+    cos_terms = np.cos(trig_params)
+    return np.concatenate((sin_terms, cos_terms), axis=-1).squeeze()
+
+
+def legacy_planar_angle(reference: np.ndarray, normal: np.ndarray, target: np.ndarray) -> float:
+    if (x := norm(normal)) == 0:
+        return 0
+    else:
+        n = normal / x
+
+    t_proj = target - np.dot(target, n) * n
+    if (x := norm(t_proj)) == 0:
+        return 0
+    else:
+        t_proj_norm = t_proj / x
+
+    ref_proj = reference - np.dot(reference, n) * n
+    if (x := norm(ref_proj)) == 0:
+        return 0
+    else:
+        ref_proj_norm = ref_proj / x
+
+    angle = np.arccos(np.clip(np.dot(ref_proj_norm, t_proj_norm), -1, 1))
+    sign = np.sign(np.dot(np.cross(ref_proj_norm, t_proj_norm), n))
+    if sign == 0:
+        return angle
+    return angle * sign
+
+
+def _cases(rng: np.random.Generator, n_agents: int):
+    up = np.array([0, 0, 1])
+    vel = rng.normal(scale=1000, size=(n_agents, 3)).astype(np.float32)
+    pos = rng.normal(scale=2000, size=(n_agents, 3)).astype(np.float32)
+    pad_vecs = np.array(cv.BOOST_LOCATIONS) - pos[:, None, :]
+    scalar = np.float32(1234.5)
+
+    # name: (legacy, new) callables doing the same work
+    return {
+        "fourier scalar": (
+            lambda: legacy_fourier_encoder(0, 2 * cv.BACK_WALL_Y, scalar, 2),
+            lambda: fourier_encoder(0, 2 * cv.BACK_WALL_Y, scalar, 2),
+        ),
+        "fourier (3,)": (
+            lambda: legacy_fourier_encoder(-cv.CAR_MAX_SPEED, cv.CAR_MAX_SPEED, vel[0], 4),
+            lambda: fourier_encoder(-cv.CAR_MAX_SPEED, cv.CAR_MAX_SPEED, vel[0], 4),
+        ),
+        f"fourier ({n_agents},3)": (
+            lambda: [legacy_fourier_encoder(-cv.CAR_MAX_SPEED, cv.CAR_MAX_SPEED, v, 4) for v in vel],
+            lambda: fourier_encoder(-cv.CAR_MAX_SPEED, cv.CAR_MAX_SPEED, vel, 4),
+        ),
+        "planar_angle (3,)": (
+            lambda: legacy_planar_angle(vel[0], up, pad_vecs[0, 0]),
+            lambda: planar_angle(vel[0], up, pad_vecs[0, 0]),
+        ),
+        "planar_angle pads (34,3)": (
+            lambda: [legacy_planar_angle(vel[0], up, target) for target in pad_vecs[0]],
+            lambda: planar_angle(vel[0], up, pad_vecs[0]),
+        ),
+        f"planar_angle pads ({n_agents},34,3)": (
+            lambda: [[legacy_planar_angle(v, up, target) for target in targets] for v, targets in zip(vel, pad_vecs)],
+            lambda: planar_angle(vel[:, None, :], up, pad_vecs),
+        ),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=2000, help="calls per case")
+    parser.add_argument("--agents", type=int, default=6, help="stacked agents for the batched cases")
+    args = parser.parse_args()
+
+    cases = _cases(np.random.default_rng(0), args.agents)
+    print(f"{'case':<30} {'legacy/s':>12} {'new/s':>12} {'speedup':>8}")
+    for name, (legacy, new) in cases.items():
+        assert np.allclose(np.asarray(legacy(), dtype=float).ravel(), np.asarray(new(), dtype=float).ravel()), name
+        legacy_rate = args.number / timeit(legacy, number=args.number)
+        new_rate = args.number / timeit(new, number=args.number)
+        print(f"{name:<30} {legacy_rate:>12.0f} {new_rate:>12.0f} {new_rate / legacy_rate:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Benchmark of DenBot's env runner forward pass, as built by the experiment config.
+
+Times forward_exploration of the plain module against the FusedDenBot path and its TorchScript, on real obs at
+the small batch sizes env runners act at. Run with ``python -m benchmarks.inference``.
+"""
+
+import argparse
+import time
+
+import numpy as np
+import torch
+from ray.rllib.core import Columns
+
+from conf.build_config import load_configs, rl_module_spec
+from env.env import RLEnv
+
+
+def build_module(config, env: RLEnv, **model_config):
+    spec = rl_module_spec(config.algorithm.rl_module_spec, config.env_config.envs)
+    spec.model_config = {**spec.model_config, **model_config}
+    spec.observation_space = env.observation_spaces["blue-0"]
+    spec.action_space = env.action_spaces["blue-0"]
+    return spec.build()
+
+
+def microseconds_per_forward(module, batch: dict, iterations: int, repeats: int = 5) -> float:
+    """Best of repeats, this is a small op that scheduling noise easily doubles"""
+    for _ in range(10):
+        module.forward_exploration(batch)
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            module.forward_exploration(batch)
+        best = min(best, (time.perf_counter() - start) / iterations * 1e6)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 6, 64])
+    parser.add_argument("--iterations", type=int, default=300, help="forward passes per timed repeat")
+    parser.add_argument("--threads", type=int, default=1, help="torch threads, env runners usually get one")
+    args = parser.parse_args()
+    torch.set_num_threads(args.threads)
+
+    config = load_configs().exp
+    config.env_config.curriculum["tasks"] = [{"envs": ["ball_hunt"]}]
+    env = RLEnv(config.env_config)
+    obs, _ = env.reset(seed=0)
+    agent_obs = next(iter(obs.values()))
+
+    modules = {"plain": build_module(config, env), "fused": build_module(config, env, fused_inference=True)}
+    modules["script"] = build_module(config, env, script_inference=True)
+    for module in modules.values():
+        module.set_state(modules["plain"].get_state())
+
+    print(f"{'batch':<6} " + " ".join(f"{name + ' us':>10}" for name in modules) + f" {'speedup':>8}")
+    for batch_size in args.batch_sizes:
+        batch = {Columns.OBS: {key: torch.as_tensor(np.stack([value] * batch_size)) for key, value in agent_obs.items()}}
+        times = {name: microseconds_per_forward(module, batch, args.iterations) for name, module in modules.items()}
+        print(f"{batch_size:<6} " + " ".join(f"{t:>10.1f}" for t in times.values()) + f" {times['plain'] / min(times.values()):>7.2f}x")
+    env.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Benchmark of VectorRLEnv's pipelined mode, which runs RocketSim steps on a worker thread.
+
+First checks that arena.step releases the GIL by counting how far the main thread gets while another thread is
+inside a long step, then times serial against pipelined stepping. Only a machine with a spare core will see a
+speedup. Run with ``python -m benchmarks.pipeline``.
+"""
+
+import argparse
+import threading
+import time
+
+import numpy as np
+from rlgym.rocket_league.sim import RocketSimEngine
+
+from conf.build_config import load_configs
+from env.state_mutators.random import Random
+from env.vector_env import VectorRLEnv
+
+
+def gil_probe(ticks: int) -> tuple[float, int]:
+    """Seconds of one long arena.step, and main thread loop iterations while another thread runs it"""
+    sim = RocketSimEngine()
+    state = sim.create_base_state()
+    Random(blue_size=3, orange_size=3).apply(state, sim)
+    sim.set_state(state, {})
+
+    start = time.perf_counter()
+    sim._arena.step(ticks)
+    seconds = time.perf_counter() - start
+
+    done = threading.Event()
+
+    def step():
+        sim._arena.step(ticks)
+        done.set()
+
+    thread = threading.Thread(target=step)
+    iterations = 0
+    thread.start()
+    while not done.is_set():
+        iterations += 1
+    thread.join()
+    sim.close()
+    return seconds, iterations
+
+
+def steps_per_second(config, arenas: int, chunks: int, steps: int) -> float:
+    np.random.seed(0)
+    vector_env = VectorRLEnv(config, arenas, pipeline_chunks=chunks)
+    vector_env.reset(seed=0)
+    action_space = vector_env.action_parser.get_action_space("blue-0")
+    action_space.seed(0)
+    actions = np.array([action_space.sample() for _ in range(arenas * 6)])
+
+    start = time.perf_counter()
+    for _ in range(steps):
+        vector_env.step(actions[: len(vector_env.rows)])
+    seconds = time.perf_counter() - start
+    vector_env.close()
+    return steps / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--arenas", type=int, default=8)
+    parser.add_argument("--chunks", type=int, nargs="+", default=[2, 4], help="pipeline_chunks to compare with serial")
+    parser.add_argument("--steps", type=int, default=200, help="vector env steps per run")
+    parser.add_argument("--ticks", type=int, default=2000, help="ticks of the GIL probe's arena.step")
+    parser.add_argument("--task", default="ball_hunt", help="env every arena plays")
+    args = parser.parse_args()
+
+    seconds, iterations = gil_probe(args.ticks)
+    print(f"arena.step({args.ticks}) took {seconds:.3f}s, main thread ran {iterations} iterations alongside it")
+    print("GIL released" if iterations > 1000 else "GIL held, pipelining can't overlap anything")
+
+    config = load_configs().exp.env_config
+    config.curriculum["tasks"] = [{"envs": [args.task]}]
+    serial = steps_per_second(config, args.arenas, 1, args.steps)
+    print(f"{'pipeline_chunks':<16} {'steps/s':>10} {'speedup':>8}")
+    print(f"{'1 (serial)':<16} {serial:>10.1f} {1:>7.2f}x")
+    for chunks in args.chunks:
+        rate = steps_per_second(config, args.arenas, chunks, args.steps)
+        print(f"{chunks:<16} {rate:>10.1f} {rate / serial:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@ from ray.rllib.algorithms import PPOConfig
 from ray.rllib.core.rl_module import RLModuleSpec
 
 from env import RLEnv
+from env.components import reward_table
 from nn.denbot import DenBot
 from training.callbacks import CurriculumCallback
 
@@ -30,6 +31,13 @@ def multi_callback(callbacks, curriculum_cfg):
     return Callback
 
 
+def rl_module_spec(spec_cfg, envs) -> RLModuleSpec:
+    """DenBot's spec, with the reward table its reward_id obs indexes"""
+    spec = OmegaConf.to_container(spec_cfg)
+    spec["model_config"] = {**spec.get("model_config", {}), "reward_weights": reward_table(envs).tolist()}
+    return RLModuleSpec(module_class=DenBot, **spec)
+
+
 def build_exp_config(config):
     config = instantiate(config)
     algo_cfg = config.algorithm
@@ -40,7 +48,7 @@ def build_exp_config(config):
         .env_runners(**algo_cfg.env_runners)
         .learners(**algo_cfg.learners)
         .multi_agent(policies={"denbot"}, policy_mapping_fn=mapping_fn)
-        .rl_module(rl_module_spec=RLModuleSpec(module_class=DenBot, **OmegaConf.to_container(algo_cfg.rl_module_spec)))
+        .rl_module(rl_module_spec=rl_module_spec(algo_cfg.rl_module_spec, config.env_config.envs))
         .callbacks(callbacks_class=multi_callback(algo_cfg.callbacks, config.env_config.curriculum))
         .evaluation(**algo_cfg.evaluation)
     )
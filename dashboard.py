@@ -1,5 +1,3 @@
-import glob
-import os
 from pathlib import Path
 
 import streamlit as st
@@ -8,24 +6,20 @@ import torch
 from conf.build_config import load_configs
 from env.env import RLEnv
 from load_latest import load_components_from_checkpoint, run_episode
+from training.checkpoint_index import CheckpointIndex
 
 torch.classes.__path__ = []
 
+# Kept across reruns, so the index file is only reread when it changes
+checkpoint_index = st.cache_resource(CheckpointIndex)()
 
-def get_trials() -> list[str]:
-    trial_str = "ray_results/*/*/"
-    all_trials = glob.glob(trial_str, recursive=True)
-    trials = sorted(all_trials, key=os.path.getmtime, reverse=True)
 
-    return trials
+def get_trials() -> list[str]:
+    return [str(trial) for trial in checkpoint_index.trials()]
 
 
 def get_checkpoints(trial_path: str) -> list[str]:
-    checkpoint_str = f"{trial_path}/checkpoint_*/"
-    all_checkpoints = glob.glob(checkpoint_str, recursive=True)
-    checkpoints = sorted(all_checkpoints, key=os.path.getmtime, reverse=True)
-
-    return checkpoints
+    return [str(checkpoint) for checkpoint in checkpoint_index.checkpoints(trial_path)]
 
 
 def play_episode(env_config, checkpoint_path):
@@ -1,5 +1,7 @@
 from .env import RLEnv
+from .vector_env import VectorRLEnv
 
 __all__ = [
     "RLEnv",
+    "VectorRLEnv",
 ]
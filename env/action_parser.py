@@ -1,57 +1,101 @@
+import itertools
+
 import gymnasium as gym
 import numpy as np
 import torch as th
 from rlgym.rocket_league.api import GameState
 
+# Values of each SeerAction head: throttle, steer_yaw, pitch, roll, jump, boost, handbreak
+SEER_OPTIONS = ((-1, 0, 1), (-1, -0.5, 0, 0.5, 1), (-1, -0.5, 0, 0.5, 1), (-1, 0, 1), (0, 1), (0, 1), (0, 1))
+SEER_NVEC = tuple(len(options) for options in SEER_OPTIONS)
+# Row i holds the 8 controls of the action whose flat (C order) index into SEER_NVEC is i, yaw mirrors steer
+SEER_CONTROL_TABLE = np.array([[t, s, p, s, r, j, b, h] for t, s, p, r, j, b, h in itertools.product(*SEER_OPTIONS)], dtype=np.float32)
+# action @ SEER_FLAT_STRIDES is the row of SEER_CONTROL_TABLE, same as np.ravel_multi_index but cheaper for a few agents
+SEER_FLAT_STRIDES = np.cumprod((1, *SEER_NVEC[:0:-1]))[::-1]
+# Shared by every parser, read-only so none can change them for the others
+SEER_CONTROL_TABLE.setflags(write=False)
+SEER_FLAT_STRIDES.setflags(write=False)
+
+
+class RepeatBuffers:
+    """
+    One contiguous (n_agents, repeats, 8) float32 block of engine controls, also handed out as a (repeats, 8)
+    view per agent and an agent -> row index.
+
+    Everything is reused until the agents change and is overwritten by the next fill, so the engine has to consume
+    the controls first (RocketSimEngine.step does).
+    """
+
+    def __init__(self, repeats: int):
+        self.repeats = repeats
+        self.block = np.empty((0, repeats, 8), dtype=np.float32)
+        self.agents: list[str] = []
+        self.index: dict[str, int] = {}
+        self.views: dict[str, np.ndarray] = {}
+
+    def fill(self, agents: list[str], controls: np.ndarray) -> np.ndarray:
+        """Repeat each agent's row of controls, (n_agents, 8), into the block"""
+        if agents != self.agents:
+            self.block = np.empty((len(agents), self.repeats, 8), dtype=np.float32)
+            self.agents = list(agents)
+            self.index = {agent: i for i, agent in enumerate(agents)}
+            self.views = dict(zip(agents, self.block))
+        self.block[:] = controls[:, None, :]
+        return self.block
+
 
 class SeerAction:
-    throttle = roll = [-1, 0, 1]
-    steer_yaw = pitch = [-1, -0.5, 0, 0.5, 1]
-    jump = boost = handbreak = [0, 1]
+    """Discrete actions looked up in a table of every control combination"""
+
+    throttle, steer_yaw, pitch, roll, jump, boost, handbreak = SEER_OPTIONS
+    # throttle(3) steer_yaw(5) pitch(5) roll(3) jump(2) boost(2) handbreak(2)
+    nvec = SEER_NVEC
+    control_table = SEER_CONTROL_TABLE
+    flat_strides = SEER_FLAT_STRIDES
 
     def __init__(self, repeats: int = 8):
         self.repeats = repeats
+        self._buffers = RepeatBuffers(repeats)
 
     def get_action_space(self, agent: str) -> gym.Space:
-        return gym.spaces.MultiDiscrete([3, 5, 5, 3, 2, 2, 2])
+        return gym.spaces.MultiDiscrete(self.nvec)
 
     def parse_actions(self, actions: dict[str, th.Tensor], state: GameState) -> dict[str, np.ndarray]:
-        parsed_actions = {}
-        for agent, action in actions.items():
-            parsed_actions[agent] = (
-                np.array(
-                    [
-                        self.throttle[action[0]],
-                        self.steer_yaw[action[1]],
-                        self.pitch[action[2]],
-                        self.steer_yaw[action[1]],
-                        self.roll[action[3]],
-                        self.jump[action[4]],
-                        self.boost[action[5]],
-                        self.handbreak[action[6]],
-                    ]
-                )
-                .reshape(1, -1)
-                .repeat(8, axis=0)
-            )
-
-        return parsed_actions
+        if not actions:
+            return {}
+        self.parse_batch(list(actions), np.array(list(actions.values())))
+        return self._buffers.views
+
+    def parse_batch(self, agents: list[str], actions: np.ndarray) -> tuple[np.ndarray, dict[str, int]]:
+        """Controls for stacked (n_agents, 7) int actions as one (n_agents, repeats, 8) float32 block, and each agent's row"""
+        block = self._buffers.fill(agents, self.control_table[actions @ self.flat_strides])
+        return block, self._buffers.index
 
 
 class SeerContinuousAction:
+    """Continuous version of SeerAction, parsed into the same reused (repeats, 8) buffers"""
+
     def __init__(self, repeats: int = 8):
         self.repeats = repeats
+        self._buffers = RepeatBuffers(repeats)
 
     def get_action_space(self, agent: str) -> gym.Space:
         return gym.spaces.Box(-1, 1, shape=(7,))
 
     def parse_actions(self, actions: dict[str, np.ndarray], state: GameState) -> dict[str, np.ndarray]:
-        parsed_actions = {}
-        for agent, action in actions.items():
-            # Apply the steer action to yaw as well
-            action = np.insert(action, 3, action[1])
-            # Convert floats to bools for jump boost and handbreak
-            action[-3:] = action[-3:] > 0
-            parsed_actions[agent] = action.reshape(1, -1).repeat(8, axis=0)
-
-        return parsed_actions
+        if not actions:
+            return {}
+        self.parse_batch(list(actions), np.array(list(actions.values())))
+        return self._buffers.views
+
+    def parse_batch(self, agents: list[str], actions: np.ndarray) -> tuple[np.ndarray, dict[str, int]]:
+        """Controls for stacked (n_agents, 7) actions as one (n_agents, repeats, 8) float32 block, and each agent's row"""
+        controls = np.empty((len(actions), 8), dtype=np.float32)
+        controls[:, :3] = actions[:, :3]
+        # Apply the steer action to yaw as well
+        controls[:, 3] = actions[:, 1]
+        controls[:, 4:] = actions[:, 3:]
+        # Convert floats to bools for jump boost and handbreak
+        controls[:, -3:] = controls[:, -3:] > 0
+        block = self._buffers.fill(agents, controls)
+        return block, self._buffers.index
@@ -0,0 +1,81 @@
+import numpy as np
+from omegaconf import DictConfig, ListConfig, OmegaConf
+
+from env.denbot_reward import DenBotReward
+from env.terminal_condition import ConditionTree
+
+
+def plain_config(config):
+    """Hydra's DictConfig and ListConfig as plain dicts and lists, which are much faster to read"""
+    if isinstance(config, DictConfig | ListConfig):
+        return OmegaConf.to_container(config)
+    return config
+
+
+class EnvComponents:
+    """
+    The state mutator, reward and terminal conditions of one env, built once from its config.
+
+    Every episode in the env reuses them, so each is reset at the start of an episode and nothing carries over.
+    reward_id is the env's row of reward_table, which is all the agents see of its reward weights.
+    """
+
+    def __init__(self, name: str, env_config: dict, log_reward_terms: bool = False, reward_id: int = 0):
+        self.name = name
+        self.reward_id = reward_id
+        self.state_mutator = env_config["state_mutator"]
+        self.reward_fn = DenBotReward(**env_config["rewards"], log_terms=log_reward_terms)
+        self.termination_cond = ConditionTree(env_config["termination_cond"])
+        self.truncation_cond = ConditionTree(env_config["truncation_cond"])
+
+
+def reward_table(envs: dict) -> np.ndarray:
+    """(num_envs, 19) reward weights of every env in config order, the rows reward_id indexes"""
+    return np.stack([DenBotReward(**env_config["rewards"]).reward_weights for env_config in plain_config(envs).values()])
+
+
+def env_weights(envs: list[str] | dict[str, float]) -> dict[str, float]:
+    """A curriculum task's envs as {env: weight}, from an explicit mapping or a list where repeats add weight"""
+    if isinstance(envs, dict):
+        return {name: float(weight) for name, weight in envs.items()}
+    return {name: float(envs.count(name)) for name in dict.fromkeys(envs)}
+
+
+class EnvSampler:
+    """
+    Weighted pick of a curriculum task's next env in O(1), with Vose's alias method.
+
+    Every env gets an equal slot holding its own probability and an alias to top the slot up, so a draw is one
+    random number: which slot, and whether it lands in the env or in its alias. reweight rebuilds the table.
+    """
+
+    def __init__(self, weights: dict[str, float]):
+        self.reweight(weights)
+
+    def reweight(self, weights: dict[str, float]) -> None:
+        names = list(weights)
+        scaled = np.array([weights[name] for name in names], dtype=np.float64)
+        if not len(names) or np.any(scaled < 0) or scaled.sum() <= 0:
+            raise ValueError(f"Env weights must be non-negative with a positive sum, got {weights}")
+        scaled *= len(names) / scaled.sum()
+
+        prob = np.ones(len(names))
+        alias = np.arange(len(names))
+        small = [i for i, p in enumerate(scaled) if p < 1]
+        large = [i for i, p in enumerate(scaled) if p >= 1]
+        while small and large:
+            short, tall = small.pop(), large.pop()
+            prob[short] = scaled[short]
+            alias[short] = tall
+            scaled[tall] -= 1 - scaled[short]
+            (small if scaled[tall] < 1 else large).append(tall)
+
+        self.weights = dict(weights)
+        self.names = names
+        self._prob = prob.tolist()
+        self._alias = alias.tolist()
+
+    def pick(self) -> str:
+        slot = np.random.random() * len(self.names)
+        i = int(slot)
+        return self.names[i] if slot - i < self._prob[i] else self.names[self._alias[i]]
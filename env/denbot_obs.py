@@ -4,38 +4,164 @@ import rlgym.rocket_league.common_values as cv
 from numpy.linalg import norm
 from rlgym.rocket_league.api import Car, GameState, PhysicsObject
 
-from env.encoders import binary_encoder, encode_position, fourier_encoder, planar_angle
+from env.encoders import binary_encoder, encode_position, fourier_encoder, planar_angle, row_norm
+from env.geometry import BOOST_LOCATIONS, GOAL_POSTS
+from env.step_cache import StepCache
+
+UP = np.array([0, 0, 1])
+
+# throttle(3) steer_yaw(5) pitch(5) roll(3) jump(2) boost(2) handbrake(2)
+AIR_MASK = np.array([0, 0, 1] + [1] * 5 + [1] * 5 + [1] * 3 + [1, 1] + [1, 1] + [0, 1])
+GROUND_MASK = np.array([1] * 3 + [1] * 5 + [0, 0, 1, 0, 0] + [0, 1, 0] + [1, 1] + [1, 1] + [1, 1])
+JUMP_IDX = 17
+BOOST_IDX = 19
+MASK_SIZE = 22
+
+
+def compact_blocks(blocks: dict[str, np.ndarray]) -> dict[str, np.ndarray]:
+    """Full (n, ...) obs blocks in the compact layout, float16 features and the mask packed 8 actions per byte"""
+    compact = {}
+    for key, block in blocks.items():
+        if key == "mask":
+            compact[key] = np.packbits(block != 0, axis=-1)
+        elif block.dtype.kind == "f":
+            compact[key] = block.astype(np.float16)
+        else:
+            compact[key] = block
+    return compact
 
 
 class DenbotObs:
     """
     The default observation builder.
+
+    With buffered=True the builder owns one block per obs key, laid out and typed like get_obs_space, and
+    refills it in place every step. The returned arrays are then views into those blocks and get overwritten by
+    the next build_obs, unless copy=True is set for callers that keep per-step history.
+
+    The env's reward weights are constant over an episode, so the obs only carries reward_id, the env's row of
+    the reward table (env.components.reward_table) the policy encodes, instead of 19 floats every step.
+
+    With compact=True the float blocks are sent as float16 and the action mask is bit-packed into 3 bytes. Nearly
+    every feature is a sin/cos/Fourier encoding, a flag or normalized to [-1, 1], where float16 is off by under 1e-3.
+    The raw scalars, the demo respawn timer and air time in seconds, lose about as much relative to their size.
+    denbot_test checks what that does to the logits on real game states. That is less than half the bytes per agent-step in
+    rollouts and train batches. DenBot unpacks both at the start of its forward pass.
     """
 
-    def __init__(self):
-        pass
+    def __init__(self, num_reward_sets: int = 1, buffered: bool = False, copy: bool = False, compact: bool = False):
+        self.num_reward_sets = num_reward_sets
+        self.compact = compact
+        self.buffered = buffered
+        self.copy = copy
+        self._buffers: dict[str, np.ndarray] = {}
+        self._buffer_agents: list[str] = []
+        self._buffer_obs: dict[str, dict[str, np.ndarray]] = {}
 
     def reset(self, info: dict):
-        self.reward_weights = info["reward_weights"]  # 19
+        self.reward_id = np.int64(info["reward_id"])
+        if self._buffers:
+            self._buffers["reward_id"][:] = self.reward_id
+            # Agents' reward_id entries are scalars, not views into the block
+            for agent_obs in self._buffer_obs.values():
+                agent_obs["reward_id"] = self.reward_id
 
     def get_obs_space(self, agent: str) -> gym.Space:
+        if self.compact:
+            return gym.spaces.Dict(
+                {
+                    "reward_id": gym.spaces.Discrete(self.num_reward_sets),
+                    "pads": gym.spaces.Box(-100, 100, shape=(34,), dtype=np.float16),
+                    "ball": gym.spaces.Box(-100, 100, shape=(61 + 16,), dtype=np.float16),
+                    "agent": gym.spaces.Box(-100, 100, shape=(16 + 72 + 52 + 102,), dtype=np.float16),
+                    "mask": gym.spaces.Box(0, 255, shape=((MASK_SIZE + 7) // 8,), dtype=np.uint8),
+                }
+            )
+        return self._full_obs_space()
+
+    def _full_obs_space(self) -> gym.spaces.Dict:
         return gym.spaces.Dict(
             {
-                "rewards": gym.spaces.Box(-100, 100, shape=(19,)),
+                "reward_id": gym.spaces.Discrete(self.num_reward_sets),
                 "pads": gym.spaces.Box(-100, 100, shape=(34,)),
                 "ball": gym.spaces.Box(-100, 100, shape=(61 + 16,)),
                 "agent": gym.spaces.Box(-100, 100, shape=(16 + 72 + 52 + 102,)),
-                "mask": gym.spaces.MultiBinary(n=22),
+                "mask": gym.spaces.MultiBinary(n=MASK_SIZE),
             }
         )
 
-    def build_obs(self, agents: list[str], state: GameState) -> dict[str, np.ndarray]:
-        obs = {}
-        for agent in agents:
-            obs[agent] = self._build_agent_obs(agent, state)
+    def build_obs(self, agents: list[str], state: GameState, cache: StepCache | None = None) -> dict[str, np.ndarray]:
+        if not agents:
+            return {}
+        if cache is None:
+            cache = StepCache(agents, state)
+        if self.buffered:
+            return self._build_buffered_obs(agents, cache)
 
+        n = len(agents)
+        batch = {
+            "pads": np.empty((n, 34), dtype=np.float32),
+            "ball": np.empty((n, 61 + 16), dtype=np.float32),
+            "agent": np.empty((n, 16 + 72 + 52 + 102), dtype=np.float32),
+            "mask": np.empty((n, MASK_SIZE), dtype=int),
+        }
+        self._build_batch_obs(cache, batch)
+        if self.compact:
+            batch = compact_blocks(batch)
+        obs = {}
+        for i, agent in enumerate(agents):
+            obs[agent] = {
+                "reward_id": self.reward_id,
+                "pads": batch["pads"][i],
+                "ball": batch["ball"][i],
+                "agent": batch["agent"][i],
+                "mask": batch["mask"][i],
+            }
         return obs
 
+    def _build_buffered_obs(self, agents: list[str], cache: StepCache) -> dict[str, dict[str, np.ndarray]]:
+        if agents != self._buffer_agents:
+            self._allocate_buffers(agents)
+        self._build_batch_obs(cache, self._buffers)
+        if self.compact:
+            # Packing already makes new blocks
+            blocks = compact_blocks(self._buffers)
+        elif not self.copy:
+            return self._buffer_obs
+        else:
+            blocks = {key: block.copy() for key, block in self._buffers.items()}
+        return {agent: {key: block[i] for key, block in blocks.items()} for i, agent in enumerate(agents)}
+
+    def obs_blocks(self, n: int) -> dict[str, np.ndarray]:
+        """Zeroed (n, ...) blocks for n agents' full obs, shaped and typed like get_obs_space without compact"""
+        space = self._full_obs_space()
+        return {key: np.zeros((n, *subspace.shape), dtype=subspace.dtype) for key, subspace in space.items()}
+
+    def _allocate_buffers(self, agents: list[str]) -> None:
+        self._buffers = self.obs_blocks(len(agents))
+        self._buffers["reward_id"][:] = self.reward_id
+        self._buffer_agents = list(agents)
+        self._buffer_obs = {agent: {key: block[i] for key, block in self._buffers.items()} for i, agent in enumerate(agents)}
+
+    def _build_batch_obs(self, cache: StepCache, out: dict[str, np.ndarray]) -> None:
+        """Fill every agent's pads/ball/agent/mask rows of out at once.
+
+        Matches _build_agent_obs byte for byte; the per-agent path is kept as the reference implementation.
+        """
+        np.divide(cache.pad_timers, 10, out=out["pads"])  # _pad_timers
+
+        ball = out["ball"]
+        self._batch_ball_obs(cache.ball_pos, cache.ball_vel, cache.ball_speed, ball[:, :61])
+        self._batch_relative_ball_obs(cache.ball_pos, cache.ball_vel, ball[:, 61:])
+
+        agent = out["agent"]
+        self._batch_car_obs(cache.cars, agent[:, :16])
+        self._batch_car_physics_obs(cache.car_pos, cache.car_vel, cache.car_speed, cache.car_ang_vel, cache.car_quat, agent[:, 16:88])
+        self._batch_relative_physics_obs(cache, agent[:, 88:140])
+        self._batch_relative_pads(cache.car_pos, cache.car_vel, agent[:, 140:])
+
+        self._batch_mask(cache.cars, out["mask"])
+
     def _build_agent_obs(self, agent: str, state: GameState) -> dict[str, np.ndarray]:
         car = state.cars[agent]
         if car.team_num == cv.ORANGE_TEAM:
@@ -48,7 +174,7 @@ class DenbotObs:
             car_phys = car.physics
 
         obs = {
-            "rewards": self.reward_weights,
+            "reward_id": self.reward_id,
             "pads": self._pad_timers(pads),
             "ball": np.concatenate(
                 (
@@ -132,15 +258,7 @@ class DenbotObs:
 
     def _relative_ball_obs(self, ball: PhysicsObject) -> np.ndarray:
         """Relative values for the ball"""
-        posts = np.array(
-            [
-                [-cv.GOAL_CENTER_TO_POST, cv.BACK_WALL_Y, 0],
-                [cv.GOAL_CENTER_TO_POST, cv.BACK_WALL_Y, 0],
-                [-cv.GOAL_CENTER_TO_POST, -cv.BACK_WALL_Y, 0],
-                [cv.GOAL_CENTER_TO_POST, -cv.BACK_WALL_Y, 0],
-            ]
-        )
-        ball2posts = posts - ball.position
+        ball2posts = GOAL_POSTS - ball.position
         post_angles = []
         for target in ball2posts:
             post_angles.append(planar_angle(ball.linear_velocity, np.array([0, 0, 1]), target=target))
@@ -149,7 +267,7 @@ class DenbotObs:
 
     def _relative_pads(self, physics: PhysicsObject) -> np.ndarray:
         """idk about this..."""
-        pad_vecs = np.array(cv.BOOST_LOCATIONS) - physics.position
+        pad_vecs = BOOST_LOCATIONS - physics.position
         offsets = []
         for target in pad_vecs:
             offsets.append(planar_angle(physics.linear_velocity, np.array([0, 0, 1]), target))
@@ -157,6 +275,92 @@ class DenbotObs:
         distances = norm(pad_vecs, axis=-1) / (2 * cv.BACK_WALL_Y)  # 34
         return np.concatenate((offsets, distances))  # 102
 
+    def _batch_ball_obs(self, pos: np.ndarray, vel: np.ndarray, speed: np.ndarray, out: np.ndarray) -> None:
+        n = len(pos)
+        encode_position(pos, frequencies=6, out=out[:, :36].reshape(n, 3, 12))  # 36
+        fourier_encoder(-cv.BALL_MAX_SPEED, cv.BALL_MAX_SPEED, vel, frequencies=4, out=out[:, 36:60].reshape(n, 3, 8))  # 24
+        out[:, 60] = speed.astype(np.float64) / cv.BALL_MAX_SPEED  # 1
+
+    def _batch_car_obs(self, cars: list[Car], out: np.ndarray) -> None:
+        out[:, :5] = binary_encoder(0, 100, np.array([car.boost_amount for car in cars], dtype=np.float64), num_bins=5)  # 5
+        out[:, 5:] = np.array(
+            [
+                [
+                    car.demo_respawn_timer,
+                    car.air_time_since_jump,
+                    int(car.on_ground),
+                    int(car.is_supersonic),
+                    car.handbrake,
+                    car.has_jumped,
+                    car.is_jumping,
+                    car.has_flipped,
+                    car.is_flipping,
+                    car.has_double_jumped,
+                    car.can_flip,
+                ]
+                for car in cars
+            ],
+            dtype=np.float64,
+        )  # 11
+
+    def _batch_car_physics_obs(
+        self, pos: np.ndarray, vel: np.ndarray, speed: np.ndarray, ang_vel: np.ndarray, quat: np.ndarray, out: np.ndarray
+    ) -> None:
+        n = len(pos)
+        encode_position(pos, frequencies=6, out=out[:, :36].reshape(n, 3, 12))  # 36
+        fourier_encoder(-cv.CAR_MAX_SPEED, cv.CAR_MAX_SPEED, vel, frequencies=4, out=out[:, 36:60].reshape(n, 3, 8))  # 24
+        out[:, 60] = speed.astype(np.float64) / cv.CAR_MAX_SPEED  # 1
+        out[:, 61:65] = quat  # 4
+        # The angular speed is taken over the float64 features, so they can't round-trip through out
+        ang_vel_enc = fourier_encoder(-cv.CAR_MAX_ANG_VEL, cv.CAR_MAX_ANG_VEL, ang_vel, frequencies=1).reshape(n, -1)
+        out[:, 65:71] = ang_vel_enc  # 6
+        out[:, 71] = row_norm(ang_vel_enc) / cv.CAR_MAX_ANG_VEL  # 1
+
+    def _batch_relative_physics_obs(self, cache: StepCache, out: np.ndarray) -> None:
+        n = len(cache.agents)
+        vel = cache.car_vel
+        rot = cache.car_rot
+        ball_vec = cache.ball_vec
+        forward = rot[:, :, 0]
+        left = rot[:, :, 1] * -1
+        up = rot[:, :, 2]
+
+        angles = np.stack(
+            (
+                planar_angle(reference=forward, normal=up, target=ball_vec),
+                planar_angle(reference=forward, normal=left, target=ball_vec),
+                planar_angle(reference=vel, normal=UP, target=ball_vec),
+                planar_angle(reference=vel, normal=np.cross(vel, UP), target=ball_vec),
+            ),
+            axis=-1,
+        )
+        fourier_encoder(-np.pi, np.pi, angles, frequencies=3, periodic=True, out=out[:, :24].reshape(n, 4, 6))  # 4*2*3=24
+        fourier_encoder(0, 2 * cv.BACK_WALL_Y, ball_vec, frequencies=4, periodic=False, out=out[:, 24:48].reshape(n, 3, 8))  # 24
+        distance = cache.ball_dist.astype(np.float64)
+        fourier_encoder(0, 2 * cv.BACK_WALL_Y, distance, frequencies=2, periodic=False, out=out[:, 48:52])  # 4
+
+    def _batch_relative_ball_obs(self, pos: np.ndarray, vel: np.ndarray, out: np.ndarray) -> None:
+        n = len(pos)
+        ball2posts = GOAL_POSTS - pos[:, None, :]
+        post_angles = planar_angle(vel[:, None, :], UP, target=ball2posts)
+        fourier_encoder(-np.pi, np.pi, post_angles, frequencies=2, periodic=True, out=out.reshape(n, 4, 4))  # 16
+
+    def _batch_relative_pads(self, pos: np.ndarray, vel: np.ndarray, out: np.ndarray) -> None:
+        n = len(pos)
+        pad_vecs = BOOST_LOCATIONS - pos[:, None, :]
+        offsets = planar_angle(vel[:, None, :], UP, pad_vecs)
+        fourier_encoder(-np.pi, np.pi, offsets, frequencies=1, periodic=True, out=out[:, :68].reshape(n, 34, 2))  # 34 * 2
+        np.divide(norm(pad_vecs, axis=-1), 2 * cv.BACK_WALL_Y, out=out[:, 68:], casting="same_kind")  # 34
+
+    def _batch_mask(self, cars: list[Car], out: np.ndarray) -> None:
+        on_ground = np.array([car.on_ground for car in cars])
+        has_flip = np.array([car.has_flip for car in cars])
+        boost = np.array([car.boost_amount for car in cars])
+
+        out[:] = np.where(on_ground[:, None], GROUND_MASK, AIR_MASK)
+        out[~(on_ground | has_flip), JUMP_IDX] = 0
+        out[~(boost > 0), BOOST_IDX] = 0
+
     def _get_mask(self, car: Car):
         if not car.on_ground:
             throttle_mask = np.array([0, 0, 1])
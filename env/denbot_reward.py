@@ -4,12 +4,62 @@ import numpy as np
 import rlgym.rocket_league.common_values as cv
 from rlgym.rocket_league.api import Car, GameState, PhysicsObject
 
-BOOST_LOCATIONS = np.array(cv.BOOST_LOCATIONS)
-BOOST_PAD_AMOUNTS = 12 * np.ones(BOOST_LOCATIONS.shape[0])
-BOOST_PAD_AMOUNTS[[3, 4, 15, 18, 29, 30]] = 100
+from env.encoders import row_dot, row_norm
+from env.geometry import BOOST_PAD_AMOUNTS, ORANGE_BACK_NET, ORANGE_GOAL_BACK, pad_distances
+from env.step_cache import StepCache
+
+PAD_PROXIMITY_WEIGHTS = np.sqrt(BOOST_PAD_AMOUNTS / 100)
+
+# Order of reward_weights, which is also the column order of the reward table the policy encodes
+REWARD_TERMS = (
+    "goal_scored",
+    "boost_collect",
+    "full_boost",
+    "ball_touch",
+    "demo",
+    "distance_player_ball",
+    "offensive_angle",
+    "distance_ball_goal",
+    "facing_ball",
+    "align_ball_goal",
+    "closest_to_ball",
+    "touched_last",
+    "behind_ball",
+    "velocity_player_to_ball",
+    "velocity_ball_goal",
+    "velocity",
+    "boost_amount",
+    "boost_proximity",
+    "forward_velocity",
+)
+# Terms apply actually sums, in the same order
+APPLIED_TERMS = (
+    "goal_scored",
+    "boost_collect",
+    "full_boost",
+    "ball_touch",
+    "distance_player_ball",
+    "offensive_angle",
+    "facing_ball",
+    "velocity_player_to_ball",
+    "velocity_ball_goal",
+    "velocity",
+    "boost_amount",
+    "boost_proximity",
+)
 
 
 class DenBotReward:
+    """
+    Weighted sum of the reward terms, one weight per term.
+
+    Only the terms with a non-zero weight are picked at construction. apply_batch computes them for every agent
+    at once and returns the weighted per-term breakdown next to the total; apply is the per-agent reference.
+
+    With log_terms=True the breakdown is also summed over the episode into episode_term_sums, (len(self.terms),),
+    summed over agents. Otherwise episode_term_sums is None and apply_batch skips the sum.
+    """
+
     def __init__(
         self,
         goal_scored: float = 0,
@@ -31,6 +81,7 @@ class DenBotReward:
         boost_amount: float = 0,
         boost_proximity: float = 0,
         forward_velocity: float = 0,
+        log_terms: bool = False,
     ) -> None:
         self.goal_scored = goal_scored
         self.boost_collect = boost_collect
@@ -79,9 +130,18 @@ class DenBotReward:
             dtype=np.float32,
         )
 
+        self.terms = tuple(term for term in APPLIED_TERMS if getattr(self, term) != 0)
+        self.term_weights = np.array([getattr(self, term) for term in self.terms], dtype=np.float64)
+        self._batch_terms = tuple(getattr(self, f"_batch_{term}") for term in self.terms)
+
+        self.episode_term_sums: np.ndarray | None = None
+        if log_terms:
+            self.episode_term_sums = np.zeros(len(self.terms))
+
     def reset(self, info: dict):
         self._agent_boosts = defaultdict(float)
-        info["reward_weights"] = self.reward_weights
+        if self.episode_term_sums is not None:
+            self.episode_term_sums[:] = 0
 
     def apply(self, agent: str, state: GameState) -> float:
         car = state.cars[agent]
@@ -112,6 +172,24 @@ class DenBotReward:
         self._agent_boosts[agent] = car.boost_amount
         return reward
 
+    def apply_batch(self, agents: list[str], state: GameState, cache: StepCache | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """Rewards for all agents, (n,), and their weighted per-term breakdown, (n, len(self.terms))"""
+        if cache is None:
+            cache = StepCache(agents, state)
+        cache.prev_boost = np.array([self._agent_boosts[agent] for agent in agents], dtype=np.float64)
+        breakdown = np.empty((len(agents), len(self.terms)))
+        rewards = np.zeros(len(agents))
+        for i, (term_fn, weight) in enumerate(zip(self._batch_terms, self.term_weights)):
+            # Weight in float64 like the float32 scalars of apply get promoted
+            np.multiply(term_fn(cache), weight, out=breakdown[:, i], dtype=np.float64)
+            rewards += breakdown[:, i]
+
+        for agent, boost in zip(agents, cache.boost):
+            self._agent_boosts[agent] = boost
+        if self.episode_term_sums is not None:
+            self.episode_term_sums += breakdown.sum(axis=0)
+        return rewards, breakdown
+
     def _goal_scored(self, agent: str, car: Car, car_physics: PhysicsObject, ball: PhysicsObject, state: GameState) -> float:
         if not state.goal_scored:
             return 0
@@ -133,14 +211,13 @@ class DenBotReward:
         return np.exp2(-agent_dist / cv.CAR_MAX_SPEED)
 
     def _offensive_angle(self, agent: str, car: Car, car_physics: PhysicsObject, ball: PhysicsObject, state: GameState) -> float:
-        goal_vec = ball.position[:2] - cv.ORANGE_GOAL_BACK[:2]
+        goal_vec = ball.position[:2] - ORANGE_GOAL_BACK[:2]
         car_vec = car_physics.position[:2] - ball.position[:2]
         foo = np.dot(car_vec / np.linalg.norm(car_vec), goal_vec / np.linalg.norm(goal_vec))
         return foo
 
     def _distance_ball_goal(self, agent: str, car: Car, car_physics: PhysicsObject, ball: PhysicsObject, state: GameState) -> float:
-        back_net = np.array([0, cv.BACK_NET_Y, cv.GOAL_HEIGHT / 2])
-        ball_goal_distance = np.linalg.norm(back_net - ball.position)
+        ball_goal_distance = np.linalg.norm(ORANGE_BACK_NET - ball.position)
         return np.exp(ball_goal_distance / cv.BALL_MAX_SPEED)
 
     def _ball_touch(self, agent: str, car: Car, car_physics: PhysicsObject, ball: PhysicsObject, state: GameState) -> float:
@@ -167,7 +244,7 @@ class DenBotReward:
             return 0
 
         vel_u = ball.linear_velocity / norm
-        goal_vec = cv.ORANGE_GOAL_BACK - ball.position
+        goal_vec = ORANGE_GOAL_BACK - ball.position
         goal_vec_u = goal_vec / np.linalg.norm(goal_vec)
         return np.dot(goal_vec_u, vel_u)
 
@@ -180,7 +257,110 @@ class DenBotReward:
 
     def _boost_proximity(self, agent: str, car: Car, car_physics: PhysicsObject, ball: PhysicsObject, state: GameState) -> float:
         timer_mask = state.boost_pad_timers == 0
-        distances = np.linalg.norm(BOOST_LOCATIONS[:, :2] - car_physics.position[:2], axis=1)
-        rewards = timer_mask * np.sqrt(BOOST_PAD_AMOUNTS / 100) * np.exp(-0.002 * distances)
+        distances = pad_distances(car_physics.position, xy=True)
+        rewards = timer_mask * PAD_PROXIMITY_WEIGHTS * np.exp(-0.002 * distances)
 
         return np.sum(rewards)
+
+    # Batched terms: same maths as the per-agent versions above, over StepCache rows. They only read the cache, so
+    # apply_arena_rewards can call them through any DenBotReward.
+    # Float32 physics is cast to float64 wherever the scalar code would have promoted it mid-term.
+
+    def _batch_goal_scored(self, cache: StepCache) -> np.ndarray:
+        if not cache.goal_scored.any():
+            return np.zeros(len(cache.agents))
+        ball_speed_bonus = cache.ball_speed.astype(np.float64) / cv.BALL_MAX_SPEED
+        scored = np.where(cache.team == cache.scoring_team, 1.0 + ball_speed_bonus, -1.0)
+        return np.where(cache.goal_scored, scored, 0.0)
+
+    def _batch_boost_collect(self, cache: StepCache) -> np.ndarray:
+        gained = np.sqrt(cache.boost / 100) - np.sqrt(cache.prev_boost / 100)
+        return np.where(cache.boost > cache.prev_boost, gained, 0.0)
+
+    def _batch_full_boost(self, cache: StepCache) -> np.ndarray:
+        return (cache.boost >= 100).astype(np.float64)
+
+    def _batch_ball_touch(self, cache: StepCache) -> np.ndarray:
+        return (cache.ball_touches > 0).astype(np.float64)
+
+    def _batch_distance_player_ball(self, cache: StepCache) -> np.ndarray:
+        agent_dist = cache.ball_dist.astype(np.float64) - cv.BALL_RADIUS
+        return np.exp2(-agent_dist / cv.CAR_MAX_SPEED)
+
+    def _batch_offensive_angle(self, cache: StepCache) -> np.ndarray:
+        goal_vec = cache.ball_pos[:, :2] - ORANGE_GOAL_BACK[:2]
+        car_vec = cache.car_pos[:, :2] - cache.ball_pos[:, :2]
+        return row_dot(car_vec / row_norm(car_vec)[:, None], goal_vec / row_norm(goal_vec)[:, None])
+
+    def _batch_facing_ball(self, cache: StepCache) -> np.ndarray:
+        return row_dot(cache.car_forward, cache.ball_vec_u)
+
+    def _batch_velocity_player_to_ball(self, cache: StepCache) -> np.ndarray:
+        norm = cache.car_speed
+        vel_u = cache.car_vel / (norm + (norm == 0))[:, None]
+        return np.where(norm == 0, 0.0, row_dot(cache.ball_vec_u, vel_u))
+
+    def _batch_velocity_ball_goal(self, cache: StepCache) -> np.ndarray:
+        norm = cache.ball_speed
+        vel_u = cache.ball_vel / (norm + (norm == 0))[:, None]
+        goal_vec = ORANGE_GOAL_BACK - cache.ball_pos
+        goal_vec_u = goal_vec / row_norm(goal_vec)[:, None]
+        return np.where(norm == 0, 0.0, row_dot(goal_vec_u, vel_u))
+
+    def _batch_velocity(self, cache: StepCache) -> np.ndarray:
+        return cache.car_speed.astype(np.float64) / cv.CAR_MAX_SPEED
+
+    def _batch_boost_amount(self, cache: StepCache) -> np.ndarray:
+        return np.sqrt(cache.boost / 100)
+
+    def _batch_boost_proximity(self, cache: StepCache) -> np.ndarray:
+        timer_mask = cache.blue_pad_timers == 0
+        distances = pad_distances(cache.car_pos, xy=True)
+        rewards = timer_mask * PAD_PROXIMITY_WEIGHTS * np.exp(-0.002 * distances)
+        return np.sum(rewards, axis=-1)
+
+
+def apply_arena_rewards(
+    reward_fns: list[DenBotReward | None], cache: StepCache, rows: list[slice]
+) -> tuple[np.ndarray, list[np.ndarray | None]]:
+    """
+    Rewards for the agents of several arenas stacked in one StepCache, each arena with its own DenBotReward.
+
+    Every term any arena uses is computed once over all rows and weighted per row, which sums to the same thing
+    as each arena's apply_batch. Arenas without a reward_fn (e.g. ones that were just reset) get 0 and keep no
+    history. Returns the (n,) rewards and each arena's weighted breakdown, (n_arena_agents, len(reward_fn.terms)).
+    """
+    term_fns = {}
+    for reward_fn in reward_fns:
+        if reward_fn is not None:
+            term_fns.update(zip(reward_fn.terms, reward_fn._batch_terms))
+    terms = [term for term in APPLIED_TERMS if term in term_fns]
+
+    n = len(cache.agents)
+    weights = np.zeros((n, len(terms)))
+    prev_boost = np.zeros(n)
+    for reward_fn, row in zip(reward_fns, rows):
+        if reward_fn is not None:
+            weights[row] = [getattr(reward_fn, term) for term in terms]
+            prev_boost[row] = [reward_fn._agent_boosts[agent] for agent in cache.agents[row]]
+    cache.prev_boost = prev_boost
+
+    contributions = np.zeros((n, len(terms)))
+    rewards = np.zeros(n)
+    for i, term in enumerate(terms):
+        # Rows that don't use the term stay at 0 even if it's nan for them, like apply_batch skipping it
+        np.multiply(term_fns[term](cache), weights[:, i], out=contributions[:, i], where=weights[:, i] != 0, dtype=np.float64)
+        rewards += contributions[:, i]
+
+    breakdowns = []
+    for reward_fn, row in zip(reward_fns, rows):
+        if reward_fn is None:
+            breakdowns.append(None)
+            continue
+        breakdown = contributions[row][:, [terms.index(term) for term in reward_fn.terms]]
+        if reward_fn.episode_term_sums is not None:
+            reward_fn.episode_term_sums += breakdown.sum(axis=0)
+        for agent, boost in zip(cache.agents[row], cache.boost[row]):
+            reward_fn._agent_boosts[agent] = boost
+        breakdowns.append(breakdown)
+    return rewards, breakdowns
@@ -1,16 +1,22 @@
+from functools import cache
+
 import numpy as np
 from numpy.linalg import norm
 from rlgym.rocket_league.common_values import BACK_NET_Y, CEILING_Z, SIDE_WALL_X
 
 
-def encode_position(position: np.ndarray, frequencies: int = 4) -> np.ndarray:
-    """Encode the shit out of some positions"""
-    encoded = [
-        fourier_encoder(-SIDE_WALL_X, SIDE_WALL_X, position[0], frequencies),
-        fourier_encoder(-BACK_NET_Y, BACK_NET_Y, position[1], frequencies),
-        fourier_encoder(-CEILING_Z, CEILING_Z, position[2], frequencies),
-    ]
-    return np.concatenate(encoded)
+def encode_position(position: np.ndarray, frequencies: int = 4, out: np.ndarray | None = None) -> np.ndarray:
+    """Encode the shit out of some positions, (..., 3) -> (..., 3*2*frequencies)
+
+    If given, out is a (..., 3, 2*frequencies) view the features are written into.
+    """
+    encoded = np.empty((*position.shape[:-1], 3, 2 * frequencies)) if out is None else out
+    fourier_encoder(-SIDE_WALL_X, SIDE_WALL_X, position[..., 0], frequencies, out=encoded[..., 0, :])
+    fourier_encoder(-BACK_NET_Y, BACK_NET_Y, position[..., 1], frequencies, out=encoded[..., 1, :])
+    fourier_encoder(-CEILING_Z, CEILING_Z, position[..., 2], frequencies, out=encoded[..., 2, :])
+    if out is None:
+        return encoded.reshape(*position.shape[:-1], -1)
+    return out
 
 
 def encode_velocity(max_speed: float, vel: np.ndarray, frequencies: int = 4) -> np.ndarray:
@@ -21,17 +27,31 @@ def encode_velocity(max_speed: float, vel: np.ndarray, frequencies: int = 4) ->
     return np.concatenate(encoded)
 
 
-def fourier_encoder(low, high, value: float | np.ndarray, frequencies=4, periodic=False):
+@cache
+def fourier_table(low, high, frequencies: int = 4, periodic: bool = False) -> tuple[float, np.ndarray]:
+    """Center and per-frequency scale of the fourier encoding of [low, high]"""
     n_range = np.arange(frequencies)
     if periodic:
         n_range += 1
     freqs = np.exp2(n_range)
 
-    value = np.array(value).reshape(-1, 1)
-    trig_params = (value - (low + high) / 2) * freqs * (2 * np.pi / (2 * (high - low)))
-    sin_terms = np.sin(trig_params)
-    cos_terms = np.cos(trig_params)
-    return np.concatenate((sin_terms, cos_terms), axis=-1).squeeze()
+    # freqs are powers of two, so folding the scale in is exact
+    table = freqs * (2 * np.pi / (2 * (high - low)))
+    table.flags.writeable = False
+    return (low + high) / 2, table
+
+
+def fourier_encoder(low, high, value: float | np.ndarray, frequencies=4, periodic=False, out: np.ndarray | None = None):
+    """Sin/cos features of value, (...) -> (..., 2*frequencies), optionally written into out"""
+    center, table = fourier_table(low, high, frequencies, periodic)
+
+    value = np.asarray(value)[..., None]
+    trig_params = (value - center) * table
+    if out is None:
+        return np.concatenate((np.sin(trig_params), np.cos(trig_params)), axis=-1)
+    np.sin(trig_params, out=out[..., :frequencies])
+    np.cos(trig_params, out=out[..., frequencies:])
+    return out
 
 
 def binary_encoder(low, high, value, num_bins: int) -> np.ndarray:
@@ -39,13 +59,39 @@ def binary_encoder(low, high, value, num_bins: int) -> np.ndarray:
     mask = 2 ** np.arange(num_bins)
     max = 2**num_bins - 1
 
-    scaled_val = int((value - low) / (high - low) * max)
-    encoding = scaled_val & mask != 0
+    scaled_val = np.asarray((value - low) / (high - low) * max).astype(int)
+    encoding = scaled_val[..., None] & mask != 0
     return encoding.astype(float)
 
 
-def planar_angle(reference: np.ndarray, normal: np.ndarray, target: np.ndarray) -> float:
-    """Return the yaw angle between a car's foward and a unit vector"""
+def planar_angle(reference: np.ndarray, normal: np.ndarray, target: np.ndarray) -> float | np.ndarray:
+    """Return the yaw angle between a car's foward and a unit vector
+
+    Broadcasts over the leading axes of (..., 3) inputs. Any degenerate projection gives an angle of 0.
+    """
+    if reference.ndim == normal.ndim == target.ndim == 1:
+        return _single_planar_angle(reference, normal, target)
+
+    normal_norm = row_norm(normal)
+    n = normal / _nonzero(normal_norm)[..., None]
+
+    t_proj = target - row_dot(target, n)[..., None] * n
+    t_proj_norm = row_norm(t_proj)
+    t_proj_u = t_proj / _nonzero(t_proj_norm)[..., None]
+
+    ref_proj = reference - row_dot(reference, n)[..., None] * n
+    ref_proj_norm = row_norm(ref_proj)
+    ref_proj_u = ref_proj / _nonzero(ref_proj_norm)[..., None]
+
+    # Clip in float64 like numpy 1.x does for float32 scalars
+    angle = np.arccos(np.clip(row_dot(ref_proj_u, t_proj_u).astype(np.float64), -1, 1))
+    sign = np.sign(row_dot(np.cross(ref_proj_u, t_proj_u), n))
+    angle = np.where(sign == 0, angle, angle * sign)
+    angle = np.where((normal_norm == 0) | (t_proj_norm == 0) | (ref_proj_norm == 0), 0, angle)
+    return angle[()]
+
+
+def _single_planar_angle(reference: np.ndarray, normal: np.ndarray, target: np.ndarray) -> float:
     if (x := norm(normal)) == 0:
         return 0
     else:
@@ -68,3 +114,21 @@ def planar_angle(reference: np.ndarray, normal: np.ndarray, target: np.ndarray)
     if sign == 0:
         return angle
     return angle * sign
+
+
+def row_dot(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Dot product over the last axis, bit-identical to np.dot on each row"""
+    # matmul dispatches each row to the same BLAS dot kernel np.dot uses; einsum/sum reorder the adds
+    return np.matmul(a[..., None, :], b[..., :, None])[..., 0, 0]
+
+
+def row_norm(a: np.ndarray) -> np.ndarray:
+    """Euclidean norm over the last axis, bit-identical to norm on each row"""
+    if not np.issubdtype(a.dtype, np.inexact):
+        a = a.astype(float)
+    return np.sqrt(row_dot(a, a))
+
+
+def _nonzero(x: np.ndarray) -> np.ndarray:
+    """Swap zeros for ones so masked-out rows divide cleanly"""
+    return x + (x == 0)
@@ -9,8 +9,11 @@ from rlgym.rocket_league.rlviser import RLViserRenderer
 from rlgym.rocket_league.sim import RocketSimEngine
 
 from env.action_parser import SeerAction
+from env.components import EnvComponents, EnvSampler, env_weights, plain_config
 from env.denbot_obs import DenbotObs
-from env.denbot_reward import DenBotReward
+from env.state_pool import StatePools
+from env.step_cache import StepCache
+from env.terminal_condition import ALL_ROWS
 
 
 class RLEnv(MultiAgentEnv):
@@ -22,16 +25,23 @@ class RLEnv(MultiAgentEnv):
     def __init__(self, config):
         super().__init__()
         self.config = config
-        self.envs = config["envs"]
-        self.curriculum = config["curriculum"]
+        self.curriculum = plain_config(config["curriculum"])
         self.meta_task = 0
         self.env_tasks = defaultdict(int)
-
-        self.obs_builder = DenbotObs()
-        self.action_parser = SeerAction(repeats=8)
+        self.log_reward_terms = config.get("log_reward_terms", False)
+        self.components = {
+            name: EnvComponents(name, env_config, self.log_reward_terms, reward_id)
+            for reward_id, (name, env_config) in enumerate(plain_config(config["envs"]).items())
+        }
+        self.env_samplers = [EnvSampler(env_weights(task["envs"])) for task in self.curriculum["tasks"]]
+
+        self.obs_builder = DenbotObs(num_reward_sets=len(self.components), compact=config.get("compact_obs", False))
+        self.action_parser = SeerAction(repeats=config.get("action_repeats", 8))
         self.renderer = RLViserRenderer()
 
         self.sim = RocketSimEngine()
+        pool_size = config.get("state_pool_size", 0)
+        self.state_pools = StatePools(pool_size) if pool_size else None
         self.possible_agents = []
         for i in range(3):
             self.possible_agents.append(f"blue-{i}")
@@ -45,49 +55,67 @@ class RLEnv(MultiAgentEnv):
         return self.sim.state
 
     def reset(self, *, seed: int | None = None, options: dict[str, Any] | None = None):
-        self._load_task()
-        self.state_mutator.reset(self.shared_info)
-        self.reward_fn.reset(self.shared_info)
-        self.termination_cond.reset(self.shared_info)
-        self.truncation_cond.reset(self.shared_info)
+        state = self._reset_arena()
         self.obs_builder.reset(self.shared_info)
-
-        initial_state = self.sim.create_base_state()
-        self.state_mutator.apply(initial_state, self.sim)
-        state = self.sim.set_state(initial_state, {})
-
-        agents = self.agents = self.sim.agents
-        return self.obs_builder.build_obs(agents, state), {}
+        return self.obs_builder.build_obs(self.agents, state), {}
 
     def step(self, action_dict: MultiAgentDict) -> tuple[MultiAgentDict, MultiAgentDict, MultiAgentDict, MultiAgentDict, MultiAgentDict]:
         engine_actions = self.action_parser.parse_actions(action_dict, self.state)
         new_state = self.sim.step(engine_actions, {})
         agents = self.agents
-        obs = self.obs_builder.build_obs(agents, new_state)
-        is_terminated = self.termination_cond.is_done(agents, new_state)
-        if all(is_terminated.values()):
-            is_terminated["__all__"] = True
+        cache = StepCache(agents, new_state)
+        obs = self.obs_builder.build_obs(agents, new_state, cache)
+        is_terminated, is_truncated = self._is_done(agents, new_state, cache)
+        rewards, self.reward_breakdown = self.reward_fn.apply_batch(agents, new_state, cache)
+        rewards = dict(zip(agents, rewards.tolist()))
+        return obs, rewards, is_terminated, is_truncated, {}
+
+    def _reset_arena(self) -> GameState:
+        """Start a new episode on a freshly picked task, everything but the obs"""
+        self._load_task()
+        self.reward_fn.reset(self.shared_info)
+        self.termination_cond.reset(self.shared_info)
+        self.truncation_cond.reset(self.shared_info)
+
+        if self.state_pools is None:
+            self.state_mutator.reset(self.shared_info)
+            initial_state = self.sim.create_base_state()
+            self.state_mutator.apply(initial_state, self.sim)
         else:
-            is_terminated["__all__"] = False
-        is_truncated = self.truncation_cond.is_done(agents, new_state)
-        if all(is_truncated.values()):
-            is_truncated["__all__"] = True
+            initial_state = self.state_pools.take(self.shared_info["env"], self.shared_info["task"], self.state_mutator, self.sim)
+        state = self.sim.set_state(initial_state, {})
+        self.agents = self.sim.agents
+        return state
+
+    def _is_done(
+        self, agents: list[str], state: GameState, cache: StepCache | None = None, rows: slice = ALL_ROWS
+    ) -> tuple[dict[str, bool], dict[str, bool]]:
+        """Per agent dones with "__all__", where rows picks this env's agents out of a shared cache"""
+        if cache is None:
+            cache = StepCache(agents, state)
+        terminated = self.termination_cond.evaluate(cache, rows)
+        if terminated.all():
+            # Nothing left to truncate
+            truncated = np.zeros_like(terminated)
+            self.truncation_cond.fired = []
         else:
-            is_truncated["__all__"] = False
-        rewards = {agent: self.reward_fn.apply(agent, new_state) for agent in agents}
-        return obs, rewards, is_terminated, is_truncated, {}
+            truncated = self.truncation_cond.evaluate(cache, rows)
+        is_terminated = dict(zip(agents, terminated.tolist()))
+        is_terminated["__all__"] = bool(terminated.all())
+        is_truncated = dict(zip(agents, truncated.tolist()))
+        is_truncated["__all__"] = bool(truncated.all())
+        return is_terminated, is_truncated
 
     def _load_task(self) -> None:
-        meta_task_config = self.curriculum["tasks"][self.meta_task]
-        next_env = np.random.choice(meta_task_config["envs"])
-        env_config = self.envs[next_env]
+        next_env = self.env_samplers[self.meta_task].pick()
+        components = self.components[next_env]
 
-        self.shared_info = {"task": self.env_tasks[next_env], "env": next_env}
+        self.shared_info = {"task": self.env_tasks[next_env], "env": next_env, "reward_id": components.reward_id}
 
-        self.state_mutator = env_config["state_mutator"]
-        self.termination_cond = env_config["termination_cond"]
-        self.truncation_cond = env_config["truncation_cond"]
-        self.reward_fn = DenBotReward(**env_config["rewards"])
+        self.state_mutator = components.state_mutator
+        self.reward_fn = components.reward_fn
+        self.termination_cond = components.termination_cond
+        self.truncation_cond = components.truncation_cond
 
     def render(self) -> Any:
         self.renderer.render(self.state, {})
@@ -99,7 +127,13 @@ class RLEnv(MultiAgentEnv):
             self.env_tasks.update(tasks)
         self.meta_task = task
 
+    def set_env_weights(self, weights: dict[str, float]) -> None:
+        """Reweight the envs of the current curriculum task, from the next reset on"""
+        self.env_samplers[self.meta_task].reweight(weights)
+
     def close(self) -> None:
+        if self.state_pools is not None:
+            self.state_pools.close()
         self.sim.close()
         if self.renderer is not None:
             self.renderer.close()
@@ -0,0 +1,71 @@
+"""
+Static arena geometry shared by the obs builder, reward and tooling, built once at import.
+
+Inverted constants are the same points seen from the orange side (x and y flipped). Pad k from the orange side is
+pad INVERTED_PAD_ORDER[k] from the blue side, which lines up with GameState.inverted_boost_pad_timers.
+"""
+
+import numpy as np
+import rlgym.rocket_league.common_values as cv
+
+INV_VEC = np.array([-1, -1, 1])
+
+BOOST_LOCATIONS = np.array(cv.BOOST_LOCATIONS)  # (34, 3)
+BIG_PAD_INDICES = [3, 4, 15, 18, 29, 30]
+BOOST_PAD_AMOUNTS = 12 * np.ones(BOOST_LOCATIONS.shape[0])
+BOOST_PAD_AMOUNTS[BIG_PAD_INDICES] = 100
+INVERTED_BOOST_LOCATIONS = BOOST_LOCATIONS * INV_VEC
+INVERTED_PAD_ORDER = np.arange(BOOST_LOCATIONS.shape[0])[::-1]
+
+GOAL_POSTS = np.array(
+    [
+        [-cv.GOAL_CENTER_TO_POST, cv.BACK_WALL_Y, 0],
+        [cv.GOAL_CENTER_TO_POST, cv.BACK_WALL_Y, 0],
+        [-cv.GOAL_CENTER_TO_POST, -cv.BACK_WALL_Y, 0],
+        [cv.GOAL_CENTER_TO_POST, -cv.BACK_WALL_Y, 0],
+    ]
+)
+INVERTED_GOAL_POSTS = GOAL_POSTS * INV_VEC
+
+ORANGE_GOAL_BACK = np.array(cv.ORANGE_GOAL_BACK)
+ORANGE_BACK_NET = np.array([0, cv.BACK_NET_Y, cv.GOAL_HEIGHT / 2])
+INVERTED_ORANGE_GOAL_BACK = ORANGE_GOAL_BACK * INV_VEC
+INVERTED_ORANGE_BACK_NET = ORANGE_BACK_NET * INV_VEC
+
+for _constant in (
+    INV_VEC,
+    BOOST_LOCATIONS,
+    BOOST_PAD_AMOUNTS,
+    INVERTED_BOOST_LOCATIONS,
+    INVERTED_PAD_ORDER,
+    GOAL_POSTS,
+    INVERTED_GOAL_POSTS,
+    ORANGE_GOAL_BACK,
+    ORANGE_BACK_NET,
+    INVERTED_ORANGE_GOAL_BACK,
+    INVERTED_ORANGE_BACK_NET,
+):
+    _constant.flags.writeable = False
+del _constant
+
+
+def sq_distances(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Squared euclidean distance over the last axis of broadcastable a and b"""
+    diff = a - b
+    return np.sum(diff * diff, axis=-1)
+
+
+def pad_sq_distances(position: np.ndarray, xy: bool = False, inverted: bool = False) -> np.ndarray:
+    """Squared distance from (..., 3) positions to every boost pad, (..., 34)
+
+    With xy only the ground-plane distance is used, and position may be (..., 2).
+    """
+    locations = INVERTED_BOOST_LOCATIONS if inverted else BOOST_LOCATIONS
+    if xy:
+        return sq_distances(locations[:, :2], position[..., None, :2])
+    return sq_distances(locations, position[..., None, :])
+
+
+def pad_distances(position: np.ndarray, xy: bool = False, inverted: bool = False) -> np.ndarray:
+    """Distance from (..., 3) positions to every boost pad, (..., 34), matching norm(..., axis=-1)"""
+    return np.sqrt(pad_sq_distances(position, xy=xy, inverted=inverted))
@@ -0,0 +1,199 @@
+import multiprocessing as mp
+import traceback
+from multiprocessing.connection import Connection
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from env.denbot_obs import DenbotObs
+
+# RLEnv.possible_agents, at most 3v3 per arena
+MAX_ARENA_AGENTS = 6
+ACTION_SIZE = 7
+
+
+class SharedRollout:
+    """
+    Fixed-size arrays for a pool's rollouts, all carved out of one SharedMemory segment so any process can attach.
+
+    Every per-step field is a ring of slots: (slots, workers, rows, ...) where rows is arenas_per_worker *
+    MAX_ARENA_AGENTS and the obs fields follow DenbotObs.get_obs_space. Rows past a worker's current agent count are
+    marked invalid; row_arena and row_agent (index into RLEnv.possible_agents) say whose each valid row is.
+    actions, (workers, rows, 7), is written by the driver before each step.
+    """
+
+    def __init__(self, num_workers: int, arenas_per_worker: int, slots: int = 2, name: str | None = None):
+        self.num_workers = num_workers
+        self.arenas_per_worker = arenas_per_worker
+        self.slots = slots
+        self.max_rows = arenas_per_worker * MAX_ARENA_AGENTS
+        self.spec = self._spec()
+
+        offsets = {}
+        size = 0
+        for key, (shape, dtype) in self.spec.items():
+            size = -(-size // 64) * 64  # cache line aligned
+            offsets[key] = size
+            size += int(np.prod(shape)) * np.dtype(dtype).itemsize
+
+        self.owner = name is None
+        # Workers share the driver's resource tracker, so only the owner's unlink ever frees the segment
+        self.shm = SharedMemory(create=True, size=max(size, 1)) if self.owner else SharedMemory(name=name)
+        self.name = self.shm.name
+        self.arrays = {
+            key: np.ndarray(shape, dtype=dtype, buffer=self.shm.buf, offset=offsets[key]) for key, (shape, dtype) in self.spec.items()
+        }
+
+    def _spec(self) -> dict[str, tuple[tuple[int, ...], np.dtype]]:
+        ring = (self.slots, self.num_workers, self.max_rows)
+        arenas = (self.slots, self.num_workers, self.arenas_per_worker)
+        spec = {key: ((*ring, *space.shape), space.dtype) for key, space in DenbotObs().get_obs_space("").items()}
+        spec.update(
+            {
+                "reward": (ring, np.dtype(np.float64)),
+                "valid": (ring, np.dtype(bool)),
+                "row_arena": (ring, np.dtype(np.int16)),
+                "row_agent": (ring, np.dtype(np.int8)),
+                "terminated": (arenas, np.dtype(bool)),
+                "truncated": (arenas, np.dtype(bool)),
+                "reset": (arenas, np.dtype(bool)),
+                "actions": ((self.num_workers, self.max_rows, ACTION_SIZE), np.dtype(np.int64)),
+            }
+        )
+        return spec
+
+    def slot(self, slot: int, worker: int | None = None) -> dict[str, np.ndarray]:
+        """Views of one slot of every ring field, for all workers or only one"""
+        index = (slot,) if worker is None else (slot, worker)
+        return {key: array[index] for key, array in self.arrays.items() if key != "actions"}
+
+    def close(self) -> None:
+        self.arrays = {}
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+class SharedMemoryPool:
+    """
+    Subprocess workers that each own a VectorRLEnv and write their results straight into a SharedRollout.
+
+    Only short commands go through the pipes; obs, rewards and dones are read from shared memory without pickling.
+    Step k lands in ring slot k % slots, so the views returned by the previous slots - 1 steps stay intact.
+    """
+
+    def __init__(self, config, num_workers: int, arenas_per_worker: int, slots: int = 2, mp_context: str = "spawn"):
+        self.num_workers = num_workers
+        self.rollout = SharedRollout(num_workers, arenas_per_worker, slots)
+        self.actions = self.rollout.arrays["actions"]
+        self._step = 0
+
+        ctx = mp.get_context(mp_context)
+        self._conns: list[Connection] = []
+        self._workers = []
+        for worker in range(num_workers):
+            conn, worker_conn = ctx.Pipe()
+            process = ctx.Process(
+                target=_worker,
+                args=(worker, config, num_workers, arenas_per_worker, slots, self.rollout.name, worker_conn),
+                daemon=True,
+            )
+            process.start()
+            worker_conn.close()
+            self._conns.append(conn)
+            self._workers.append(process)
+
+    def reset(self, *, seed: int | None = None) -> dict[str, np.ndarray]:
+        seeds = [None] * self.num_workers
+        if seed is not None:
+            seeds = [int(child.generate_state(1)[0]) for child in np.random.SeedSequence(seed).spawn(self.num_workers)]
+        slot = self._next_slot()
+        self._command(lambda worker: ("reset", slot, seeds[worker]))
+        return self.rollout.slot(slot)
+
+    def step(self, actions: np.ndarray | None = None) -> dict[str, np.ndarray]:
+        """Step every worker with actions, (workers, rows, 7), or with whatever is already in self.actions"""
+        if actions is not None:
+            self.actions[:] = actions
+        slot = self._next_slot()
+        self._command(lambda worker: ("step", slot))
+        return self.rollout.slot(slot)
+
+    def set_tasks(self, task: int, tasks: dict[str, int] | None = None) -> None:
+        self._command(lambda worker: ("set_tasks", task, tasks))
+
+    def close(self) -> None:
+        for conn in self._conns:
+            try:
+                conn.send(("close",))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self._workers:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self.rollout.close()
+
+    def _next_slot(self) -> int:
+        slot = self._step % self.rollout.slots
+        self._step += 1
+        return slot
+
+    def _command(self, message) -> None:
+        for worker, conn in enumerate(self._conns):
+            conn.send(message(worker))
+        errors = [reply for reply in (conn.recv() for conn in self._conns) if reply is not None]
+        if errors:
+            raise RuntimeError(f"Env worker failed:\n{errors[0]}")
+
+
+def _worker(worker: int, config, num_workers: int, arenas_per_worker: int, slots: int, shm_name: str, conn: Connection) -> None:
+    from env.vector_env import VectorRLEnv
+
+    rollout = SharedRollout(num_workers, arenas_per_worker, slots, name=shm_name)
+    vector_env = VectorRLEnv(config, arenas_per_worker)
+    agent_ids = {agent: i for i, agent in enumerate(vector_env.arenas[0].possible_agents)}
+    actions = rollout.arrays["actions"][worker]
+    try:
+        while True:
+            command, *args = conn.recv()
+            try:
+                match command:
+                    case "reset":
+                        slot, seed = args
+                        if seed is not None:
+                            # Task picks still use the global RNG, and it's ours alone here
+                            np.random.seed(seed)
+                        obs, _ = vector_env.reset(seed=seed)
+                        _write(rollout.slot(slot, worker), vector_env, agent_ids, obs)
+                    case "step":
+                        (slot,) = args
+                        obs, rewards, terminated, truncated, info = vector_env.step(actions[: len(vector_env.rows)])
+                        out = rollout.slot(slot, worker)
+                        _write(out, vector_env, agent_ids, obs, rewards)
+                        out["terminated"][:] = terminated
+                        out["truncated"][:] = truncated
+                        out["reset"][:] = info["reset"]
+                    case "set_tasks":
+                        vector_env.set_tasks(*args)
+                    case "close":
+                        break
+                conn.send(None)
+            except Exception:  # noqa: BLE001 - handed back to the driver, which raises it
+                conn.send(traceback.format_exc())
+    finally:
+        vector_env.close()
+        rollout.shm.close()
+
+
+def _write(out: dict[str, np.ndarray], vector_env, agent_ids: dict[str, int], obs: dict[str, np.ndarray], rewards=None) -> None:
+    n = len(vector_env.rows)
+    for key, block in obs.items():
+        out[key][:n] = block
+    out["reward"][:n] = 0 if rewards is None else rewards
+    out["valid"][:n] = True
+    out["valid"][n:] = False
+    out["row_arena"][:n] = [arena for arena, _ in vector_env.rows]
+    out["row_agent"][:n] = [agent_ids[agent] for agent in vector_env.row_agents]
+    if rewards is None:
+        out["terminated"][:] = out["truncated"][:] = out["reset"][:] = False
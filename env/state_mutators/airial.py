@@ -1,11 +1,8 @@
 import numpy as np
 import rlgym.rocket_league.common_values as cv
-import RocketSim as rsim
-from rlgym.rocket_league.api import GameState
-from rlgym.rocket_league.sim import RocketSimEngine
 from scipy.stats import triang
 
-from env.state_mutators.state_mutator import StateMutator
+from env.state_mutators.state_mutator import StateMutator, euler_rotations
 
 
 class AirialState(StateMutator):
@@ -39,45 +36,38 @@ class AirialState(StateMutator):
         self.max_car_yeet = max_car_yeet
 
     def reset(self, info: dict) -> None:
-        task = info.get("task", 0)
-        self.max_ball_height = self.BALL_START_HEIGHT + task * self.BALL_HEIGHT_STEP
-        self.max_car_height = self.CAR_START_HEIGHT + task * self.CAR_HEIGHT_STEP
-        self.max_car_yeet = 1 + task * self.CAR_YEET_STEP
+        super().reset(info)
+        self.max_ball_height, self.max_car_height, self.max_car_yeet = self._task_maxes(self.task)
 
-    def apply(self, state: GameState, sim: RocketSimEngine) -> None:
-        # Apply no mass
-        mutator_config = rsim.MutatorConfig()
-        mutator_config.ball_mass = 0
-        sim._arena.set_mutator_config(mutator_config)
-        ball_height = triang.rvs(
+    def sample_batch(self, n: int, task: int) -> np.ndarray:
+        max_ball_height, max_car_height, max_car_yeet = self._task_maxes(task)
+
+        records = self.records(n)
+        ball_pos = records["ball_position"]
+        ball_pos[:, 0] = self.rng.uniform(-1, 1, n) * (cv.SIDE_WALL_X - 10 * cv.BALL_RADIUS)
+        ball_pos[:, 1] = self.rng.uniform(-1, 1, n) * (cv.BACK_WALL_Y - 10 * cv.BALL_RADIUS)
+        ball_pos[:, 2] = triang.rvs(
             0.75,
             loc=self.min_ball_height,
-            scale=self.max_ball_height - self.min_ball_height,
+            scale=max_ball_height - self.min_ball_height,
+            size=n,
             random_state=self.rng,
         )
 
-        state.ball.position = np.array(
-            [
-                (self.rng.random() - 0.5) * 2 * (cv.SIDE_WALL_X - 10 * cv.BALL_RADIUS),
-                (self.rng.random() - 0.5) * 2 * (cv.BACK_WALL_Y - 10 * cv.BALL_RADIUS),
-                ball_height,
-            ],
-            dtype=np.float32,
-        )
-        state.ball.angular_velocity = np.zeros(3, dtype=np.float32)
-        state.ball.linear_velocity = np.zeros(3, dtype=np.float32)
-
-        car = self.default_car()
         x_max = cv.SIDE_WALL_X - 10 * cv.BALL_RADIUS
         y_max = cv.BACK_WALL_Y - 10 * cv.BALL_RADIUS
-        car.physics.position = np.array(
-            [
-                self.rng.uniform(-x_max, x_max),
-                self.rng.uniform(-y_max, y_max),
-                self.rng.uniform(self.min_car_height, self.max_car_height),
-            ]
-        )
-        car.physics.linear_velocity = self.rng.uniform(low=0, high=self.max_car_yeet, size=3)
-        car.physics.euler_angles = self.rng.uniform(low=0, high=2 * np.pi, size=3)
+        car_pos = records["car_position"][:, 0]
+        car_pos[:, 0] = self.rng.uniform(-x_max, x_max, n)
+        car_pos[:, 1] = self.rng.uniform(-y_max, y_max, n)
+        car_pos[:, 2] = self.rng.uniform(self.min_car_height, max_car_height, n)
+        records["car_linear_velocity"][:, 0] = self.rng.uniform(low=0, high=max_car_yeet, size=(n, 3))
+        records["car_rotation"][:, 0] = euler_rotations(self.rng.uniform(low=0, high=2 * np.pi, size=(n, 3)))
+        return records
 
-        state.cars["blue-0"] = car
+    def _task_maxes(self, task: int) -> tuple[float, float, float]:
+        """Ball height, car height and car speed limits of a curriculum task"""
+        return (
+            self.BALL_START_HEIGHT + task * self.BALL_HEIGHT_STEP,
+            self.CAR_START_HEIGHT + task * self.CAR_HEIGHT_STEP,
+            1 + task * self.CAR_YEET_STEP,
+        )
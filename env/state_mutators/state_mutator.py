@@ -5,18 +5,110 @@ import rlgym.rocket_league.common_values as cv
 from rlgym.rocket_league.api import Car, GameState, PhysicsObject
 from rlgym.rocket_league.sim import RocketSimEngine
 
+CAR_RESTING_HEIGHT = 17
+
+
+def state_dtype(num_cars: int) -> np.dtype:
+    """One initial state as a structured record: the ball and num_cars cars, blue before orange"""
+    return np.dtype(
+        [
+            ("ball_position", np.float64, 3),
+            ("ball_linear_velocity", np.float64, 3),
+            ("ball_angular_velocity", np.float64, 3),
+            ("car_team", np.int8, (num_cars,)),
+            ("car_hitbox", np.int8, (num_cars,)),
+            ("car_position", np.float64, (num_cars, 3)),
+            ("car_linear_velocity", np.float64, (num_cars, 3)),
+            ("car_angular_velocity", np.float64, (num_cars, 3)),
+            ("car_rotation", np.float64, (num_cars, 3, 3)),
+            ("car_boost", np.float64, (num_cars,)),
+        ]
+    )
+
+
+def euler_rotations(pyr: np.ndarray) -> np.ndarray:
+    """rlgym's euler_to_rotation for (..., 3) pitch, yaw, roll, giving (..., 3, 3)"""
+    cp, cy, cr = np.moveaxis(np.cos(pyr), -1, 0)
+    sp, sy, sr = np.moveaxis(np.sin(pyr), -1, 0)
+    front = (cp * cy, cp * sy, sp)
+    left = (cy * sp * sr - cr * sy, sy * sp * sr + cr * cy, -cp * sr)
+    up = (-cr * cy * sp - sr * sy, -cr * sy * sp + sr * cy, cp * cr)
+    return np.stack([np.stack(column, axis=-1) for column in (front, left, up)], axis=-1)
+
+
+def yaw_rotations(yaw: np.ndarray) -> np.ndarray:
+    """Rotations of cars sitting flat and facing yaw"""
+    return euler_rotations(np.stack([np.zeros_like(yaw), yaw, np.zeros_like(yaw)], axis=-1))
+
+
+def write_state(state: GameState, record: np.void) -> None:
+    """Fill a base state with the ball and cars of one record, named blue-i and orange-i in record order"""
+    state.ball.position = record["ball_position"]
+    state.ball.linear_velocity = record["ball_linear_velocity"]
+    state.ball.angular_velocity = record["ball_angular_velocity"]
+    team_counts = {cv.BLUE_TEAM: 0, cv.ORANGE_TEAM: 0}
+    for i, team in enumerate(record["car_team"].tolist()):
+        car = StateMutator.default_car()
+        car.team_num = team
+        car.hitbox_type = int(record["car_hitbox"][i])
+        car.physics.position = record["car_position"][i]
+        car.physics.linear_velocity = record["car_linear_velocity"][i]
+        car.physics.angular_velocity = record["car_angular_velocity"][i]
+        car.physics.rotation_mtx = record["car_rotation"][i]
+        car.boost_amount = float(record["car_boost"][i])
+        state.cars[f"{'blue' if team == cv.BLUE_TEAM else 'orange'}-{team_counts[team]}"] = car
+        team_counts[team] += 1
+
 
 class StateMutator:
+    """
+    Draws the initial states of one env.
+
+    sample_batch(n, task) draws n of them at once as state_dtype records, so they can be pooled or looked at
+    without a sim. apply writes the next row of a batch for the task of the last reset into the state, drawing
+    APPLY_BATCH at a time. Setting rng drops that batch, so seeding takes effect on the next apply.
+    """
+
+    APPLY_BATCH = 64
+
     def __init__(self) -> None:
         self.rng = np.random.default_rng()
-        pass
+        self.task = 0
 
-    def reset(self, info: dict) -> None: ...
+    @property
+    def rng(self) -> np.random.Generator:
+        return self._rng
+
+    @rng.setter
+    def rng(self, rng: np.random.Generator) -> None:
+        self._rng = rng
+        self._batch = self.records(0)
+        self._batch_task = None
+
+    def reset(self, info: dict) -> None:
+        self.task = info.get("task", 0)
+
+    def apply(self, state: GameState, sim: RocketSimEngine) -> None:
+        if not len(self._batch) or self._batch_task != self.task:
+            self._batch = self.sample_batch(self.APPLY_BATCH, self.task)
+            self._batch_task = self.task
+        write_state(state, self._batch[0])
+        self._batch = self._batch[1:]
 
     @abstractmethod
-    def apply(self, state: GameState, sim: RocketSimEngine) -> None: ...
+    def sample_batch(self, n: int, task: int) -> np.ndarray: ...
+
+    @staticmethod
+    def records(n: int, blue_size: int = 1, orange_size: int = 0) -> np.ndarray:
+        """n records of resting, upright octanes and a resting ball, for sample_batch to fill in"""
+        records = np.zeros(n, dtype=state_dtype(blue_size + orange_size))
+        records["car_team"][:, blue_size:] = cv.ORANGE_TEAM
+        records["car_hitbox"] = cv.OCTANE
+        records["car_rotation"] = np.eye(3)
+        return records
 
-    def default_car(self) -> Car:
+    @staticmethod
+    def default_car() -> Car:
         car = Car()
         car.hitbox_type = cv.OCTANE
 
@@ -0,0 +1,85 @@
+import queue
+import threading
+from collections import deque
+
+import numpy as np
+from rlgym.rocket_league.api import GameState
+from rlgym.rocket_league.sim import RocketSimEngine
+
+from env.state_mutators.state_mutator import write_state
+
+
+def build_state(record: np.void, sim: RocketSimEngine) -> GameState:
+    """The GameState of one record, ready for sim.set_state"""
+    state = sim.create_base_state()
+    write_state(state, record)
+    return state
+
+
+class StatePool:
+    """Initial states of one (env, task) waiting to be used, as records of a single state_dtype"""
+
+    def __init__(self, env: str, task: int, mutator):
+        self.env = env
+        self.task = task
+        self.mutator = mutator
+        self.records: deque[np.void] = deque()
+        self.refilling = False
+
+
+class StatePools:
+    """
+    Pre-generated initial states for every (env, task) an RLEnv resets into.
+
+    Each pool is filled with size states by its state mutator up front and topped back up on a background thread
+    once fewer than half are left, so a reset only turns one record back into a GameState. A pool that runs dry is
+    refilled on the spot instead of waiting. Moving an env to a new curriculum task drops its old pool.
+
+    Pools are filled with StateMutator.sample_batch behind one lock, since a mutator's rng isn't thread safe. Which
+    pool gets refilled first depends on timing, so states are only reproducible per pool, not across envs.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.pools: dict[tuple[str, int], StatePool] = {}
+        self._lock = threading.Lock()
+        self._requests: queue.SimpleQueue[StatePool | None] = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._refill, name="state-pool-refill", daemon=True)
+        self._thread.start()
+
+    def take(self, env: str, task: int, mutator, sim: RocketSimEngine) -> GameState:
+        pool = self.pools.get((env, task))
+        if pool is None:
+            for key in [key for key in self.pools if key[0] == env]:
+                del self.pools[key]
+            pool = self.pools[(env, task)] = StatePool(env, task, mutator)
+
+        try:
+            record = pool.records.popleft()
+        except IndexError:
+            self._fill(pool, self.size)
+            record = pool.records.popleft()
+
+        if len(pool.records) < self.size // 2 and not pool.refilling:
+            pool.refilling = True
+            self._requests.put(pool)
+        return build_state(record, sim)
+
+    def clear(self) -> None:
+        self.pools = {}
+
+    def close(self) -> None:
+        self._requests.put(None)
+        self._thread.join()
+
+    def _fill(self, pool: StatePool, n: int) -> None:
+        if n <= 0:
+            return
+        with self._lock:
+            records = pool.mutator.sample_batch(n, pool.task)
+        pool.records.extend(records)
+
+    def _refill(self) -> None:
+        while (pool := self._requests.get()) is not None:
+            self._fill(pool, self.size - len(pool.records))
+            pool.refilling = False
@@ -0,0 +1,144 @@
+from functools import cached_property
+
+import numpy as np
+import rlgym.rocket_league.common_values as cv
+from rlgym.rocket_league.api import Car, GameState, PhysicsObject
+
+from env.encoders import row_norm
+
+
+class StepCache:
+    """
+    Quantities derived from one GameState, stacked over agents and seen from each agent's side of the field.
+
+    Each one is computed the first time it's read and then shared by the obs builder and the reward. A cache
+    belongs to a single state, so RLEnv builds a fresh one after every sim.step. from_arenas stacks the agents of
+    several arenas instead, with each row reading its own arena's state.
+
+    prev_boost isn't derived from the state; the reward fills it in from its own history before using the cache.
+    """
+
+    def __init__(self, agents: list[str], state: GameState):
+        self.agents = agents
+        self.state = state
+        self.row_states = [state] * len(agents)
+        self.prev_boost: np.ndarray | None = None
+
+    @classmethod
+    def from_arenas(cls, arena_agents: list[list[str]], states: list[GameState]) -> "StepCache":
+        """One cache over every arena's agents, in arena order"""
+        cache = cls([agent for agents in arena_agents for agent in agents], states[0])
+        cache.row_states = [state for agents, state in zip(arena_agents, states) for _ in agents]
+        return cache
+
+    @cached_property
+    def cars(self) -> list[Car]:
+        return [state.cars[agent] for agent, state in zip(self.agents, self.row_states)]
+
+    @cached_property
+    def orange(self) -> list[bool]:
+        return [car.team_num == cv.ORANGE_TEAM for car in self.cars]
+
+    @cached_property
+    def team(self) -> np.ndarray:
+        return np.array([car.team_num for car in self.cars])
+
+    @cached_property
+    def physics(self) -> list[PhysicsObject]:
+        return [car.inverted_physics if is_orange else car.physics for car, is_orange in zip(self.cars, self.orange)]
+
+    @cached_property
+    def balls(self) -> list[PhysicsObject]:
+        return [state.inverted_ball if is_orange else state.ball for state, is_orange in zip(self.row_states, self.orange)]
+
+    @cached_property
+    def pad_timers(self) -> np.ndarray:
+        return np.stack(
+            [
+                state.inverted_boost_pad_timers if is_orange else state.boost_pad_timers
+                for state, is_orange in zip(self.row_states, self.orange)
+            ]
+        )
+
+    @cached_property
+    def blue_pad_timers(self) -> np.ndarray:
+        """Pad timers in blue order for every row, whatever the team"""
+        return np.stack([state.boost_pad_timers for state in self.row_states])
+
+    @cached_property
+    def goal_scored(self) -> np.ndarray:
+        return np.array([state.goal_scored for state in self.row_states])
+
+    @cached_property
+    def scoring_team(self) -> np.ndarray:
+        """Team that scored in each row's arena, -1 where no goal was scored"""
+        return np.array([state.scoring_team if state.goal_scored else -1 for state in self.row_states])
+
+    @cached_property
+    def tick_count(self) -> np.ndarray:
+        return np.array([state.tick_count for state in self.row_states])
+
+    @cached_property
+    def boost(self) -> np.ndarray:
+        return np.array([car.boost_amount for car in self.cars], dtype=np.float64)
+
+    @cached_property
+    def ball_touches(self) -> np.ndarray:
+        return np.array([car.ball_touches for car in self.cars])
+
+    @cached_property
+    def has_flipped(self) -> np.ndarray:
+        return np.array([car.has_flipped for car in self.cars], dtype=bool)
+
+    @cached_property
+    def car_pos(self) -> np.ndarray:
+        return np.stack([phys.position for phys in self.physics])
+
+    @cached_property
+    def car_vel(self) -> np.ndarray:
+        return np.stack([phys.linear_velocity for phys in self.physics])
+
+    @cached_property
+    def car_ang_vel(self) -> np.ndarray:
+        return np.stack([phys.angular_velocity for phys in self.physics])
+
+    @cached_property
+    def car_rot(self) -> np.ndarray:
+        return np.stack([phys.rotation_mtx for phys in self.physics])
+
+    @cached_property
+    def car_quat(self) -> np.ndarray:
+        return np.stack([phys.quaternion for phys in self.physics])
+
+    @cached_property
+    def car_forward(self) -> np.ndarray:
+        return np.ascontiguousarray(self.car_rot[:, :, 0])
+
+    @cached_property
+    def car_speed(self) -> np.ndarray:
+        return row_norm(self.car_vel)
+
+    @cached_property
+    def ball_pos(self) -> np.ndarray:
+        return np.stack([ball.position for ball in self.balls])
+
+    @cached_property
+    def ball_vel(self) -> np.ndarray:
+        return np.stack([ball.linear_velocity for ball in self.balls])
+
+    @cached_property
+    def ball_speed(self) -> np.ndarray:
+        return row_norm(self.ball_vel)
+
+    @cached_property
+    def ball_vec(self) -> np.ndarray:
+        """Car to ball"""
+        return self.ball_pos - self.car_pos
+
+    @cached_property
+    def ball_dist(self) -> np.ndarray:
+        return row_norm(self.ball_vec)
+
+    @cached_property
+    def ball_vec_u(self) -> np.ndarray:
+        return self.ball_vec / self.ball_dist[:, None]
@@ -1,7 +1,72 @@
 from collections import defaultdict
 
+import numpy as np
 from rlgym.rocket_league.api import GameState
-from rlgym.rocket_league.common_values import TICKS_PER_SECOND
+from rlgym.rocket_league.common_values import ORANGE_TEAM, TICKS_PER_SECOND
+
+from env.step_cache import StepCache
+
+# done_batch reads these rows of the cache, all of them by default
+ALL_ROWS = slice(None)
+
+
+class ConditionTree:
+    """
+    A termination or truncation condition compiled into the flat list of its leaf conditions.
+
+    AnyCondition nodes are flattened away once, so a step is one done_batch per leaf OR-ed into a single (n,)
+    vector, which stops as soon as every agent is done. Leaves skipped that way don't update their state, but the
+    episode is over by then anyway. fired names the leaves that were true for any agent at the last evaluate.
+    """
+
+    def __init__(self, condition):
+        self.condition = condition
+        self.leaves = list(_leaves(condition))
+        self.names = _leaf_names(self.leaves)
+        self.fired: list[str] = []
+
+    def reset(self, info: dict):
+        self.condition.reset(info)
+        self.fired = []
+
+    def is_done(self, agents: list[str], state: GameState) -> dict[str, bool]:
+        return self.condition.is_done(agents, state)
+
+    def evaluate(self, cache: StepCache, rows: slice = ALL_ROWS) -> np.ndarray:
+        done = np.zeros(len(cache.agents[rows]), dtype=bool)
+        self.fired = []
+        for name, leaf in zip(self.names, self.leaves):
+            if done.all():
+                break
+            leaf_done = leaf.done_batch(cache, rows)
+            if leaf_done.any():
+                self.fired.append(name)
+                done |= leaf_done
+        return done
+
+
+def _leaves(condition):
+    if isinstance(condition, AnyCondition):
+        for child in condition.conditions:
+            yield from _leaves(child)
+    else:
+        yield condition
+
+
+def _leaf_names(leaves) -> list[str]:
+    """Class names, numbered when a class shows up more than once"""
+    counts = defaultdict(int)
+    names = []
+    for leaf in leaves:
+        name = type(leaf).__name__
+        names.append(f"{name}_{counts[name]}" if counts[name] else name)
+        counts[name] += 1
+    return names
+
+
+def _blue_y(cache: StepCache, rows: slice, values: np.ndarray) -> np.ndarray:
+    """Team side y components of the cache back to the blue side that GameState uses"""
+    return np.where(cache.team[rows] == ORANGE_TEAM, -values, values)
 
 
 class AnyCondition:
@@ -21,6 +86,12 @@ class AnyCondition:
 
         return combined_dones
 
+    def done_batch(self, cache: StepCache, rows: slice = ALL_ROWS) -> np.ndarray:
+        done = np.zeros(len(cache.agents[rows]), dtype=bool)
+        for condition in self.conditions:
+            done |= condition.done_batch(cache, rows)
+        return done
+
 
 class TimeoutCondition:
     def __init__(self, timeout_seconds: float):
@@ -33,6 +104,9 @@ class TimeoutCondition:
         done = time_elapsed >= self.timeout_seconds
         return {agent: done for agent in agents}
 
+    def done_batch(self, cache: StepCache, rows: slice = ALL_ROWS) -> np.ndarray:
+        return cache.tick_count[rows] / TICKS_PER_SECOND >= self.timeout_seconds
+
 
 class NoTouchTimeoutCondition:
     def __init__(self, timeout_seconds: float):
@@ -52,6 +126,14 @@ class NoTouchTimeoutCondition:
 
         return {agent: done for agent in agents}
 
+    def done_batch(self, cache: StepCache, rows: slice = ALL_ROWS) -> np.ndarray:
+        """Rows are one arena's agents, so any touch among them is a touch in the arena"""
+        tick_count = cache.tick_count[rows]
+        if cache.ball_touches[rows].any():
+            self.last_touch_tick = int(tick_count[0])
+            return np.zeros(len(tick_count), dtype=bool)
+        return (tick_count - self.last_touch_tick) / TICKS_PER_SECOND >= self.timeout_seconds
+
 
 class BallTouchTermination:
     """Terminate on the ball being touched"""
@@ -61,6 +143,9 @@ class BallTouchTermination:
     def is_done(self, agents: list[str], state: GameState) -> dict[str, bool]:
         return {agent: state.cars[agent].ball_touches > 0 for agent in agents}
 
+    def done_batch(self, cache: StepCache, rows: slice = ALL_ROWS) -> np.ndarray:
+        return cache.ball_touches[rows] > 0
+
 
 class CarInFront:
     """Terminate when car leads the ball"""
@@ -73,6 +158,9 @@ class CarInFront:
     def is_done(self, agents: list[str], state: GameState) -> dict[str, bool]:
         return {agent: state.cars[agent].physics.position[1] - state.ball.position[1] > self.buffer for agent in agents}
 
+    def done_batch(self, cache: StepCache, rows: slice = ALL_ROWS) -> np.ndarray:
+        return _blue_y(cache, rows, -cache.ball_vec[rows, 1]) > self.buffer
+
 
 class NoFlip:
     """Terminate if car doesn't flip"""
@@ -80,9 +168,11 @@ class NoFlip:
     def __init__(self, delay: float):
         self.delay = delay
         self.car_flipped = defaultdict(bool)
+        self.rows_flipped: np.ndarray | None = None
 
     def reset(self, info: dict):
         self.car_flipped = defaultdict(bool)
+        self.rows_flipped = None
 
     def is_done(self, agents: list[str], state: GameState) -> dict[str, bool]:
         for agent in agents:
@@ -92,6 +182,15 @@ class NoFlip:
             return {agent: False for agent in agents}
         return {agent: not self.car_flipped[agent] for agent in agents}
 
+    def done_batch(self, cache: StepCache, rows: slice = ALL_ROWS) -> np.ndarray:
+        has_flipped = cache.has_flipped[rows]
+        if self.rows_flipped is None:
+            self.rows_flipped = np.zeros(len(has_flipped), dtype=bool)
+        self.rows_flipped |= has_flipped
+        if cache.tick_count[rows][0] / TICKS_PER_SECOND < self.delay:
+            return np.zeros(len(has_flipped), dtype=bool)
+        return ~self.rows_flipped
+
 
 class BallMinHeight:
     """Terminate on the ball dropping below given height"""
@@ -107,6 +206,11 @@ class BallMinHeight:
             return {agent: False for agent in agents}
         return {agent: state.ball.position[2] < self.height for agent in agents}
 
+    def done_batch(self, cache: StepCache, rows: slice = ALL_ROWS) -> np.ndarray:
+        done = cache.ball_pos[rows, 2] < self.height
+        done[cache.tick_count[rows] / TICKS_PER_SECOND < self.delay] = False
+        return done
+
 
 class CarMinHeight:
     """Terminate on the car dropping below given height"""
@@ -122,6 +226,11 @@ class CarMinHeight:
             return {agent: False for agent in agents}
         return {agent: state.cars[agent].physics.position[2] < self.height for agent in agents}
 
+    def done_batch(self, cache: StepCache, rows: slice = ALL_ROWS) -> np.ndarray:
+        done = cache.car_pos[rows, 2] < self.height
+        done[cache.tick_count[rows] / TICKS_PER_SECOND < self.delay] = False
+        return done
+
 
 class MaxTouches:
     """Terminate on the ball being touched too much"""
@@ -129,9 +238,11 @@ class MaxTouches:
     def __init__(self, touches: int):
         self.touches = touches
         self.car_touches = defaultdict(int)
+        self.row_touches: np.ndarray | None = None
 
     def reset(self, info: dict):
         self.car_touches = defaultdict(int)
+        self.row_touches = None
 
     def is_done(self, agents: list[str], state: GameState) -> dict[str, bool]:
         for agent in agents:
@@ -139,6 +250,13 @@ class MaxTouches:
                 self.car_touches[agent] += 1
         return {agent: self.car_touches[agent] > self.touches for agent in agents}
 
+    def done_batch(self, cache: StepCache, rows: slice = ALL_ROWS) -> np.ndarray:
+        touched = cache.ball_touches[rows] > 0
+        if self.row_touches is None:
+            self.row_touches = np.zeros(len(touched), dtype=int)
+        self.row_touches += touched
+        return self.row_touches > self.touches
+
 
 class FullBoost:
     def reset(self, info: dict): ...
@@ -146,6 +264,9 @@ class FullBoost:
     def is_done(self, agents: list[str], state: GameState) -> dict[str, bool]:
         return {agent: state.cars[agent].boost_amount >= 100 for agent in agents}
 
+    def done_batch(self, cache: StepCache, rows: slice = ALL_ROWS) -> np.ndarray:
+        return cache.boost[rows] >= 100
+
 
 class NegativeY:
     def reset(self, info: dict): ...
@@ -154,6 +275,9 @@ class NegativeY:
         done = state.ball.linear_velocity[1] < 0
         return {agent: done for agent in agents}
 
+    def done_batch(self, cache: StepCache, rows: slice = ALL_ROWS) -> np.ndarray:
+        return _blue_y(cache, rows, cache.ball_vel[rows, 1]) < 0
+
 
 class GoalCondition:
     """
@@ -164,3 +288,6 @@ class GoalCondition:
 
     def is_done(self, agents: list[str], state: GameState) -> dict[str, bool]:
         return {agent: state.goal_scored for agent in agents}
+
+    def done_batch(self, cache: StepCache, rows: slice = ALL_ROWS) -> np.ndarray:
+        return cache.goal_scored[rows].copy()
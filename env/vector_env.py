@@ -0,0 +1,158 @@
+import copy
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import numpy as np
+
+from env.action_parser import SeerAction
+from env.denbot_obs import DenbotObs
+from env.denbot_reward import apply_arena_rewards
+from env.env import RLEnv
+from env.step_cache import StepCache
+
+
+class VectorRLEnv:
+    """
+    N RocketSim arenas stepped in one process, with one batched obs and reward pass over all of their agents.
+
+    Each arena is an RLEnv with its own copy of the env configs, so it picks its own curriculum task and keeps its
+    own state mutator, conditions and reward. An arena that finishes is reset at the start of the next step and its
+    actions for that step are ignored, like gymnasium's next-step autoreset.
+
+    The agents of all arenas are stacked into rows in arena order: rows[i] is the (arena, agent) of row i and
+    arena_rows[k] the slice of arena k. Both can change when an arena resets into a task with other team sizes.
+
+    With pipeline_chunks > 1 the arenas are split into that many chunks and the RocketSim steps run on a worker
+    thread, one chunk after another, while the main thread builds the obs and rewards of the chunks already stepped.
+    This only pays off because arena.step releases the GIL (see benchmarks/pipeline.py). Results are identical to
+    the serial mode, just with one batched pass per chunk instead of one overall.
+    """
+
+    def __init__(self, config, num_arenas: int, pipeline_chunks: int = 1):
+        self.num_arenas = num_arenas
+        self.chunks = [chunk.tolist() for chunk in np.array_split(np.arange(num_arenas), min(max(pipeline_chunks, 1), num_arenas))]
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="arena-sim") if len(self.chunks) > 1 else None
+        self.arenas = [RLEnv(copy.deepcopy(config)) for _ in range(num_arenas)]
+        self.obs_builder = DenbotObs(num_reward_sets=len(self.arenas[0].components))
+        self.action_parser = SeerAction(repeats=config.get("action_repeats", 8))
+        self.needs_reset = np.zeros(num_arenas, dtype=bool)
+
+        self.rows: list[tuple[int, str]] = []
+        self.row_agents: list[str] = []
+        self.arena_rows: list[slice] = []
+        self._seed_mutators(None)
+
+    def reset(self, *, seed: int | None = None, options: dict[str, Any] | None = None) -> tuple[dict[str, np.ndarray], dict[str, Any]]:
+        if seed is not None:
+            self._seed_mutators(seed)
+        states = [arena._reset_arena() for arena in self.arenas]
+        self.needs_reset[:] = False
+        self._update_rows()
+        return self._build_obs(StepCache.from_arenas(self._arena_agents(), states)), {"rows": self.rows}
+
+    def step(self, actions: np.ndarray) -> tuple[dict[str, np.ndarray], np.ndarray, np.ndarray, np.ndarray, dict[str, Any]]:
+        """
+        Step every arena with one (n_rows, 7) action per row of the previous obs.
+
+        Returns the stacked obs blocks and (n_rows,) rewards, plus (num_arenas,) terminated/truncated flags for
+        whole arenas. info["reset"] marks the arenas that were reset instead of stepped, whose rewards are 0.
+        """
+        controls, _ = self.action_parser.parse_batch(self.row_agents, np.asarray(actions))
+        step_rows = self.arena_rows
+        reset = self.needs_reset.copy()
+        # Resets can change the rows, so they happen up front and only the sim steps are pipelined
+        states = [arena._reset_arena() if arena_reset else None for arena, arena_reset in zip(self.arenas, reset)]
+        if reset.any():
+            self._update_rows()
+
+        obs = self._obs_blocks()
+        rewards = np.zeros(len(self.row_agents))
+        breakdowns: list[np.ndarray | None] = [None] * self.num_arenas
+        terminated = np.zeros(self.num_arenas, dtype=bool)
+        truncated = np.zeros(self.num_arenas, dtype=bool)
+
+        def sim_step(chunk: list[int]) -> None:
+            for k in chunk:
+                if not reset[k]:
+                    arena = self.arenas[k]
+                    states[k] = arena.sim.step(dict(zip(arena.agents, controls[step_rows[k]])), {})
+
+        if self._executor is None:
+            sim_step(self.chunks[0])
+            stepped = [(self.chunks[0], None)]
+        else:
+            stepped = [(chunk, self._executor.submit(sim_step, chunk)) for chunk in self.chunks]
+
+        for chunk, future in stepped:
+            if future is not None:
+                future.result()
+            self._finish_chunk(chunk, states, reset, obs, rewards, breakdowns, terminated, truncated)
+        self.needs_reset = terminated | truncated
+
+        info = {"rows": self.rows, "reset": reset, "reward_breakdowns": breakdowns}
+        return obs, rewards, terminated, truncated, info
+
+    def set_tasks(self, task: int, tasks: dict[str, int] | None = None) -> None:
+        for arena in self.arenas:
+            arena.set_tasks(task, tasks)
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+        for arena in self.arenas:
+            arena.close()
+
+    def _build_obs(self, cache: StepCache) -> dict[str, np.ndarray]:
+        obs = self._obs_blocks()
+        if self.row_agents:
+            self.obs_builder._build_batch_obs(cache, obs)
+        return obs
+
+    def _obs_blocks(self) -> dict[str, np.ndarray]:
+        obs = self.obs_builder.obs_blocks(len(self.row_agents))
+        for arena, row in zip(self.arenas, self.arena_rows):
+            obs["reward_id"][row] = arena.shared_info["reward_id"]
+        return obs
+
+    def _finish_chunk(
+        self, chunk: list[int], states: list, reset: np.ndarray, obs: dict[str, np.ndarray], rewards, breakdowns, terminated, truncated
+    ) -> None:
+        """Obs, rewards and dones of one chunk of stepped arenas, written into its rows of the full blocks"""
+        rows = slice(self.arena_rows[chunk[0]].start, self.arena_rows[chunk[-1]].stop)
+        cache = StepCache.from_arenas([self.arenas[k].agents for k in chunk], [states[k] for k in chunk])
+        chunk_rows = [slice(self.arena_rows[k].start - rows.start, self.arena_rows[k].stop - rows.start) for k in chunk]
+        if rows.start != rows.stop:
+            self.obs_builder._build_batch_obs(cache, {key: block[rows] for key, block in obs.items()})
+            reward_fns = [None if reset[k] else self.arenas[k].reward_fn for k in chunk]
+            rewards[rows], chunk_breakdowns = apply_arena_rewards(reward_fns, cache, chunk_rows)
+            for k, breakdown in zip(chunk, chunk_breakdowns):
+                breakdowns[k] = breakdown
+
+        for k, arena_rows in zip(chunk, chunk_rows):
+            if not reset[k]:
+                arena = self.arenas[k]
+                is_terminated, is_truncated = arena._is_done(arena.agents, states[k], cache, arena_rows)
+                terminated[k] = is_terminated["__all__"]
+                truncated[k] = is_truncated["__all__"]
+
+    def _arena_agents(self) -> list[list[str]]:
+        return [arena.agents for arena in self.arenas]
+
+    def _update_rows(self) -> None:
+        self.rows = [(k, agent) for k, arena in enumerate(self.arenas) for agent in arena.agents]
+        self.row_agents = [agent for _, agent in self.rows]
+        self.arena_rows = []
+        start = 0
+        for arena in self.arenas:
+            self.arena_rows.append(slice(start, start + len(arena.agents)))
+            start += len(arena.agents)
+
+    def _seed_mutators(self, seed: int | None) -> None:
+        """Deep copies share their rng state, so give every arena's mutators their own stream"""
+        for arena, arena_seed in zip(self.arenas, np.random.SeedSequence(seed).spawn(self.num_arenas)):
+            if arena.state_pools is not None:
+                # States drawn with the old rngs
+                arena.state_pools.clear()
+            for components, env_seed in zip(arena.components.values(), arena_seed.spawn(len(arena.components))):
+                if hasattr(components.state_mutator, "rng"):
+                    components.state_mutator.rng = np.random.default_rng(env_seed)
@@ -0,0 +1,159 @@
+"""Headless evaluation of a checkpoint over env drills and curriculum tasks.
+
+Runs episodes of every (env, task) in parallel worker processes that act through one batched PolicyServer, without
+rendering, and writes per-drill success rates (ball touched, goal scored, timed out, and how often each done
+condition fired) to a JSON results file. Every chunk of episodes seeds its own state mutator and the policy acts
+greedily unless --explore is given, so reruns give the same numbers.
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import time
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+
+from env.components import reward_table
+from nn.export import ExportedPolicy
+from nn.policy_server import PolicyClient, PolicyServer, load_policy
+
+EPISODES_PER_JOB = 50
+
+
+def run_episodes(env, client: PolicyClient, episodes: int) -> dict:
+    """Outcome counts of episodes in env's current task, acting through client"""
+    counts = {"episodes": episodes, "steps": 0, "touch": 0, "goal": 0, "timeout": 0, "terminated": Counter(), "truncated": Counter()}
+    for _ in range(episodes):
+        obs, _ = env.reset()
+        touched = False
+        done = False
+        while not done:
+            obs, _, terminated, truncated, _ = env.step(client.act(obs))
+            touched = touched or any(car.ball_touches > 0 for car in env.state.cars.values())
+            done = terminated["__all__"] or truncated["__all__"]
+            counts["steps"] += 1
+        counts["touch"] += touched
+        counts["goal"] += bool(env.state.goal_scored)
+        counts["timeout"] += bool(truncated["__all__"])
+        counts["terminated"].update(env.termination_cond.fired)
+        counts["truncated"].update(env.truncation_cond.fired)
+    return counts
+
+
+def summarize(counts: list[dict]) -> dict:
+    """Rates of one (env, task) from the counts of its jobs"""
+    episodes = sum(job["episodes"] for job in counts)
+    summary = {"episodes": episodes, "mean_steps": sum(job["steps"] for job in counts) / episodes}
+    for key in ("touch", "goal", "timeout"):
+        summary[key] = sum(job[key] for job in counts) / episodes
+    for kind in ("terminated", "truncated"):
+        fired = sum((job[kind] for job in counts), Counter())
+        summary[kind] = {name: n / episodes for name, n in sorted(fired.items())}
+    return summary
+
+
+def _worker(client: PolicyClient, env_config, envs: list[str], seed: int, jobs, results) -> None:
+    from env.env import RLEnv
+
+    env = RLEnv(env_config)
+    while (job := jobs.get()) is not None:
+        job_id, name, task, episodes = job
+        # Seeded by job rather than by worker, so results don't depend on which worker ran what
+        np.random.seed([seed, job_id])
+        env.components[name].state_mutator.rng = np.random.default_rng([seed, job_id])
+        env.set_tasks(envs.index(name), {name: task})
+        results.put((name, task, run_episodes(env, client, episodes)))
+    client.close()
+    env.close()
+
+
+def evaluate(
+    module, env_config, envs: list[str], tasks: dict[str, list[int]], episodes: int, workers: int, explore: bool = False, seed: int = 0
+) -> dict:
+    """{env: {task: summary}} of episodes per (env, task), played by workers processes"""
+    table = reward_table(env_config["envs"])
+    weights = module.reward_weights if isinstance(module, ExportedPolicy) else getattr(module, "_reward_weights", None)
+    if weights is not None and not np.allclose(np.asarray(weights), table):
+        raise ValueError("The env config's reward weights don't match the policy's, evaluate with the config it was trained on")
+
+    # One curriculum task per env, so set_tasks picks the drill
+    env_config["curriculum"]["tasks"] = [{"envs": [name]} for name in envs]
+    env_config["state_pool_size"] = 0
+    jobs = [
+        (name, task, min(EPISODES_PER_JOB, episodes - start))
+        for name in envs
+        for task in tasks[name]
+        for start in range(0, episodes, EPISODES_PER_JOB)
+    ]
+
+    server = PolicyServer(module, workers, explore=explore, seed=seed).start()
+    ctx = mp.get_context("spawn")
+    job_queue, results = ctx.Queue(), ctx.Queue()
+    for job_id, job in enumerate(jobs):
+        job_queue.put((job_id, *job))
+    for _ in range(workers):
+        job_queue.put(None)
+    processes = [
+        ctx.Process(target=_worker, args=(client, env_config, envs, seed, job_queue, results), daemon=True) for client in server.clients
+    ]
+    for process in processes:
+        process.start()
+
+    counts = {}
+    for _ in jobs:
+        name, task, job_counts = results.get()
+        counts.setdefault(name, {}).setdefault(task, []).append(job_counts)
+    for process in processes:
+        process.join()
+    server.close()
+    return {name: {task: summarize(counts[name][task]) for task in tasks[name]} for name in envs}
+
+
+def main():
+    from hydra import compose, initialize
+    from hydra.utils import instantiate
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("checkpoint", help="algorithm checkpoint directory, e.g. cool_checkpoints/offense, or nn.export file")
+    parser.add_argument("--exp", default="offense", help="experiment config the checkpoint was trained with")
+    parser.add_argument("--envs", nargs="+", help="env names under conf/exp/env_config/envs, default all")
+    parser.add_argument("--tasks", type=int, nargs="+", help="curriculum tasks to play, default each env's curriculum max")
+    parser.add_argument("--episodes", type=int, default=1000, help="episodes per env and task")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="env processes")
+    parser.add_argument("--explore", action="store_true", help="sample actions instead of taking the most likely")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="results file, default evaluation.json in the checkpoint or next to the export")
+    args = parser.parse_args()
+
+    with initialize(version_base=None, config_path="conf"):
+        cfg = compose(config_name="train", overrides=[f"exp={args.exp}"])
+    env_config = instantiate(cfg.exp.env_config)
+    envs = args.envs or list(env_config.envs)
+    curriculum = env_config.curriculum.envs
+    tasks = {name: args.tasks or [curriculum[name]["max"] if name in curriculum else 0] for name in envs}
+
+    start = time.perf_counter()
+    results = evaluate(load_policy(args.checkpoint), env_config, envs, tasks, args.episodes, args.workers, args.explore, args.seed)
+    seconds = time.perf_counter() - start
+
+    checkpoint = Path(args.checkpoint)
+    output = Path(args.output or (checkpoint.with_suffix(".evaluation.json") if checkpoint.is_file() else checkpoint / "evaluation.json"))
+    output.write_text(
+        json.dumps({"checkpoint": str(Path(args.checkpoint).absolute()), "seed": args.seed, "explore": args.explore, "results": results})
+    )
+
+    print(f"{'env':<20} {'task':>5} {'touch':>7} {'goal':>7} {'timeout':>8} {'steps':>7}")
+    for name, env_results in results.items():
+        for task, summary in env_results.items():
+            print(
+                f"{name:<20} {task:>5} {summary['touch']:>7.3f} {summary['goal']:>7.3f} {summary['timeout']:>8.3f} {summary['mean_steps']:>7.1f}"
+            )
+    episodes = sum(summary["episodes"] for env_results in results.values() for summary in env_results.values())
+    print(f"{episodes} episodes in {seconds:.1f}s, written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,9 @@
-import glob
-import os
+import pickle
+import threading
+from functools import cache
 from pathlib import Path
 from time import sleep, time
 
-import torch
 from hydra import compose, initialize
 from ray.rllib.connectors.env_to_module import EnvToModulePipeline
 from ray.rllib.connectors.module_to_env import ModuleToEnvPipeline
@@ -16,11 +16,14 @@ from ray.rllib.core import (
     COMPONENT_RL_MODULE,
     Columns,
 )
-from ray.rllib.core.rl_module import RLModule
+from ray.rllib.core.rl_module import MultiRLModule, RLModule
 from ray.rllib.env.multi_agent_episode import MultiAgentEpisode
 
 from conf.build_config import build_exp_config, mapping_fn
 from env.env import RLEnv
+from nn.inference import ActionSampler
+from nn.policy_server import POLICY_ID
+from training.checkpoint_index import CheckpointIndex
 
 
 def create_env(exp: str):
@@ -33,9 +36,7 @@ def create_env(exp: str):
 
 
 def get_most_recent_checkpoint() -> Path:
-    dir_str = "ray_results/**/checkpoint_*/"
-    all_checkpoints = glob.glob(dir_str, recursive=True)
-    most_recent_checkpoint = max(all_checkpoints, key=os.path.getmtime)
+    most_recent_checkpoint = CheckpointIndex().latest()
     print(f"Found: {most_recent_checkpoint}")
 
     return Path(most_recent_checkpoint).absolute()
@@ -54,13 +55,83 @@ def load_components_from_checkpoint(path) -> tuple[RLModule, EnvToModulePipeline
     return rl_module, env_to_module, module_to_env
 
 
+def load_module_state(path) -> dict:
+    """The DenBot weights of an algorithm checkpoint, without building a module from them"""
+    state_file = Path(path, COMPONENT_LEARNER_GROUP, COMPONENT_LEARNER, COMPONENT_RL_MODULE, POLICY_ID, RLModule.STATE_FILE_NAME)
+    if state_file.with_suffix(".msgpack").is_file():
+        from ray.rllib.utils.serialization import try_import_msgpack
+
+        with open(state_file.with_suffix(".msgpack"), "rb") as f:
+            return try_import_msgpack(error=True).load(f, strict_map_key=False)
+    with open(state_file.with_suffix(".pkl"), "rb") as f:
+        return pickle.load(f)
+
+
+class CheckpointWatcher:
+    """
+    Watches the checkpoint index from a background thread and reads the weights of each new latest checkpoint
+    as it appears. update() swaps them into a module, so a viewer keeps its module and connectors instead of
+    rebuilding them from disk every episode.
+    """
+
+    def __init__(self, current: Path | None = None, index: CheckpointIndex | None = None, interval: float = 2.0):
+        self.current = current
+        self.index = index or CheckpointIndex()
+        self.interval = interval
+        self._pending: tuple[Path, dict] | None = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> "CheckpointWatcher":
+        self._thread = threading.Thread(target=self._watch, name="checkpoint-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def update(self, rl_module: RLModule) -> Path | None:
+        """Swap the newest loaded weights into rl_module, returning their checkpoint, or None if there are none"""
+        with self._lock:
+            pending, self._pending = self._pending, None
+        if pending is None:
+            return None
+        path, state = pending
+        module = rl_module[POLICY_ID] if isinstance(rl_module, MultiRLModule) else rl_module
+        module.set_state(state)
+        return path
+
+    def _watch(self) -> None:
+        # The index only rereads its file when that changed, so each poll is one stat
+        while not self._stop.wait(self.interval):
+            try:
+                latest = self.index.latest().absolute()
+            except FileNotFoundError:
+                continue
+            if latest == self.current:
+                continue
+            try:
+                state = load_module_state(latest)
+            except FileNotFoundError:
+                # Deleted since it was indexed, a newer one will show up
+                continue
+            with self._lock:
+                self._pending = (latest, state)
+            self.current = latest
+
+
+@cache
+def action_sampler(nvec: tuple[int, ...]) -> ActionSampler:
+    """One sampler per action space, so consecutive actions continue one noise stream"""
+    return ActionSampler(nvec)
+
+
 def sample_action(action_dist_inputs, space):
-    action = []
-    i = 0
-    for n_logits in space.nvec:
-        action.append(torch.distributions.Categorical(logits=action_dist_inputs[i : i + n_logits]).sample())
-        i += n_logits
-    return action
+    return list(action_sampler(tuple(int(n) for n in space.nvec))(action_dist_inputs))
 
 
 def run_episode(env: RLEnv, rl_module: RLModule, env_to_module: EnvToModulePipeline, module_to_env: ModuleToEnvPipeline):
@@ -93,7 +164,14 @@ def run_episode(env: RLEnv, rl_module: RLModule, env_to_module: EnvToModulePipel
 if __name__ == "__main__":
     env = create_env("offense")
     env.set_tasks(0, {"speed_flip": 10, "ball_hunt": 10, "shooting": 50})
+    most_recent_checkpoint = get_most_recent_checkpoint()
+    rl_module, env_to_module, module_to_env = load_components_from_checkpoint(most_recent_checkpoint)
+    watcher = CheckpointWatcher(most_recent_checkpoint).start()
     while True:
-        most_recent_checkpoint = get_most_recent_checkpoint()
-        rl_module, env_to_module, module_to_env = load_components_from_checkpoint(most_recent_checkpoint)
+        try:
+            if (new_checkpoint := watcher.update(rl_module)) is not None:
+                print(f"Loaded: {new_checkpoint}")
+        except RuntimeError:
+            # A trial with another architecture, only a rebuild fits its weights
+            rl_module, env_to_module, module_to_env = load_components_from_checkpoint(watcher.current)
         run_episode(env, rl_module, env_to_module, module_to_env)
@@ -1,16 +1,24 @@
 from typing import Any
 
 import torch
-import torch.nn as nn
 from ray.rllib.core import Columns
 from ray.rllib.core.rl_module.apis import ValueFunctionAPI
 from ray.rllib.core.rl_module.rl_module import RLModule
 from ray.rllib.core.rl_module.torch import TorchRLModule
 from ray.rllib.models.torch.torch_distributions import TorchMultiCategorical
 from ray.rllib.utils import override
+from torch import nn
+
+from nn.inference import FusedDenBot, unpack_mask
 
 
 class DenBot(TorchRLModule, ValueFunctionAPI):
+    """
+    With model_config fused_inference the inference and exploration forward passes, which only env runners
+    make, go through a FusedDenBot that is refreshed after every weight sync, and with script_inference through
+    its TorchScript, which is deprecated and falls back to the eager FusedDenBot. Training keeps the separate layers.
+    """
+
     @override(RLModule)
     def setup(self):
         super().setup()
@@ -20,9 +28,22 @@ class DenBot(TorchRLModule, ValueFunctionAPI):
         pad_embedding = model_configs.get("pad_embedding", 8)
         unit_embedding = model_configs.get("unit_embedding", 64)
 
+        if "reward_weights" not in model_configs:
+            if "rewards" in self.observation_space.spaces:
+                raise ValueError(
+                    "This DenBot was built for the old obs with per-step reward weights under obs['rewards']. Obs now carry a "
+                    "reward_id into a reward table, so checkpoints from before that change are incompatible and need retraining"
+                )
+            raise ValueError(
+                "DenBot needs model_config['reward_weights'], the reward table obs['reward_id'] indexes. "
+                "Build its spec with conf.build_config.rl_module_spec, which fills it in from the env config"
+            )
+        # Every env's reward weights, which obs["reward_id"] picks from. Not persistent, it comes from the config
+        # like the rest of the model, so state dicts stay the same
+        self.register_buffer("_reward_weights", torch.tensor(model_configs["reward_weights"], dtype=torch.float32), persistent=False)
         self._reward_encoder = nn.Sequential(
             nn.Linear(
-                in_features=self.observation_space["rewards"].shape[0],
+                in_features=self._reward_weights.shape[1],
                 out_features=reward_embedding,
             ),
             nn.LeakyReLU(),
@@ -53,7 +74,7 @@ class DenBot(TorchRLModule, ValueFunctionAPI):
             self._pi.append(nn.Linear(in_features=prev_hiddens, out_features=hiddens))
             self._pi.append(nn.LeakyReLU())
             prev_hiddens = hiddens
-        self._pi.append(nn.Linear(in_features=prev_hiddens, out_features=self.action_space.nvec.sum()))
+        self._pi.append(nn.Linear(in_features=prev_hiddens, out_features=int(self.action_space.nvec.sum())))
 
         prev_hiddens = reward_embedding + pad_embedding + 2 * unit_embedding
         self._vf = nn.Sequential()
@@ -65,12 +86,34 @@ class DenBot(TorchRLModule, ValueFunctionAPI):
 
         self.action_dist_cls = TorchMultiCategorical.get_partial_dist_cls(input_lens=tuple(self.action_space.nvec))
 
+        self.script_inference = model_configs.get("script_inference", False)
+        self.fused_inference = model_configs.get("fused_inference", False) or self.script_inference
+        # Kept out of the registered submodules, so they never show up in state dicts or optimizers
+        self.__dict__["_fused"] = None
+        self.__dict__["_inference_fn"] = None
+
+    def fused(self) -> FusedDenBot:
+        """The FusedDenBot of the current weights"""
+        if self._fused is None:
+            fused = FusedDenBot.from_denbot(self)
+            self.__dict__["_fused"] = fused
+            self.__dict__["_inference_fn"] = fused.script() if self.script_inference else fused
+        return self._fused
+
+    @override(TorchRLModule)
+    def set_state(self, state) -> None:
+        super().set_state(state)
+        if self._fused is not None:
+            self._fused.refresh(self)
+
     def _compute_embeddings(self, batch: dict[str, Any]) -> torch.Tensor:
         obs = batch[Columns.OBS]
-        reward_embedding = self._reward_encoder(obs["rewards"])
-        pad_embedding = self._pad_encoder(obs["pads"])
-        ball_embedding = self._ball_encoder(obs["ball"])
-        car_embedding = self._car_encoder(obs["agent"])
+        # One encoding per env rather than per timestep
+        reward_embedding = self._reward_encoder(self._reward_weights)[obs["reward_id"].long()]
+        # float() is a no-op for the full obs and unpacks the float16 compact obs
+        pad_embedding = self._pad_encoder(obs["pads"].float())
+        ball_embedding = self._ball_encoder(obs["ball"].float())
+        car_embedding = self._car_encoder(obs["agent"].float())
 
         # qkv = torch.cat((car_embedding.unsqueeze(1), ball_embedding.unsqueeze(1)), dim=1)
         #
@@ -84,9 +127,35 @@ class DenBot(TorchRLModule, ValueFunctionAPI):
     def _forward(self, batch: dict[str, Any], **kwargs) -> dict[str, Any]:
         embeddings = self._compute_embeddings(batch)
         logits = self._pi(embeddings)
-        mask = batch[Columns.OBS]["mask"]
+        mask = unpack_mask(batch[Columns.OBS]["mask"], logits.shape[-1])
         return {Columns.ACTION_DIST_INPUTS: torch.where(mask == 1, logits, -1e10)}
 
+    @override(TorchRLModule)
+    def forward_inference(self, batch: dict[str, Any], **kwargs) -> dict[str, Any]:
+        # The fused module is always in eval mode, so skip flipping every submodule to eval and back around
+        # each call, which costs as much as the forward pass at batch size 1
+        if self.fused_inference:
+            return self._forward_inference(batch, **kwargs)
+        return super().forward_inference(batch, **kwargs)
+
+    @override(TorchRLModule)
+    def forward_exploration(self, batch: dict[str, Any], **kwargs) -> dict[str, Any]:
+        if self.fused_inference:
+            return self._forward_exploration(batch, **kwargs)
+        return super().forward_exploration(batch, **kwargs)
+
+    @override(TorchRLModule)
+    def _forward_inference(self, batch: dict[str, Any], **kwargs) -> dict[str, Any]:
+        if not self.fused_inference:
+            return super()._forward_inference(batch, **kwargs)
+        self.fused()
+        with torch.no_grad():
+            return {Columns.ACTION_DIST_INPUTS: self._inference_fn(batch[Columns.OBS])}
+
+    @override(TorchRLModule)
+    def _forward_exploration(self, batch: dict[str, Any], **kwargs) -> dict[str, Any]:
+        return self._forward_inference(batch, **kwargs)
+
     @override(ValueFunctionAPI)
     def compute_values(self, batch: dict[str, Any], embeddings: Any = None) -> torch.Tensor:
         if embeddings is None:
@@ -0,0 +1,155 @@
+"""Inference-only export of a DenBot policy to a single npz file.
+
+An algorithm checkpoint needs Ray to load and unpickles the learner, env runner and connector trees. An export holds
+only what playing needs: the FusedDenBot weights (optionally float16), the obs and action space specs and the
+env-to-module connectors' numeric state. load_exported needs nothing but torch and numpy, so importing this module
+does not import Ray. Run ``python -m nn.export CHECKPOINT`` to export the policy of an algorithm checkpoint.
+"""
+
+import argparse
+import json
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import torch
+
+from nn.inference import ActionSampler, FusedDenBot
+
+FORMAT_VERSION = 1
+
+
+def space_spec(space) -> tuple[dict[str, Any], dict[str, np.ndarray]]:
+    """JSON spec of a Dict obs space's Box and Discrete entries, and the Boxes' bounds as arrays"""
+    spec, bounds = {}, {}
+    for key, subspace in space.spaces.items():
+        spec[key] = {"shape": list(subspace.shape), "dtype": str(subspace.dtype)}
+        if hasattr(subspace, "n"):
+            spec[key]["n"] = int(subspace.n)
+        else:
+            bounds[f"observation_space.{key}.low"] = subspace.low
+            bounds[f"observation_space.{key}.high"] = subspace.high
+    return spec, bounds
+
+
+def flatten_state(state: dict, prefix: str) -> dict[str, np.ndarray]:
+    """Numeric leaves of a nested state dict as arrays keyed by their dotted path, everything else is dropped"""
+    arrays = {}
+    for key, value in state.items():
+        if isinstance(value, dict):
+            arrays.update(flatten_state(value, f"{prefix}.{key}"))
+        elif isinstance(value, np.ndarray | int | float | np.number) and not isinstance(value, bool):
+            arrays[f"{prefix}.{key}"] = np.asarray(value)
+    return arrays
+
+
+def unflatten_state(arrays: dict[str, np.ndarray]) -> dict:
+    state = {}
+    for path, value in arrays.items():
+        *parents, key = path.split(".")
+        node = state
+        for parent in parents:
+            node = node.setdefault(parent, {})
+        node[key] = value
+    return state
+
+
+def export_policy(module, path, half: bool = False, connector_state: dict | None = None) -> Path:
+    """Write a DenBot's inference-only export to path, with float16 weights if half"""
+    fused = FusedDenBot.from_denbot(module)
+    obs_spec, arrays = space_spec(module.observation_space)
+    dtype = np.float16 if half else np.float32
+    arrays.update({f"weights.{name}": tensor.detach().cpu().numpy().astype(dtype) for name, tensor in fused.state_dict().items()})
+    arrays.update(flatten_state(connector_state or {}, "connector"))
+    # Folded into the reward embeddings, kept so players can check they run the envs the policy was trained on
+    arrays["reward_weights"] = module._reward_weights.numpy()
+    spec = {
+        "version": FORMAT_VERSION,
+        "sizes": fused.sizes,
+        "observation_space": obs_spec,
+        "nvec": [int(n) for n in module.action_space.nvec],
+        "half": half,
+    }
+    path = Path(path)
+    with open(path, "wb") as f:
+        np.savez(f, spec=np.array(json.dumps(spec)), **arrays)
+    return path
+
+
+class ExportedPolicy:
+    """A policy loaded from an export, acting on RLEnv obs without RLlib"""
+
+    def __init__(
+        self,
+        model: FusedDenBot,
+        observation_space: dict[str, dict[str, Any]],
+        nvec: np.ndarray,
+        reward_weights: np.ndarray,
+        connector_state: dict,
+        seed: int | None = None,
+    ):
+        self.model = model
+        self.observation_space = observation_space
+        self.nvec = nvec
+        self.reward_weights = reward_weights
+        self.connector_state = connector_state
+        self.sampler = ActionSampler(nvec, seed)
+
+    def logits(self, obs: dict[str, np.ndarray]) -> torch.Tensor:
+        """Masked logits of a batch of obs blocks"""
+        with torch.no_grad():
+            return self.model({key: torch.as_tensor(value) for key, value in obs.items()})
+
+    def act(self, obs: dict[str, dict[str, np.ndarray]], explore: bool = False) -> dict[str, np.ndarray]:
+        """Actions for every agent of one env's obs, as returned by RLEnv.reset/step"""
+        agents = list(obs)
+        if not agents:
+            return {}
+        blocks = {key: np.stack([obs[agent][key] for agent in agents]) for key in obs[agents[0]]}
+        return dict(zip(agents, self.sampler(self.logits(blocks), explore).numpy()))
+
+
+def load_exported(path, seed: int | None = None) -> ExportedPolicy:
+    with np.load(path) as data:
+        spec = json.loads(str(data["spec"]))
+        if spec["version"] != FORMAT_VERSION:
+            raise ValueError(f"{path} is export format {spec['version']}, this loader reads {FORMAT_VERSION}")
+        arrays = {key: data[key] for key in data.files if key != "spec"}
+
+    model = FusedDenBot(**spec["sizes"])
+    # float16 exports are widened back, CPU matmuls are slower in half precision
+    weights = {
+        key.removeprefix("weights."): torch.from_numpy(value.astype(np.float32))
+        for key, value in arrays.items()
+        if key.startswith("weights.")
+    }
+    model.load_state_dict(weights)
+    observation_space = spec["observation_space"]
+    for key, subspace in observation_space.items():
+        for bound in ("low", "high"):
+            if (name := f"observation_space.{key}.{bound}") in arrays:
+                subspace[bound] = arrays[name]
+    connector_state = unflatten_state({key: value for key, value in arrays.items() if key.startswith("connector.")}).get("connector", {})
+    return ExportedPolicy(model, observation_space, np.array(spec["nvec"]), arrays["reward_weights"], connector_state, seed)
+
+
+def main():
+    from ray.rllib.connectors.env_to_module import EnvToModulePipeline
+    from ray.rllib.core import COMPONENT_ENV_RUNNER, COMPONENT_ENV_TO_MODULE_CONNECTOR
+
+    from nn.policy_server import load_policy
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("checkpoint", help="algorithm checkpoint directory")
+    parser.add_argument("--output", help="export file, default policy.npz in the checkpoint")
+    parser.add_argument("--half", action="store_true", help="store the weights as float16")
+    args = parser.parse_args()
+
+    connector_path = Path(args.checkpoint, COMPONENT_ENV_RUNNER, COMPONENT_ENV_TO_MODULE_CONNECTOR).absolute()
+    connector_state = EnvToModulePipeline.from_checkpoint(connector_path).get_state() if connector_path.is_dir() else {}
+    output = export_policy(load_policy(args.checkpoint), args.output or Path(args.checkpoint, "policy.npz"), args.half, connector_state)
+    print(f"Exported to {output} ({output.stat().st_size / 1024:.0f} KiB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""Inference-only pieces of DenBot that need nothing but torch and numpy, so players can import them without Ray."""
+
+import warnings
+from itertools import pairwise
+from typing import TYPE_CHECKING
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+from torch import nn
+
+if TYPE_CHECKING:
+    from nn.denbot import DenBot
+
+
+def unpack_mask(mask: torch.Tensor, size: int) -> torch.Tensor:
+    """Bit-packed uint8 action masks from the compact obs back to (..., size) 0/1, any other mask as is"""
+    if mask.dtype != torch.uint8:
+        return mask
+    bits = torch.arange(7, -1, -1, device=mask.device, dtype=torch.uint8)
+    return ((mask.unsqueeze(-1) >> bits) & 1).flatten(start_dim=-2)[..., :size]
+
+
+def mlp(sizes: list[int], negative_slope: float) -> nn.Sequential:
+    """Linear layers through sizes with LeakyReLUs between them, laid out like DenBot's heads"""
+    layers = nn.Sequential()
+    for i, (in_features, out_features) in enumerate(pairwise(sizes)):
+        if i > 0:
+            layers.append(nn.LeakyReLU(negative_slope))
+        layers.append(nn.Linear(in_features, out_features))
+    return layers
+
+
+def linear_sizes(layers: nn.Sequential) -> list[int]:
+    linears = [layer for layer in layers if isinstance(layer, nn.Linear)]
+    return [linears[0].in_features] + [layer.out_features for layer in linears]
+
+
+class FusedDenBot(nn.Module):
+    """
+    Inference-only copy of a DenBot for CPU env runners, where batches are a handful of agents and per-layer
+    overhead is most of a forward pass.
+
+    The pad, ball and car encoders become one block-diagonal matmul over the concatenated obs, the reward
+    encoder becomes a lookup of its precomputed output per env, and the policy and value heads share one
+    embedding. The module is TorchScript-able, see script(), but runs eagerly by default since torch.jit.script is
+    deprecated. refresh copies a DenBot's current weights in place, so scripted copies keep working after a weight
+    sync. The sizes it is built from are kept in self.sizes, so it can be rebuilt from them and a state dict without
+    the DenBot, see nn.export.
+    """
+
+    def __init__(
+        self,
+        encoder_sizes: list[int],
+        embedding_sizes: list[int],
+        reward_shape: list[int],
+        pi_sizes: list[int],
+        vf_sizes: list[int],
+        negative_slope: float = 0.01,
+    ):
+        """Encoder and embedding sizes are (pads, ball, car), reward shape is (reward sets, reward embedding)"""
+        super().__init__()
+        self.sizes = {
+            "encoder_sizes": list(encoder_sizes),
+            "embedding_sizes": list(embedding_sizes),
+            "reward_shape": list(reward_shape),
+            "pi_sizes": list(pi_sizes),
+            "vf_sizes": list(vf_sizes),
+            "negative_slope": negative_slope,
+        }
+        self.pad_embedding = embedding_sizes[0]
+        self.mask_size = pi_sizes[-1]
+        self.negative_slope = negative_slope
+        self.encoder = nn.Linear(sum(encoder_sizes), sum(embedding_sizes))
+        self.register_buffer("reward_embeddings", torch.empty(*reward_shape))
+        self.pi = mlp(pi_sizes, negative_slope)
+        self.vf = mlp(vf_sizes, negative_slope)
+        self.eval()
+
+    @classmethod
+    def from_denbot(cls, denbot: "DenBot") -> "FusedDenBot":
+        pad, ball, car = denbot._pad_encoder[0], denbot._ball_encoder, denbot._car_encoder
+        fused = cls(
+            encoder_sizes=[pad.in_features, ball.in_features, car.in_features],
+            embedding_sizes=[pad.out_features, ball.out_features, car.out_features],
+            reward_shape=[denbot._reward_weights.shape[0], denbot._reward_encoder[0].out_features],
+            pi_sizes=linear_sizes(denbot._pi),
+            vf_sizes=linear_sizes(denbot._vf),
+            negative_slope=denbot._pad_encoder[1].negative_slope,
+        )
+        fused.refresh(denbot)
+        return fused
+
+    @torch.no_grad()
+    def refresh(self, denbot: "DenBot") -> None:
+        pad, ball, car = denbot._pad_encoder[0], denbot._ball_encoder, denbot._car_encoder
+        self.encoder.weight.copy_(torch.block_diag(pad.weight, ball.weight, car.weight))
+        self.encoder.bias.copy_(torch.cat((pad.bias, ball.bias, car.bias)))
+        self.reward_embeddings.copy_(denbot._reward_encoder(denbot._reward_weights))
+        for fused, source in ((self.pi, denbot._pi), (self.vf, denbot._vf)):
+            fused.load_state_dict(source.state_dict())
+
+    def script(self) -> "torch.jit.ScriptModule | FusedDenBot":
+        """
+        TorchScript of this module, sharing its parameters so refresh reaches it too. torch.jit.script is deprecated
+        and warns about it; where it fails, e.g. on Python versions TorchScript no longer supports, this module is
+        returned as is, it computes the same outputs.
+        """
+        try:
+            return torch.jit.script(self)
+        except Exception as e:  # noqa: BLE001 - the eager module is a drop-in replacement
+            warnings.warn(f"TorchScript of FusedDenBot failed, running it eagerly: {e}", stacklevel=2)
+            return self
+
+    def embeddings(self, obs: dict[str, torch.Tensor]) -> torch.Tensor:
+        units = torch.cat((obs["pads"].float(), obs["ball"].float(), obs["agent"].float()), dim=-1)
+        encoded = self.encoder(units)
+        pads = F.leaky_relu(encoded[..., : self.pad_embedding], self.negative_slope)
+        rewards = self.reward_embeddings[obs["reward_id"].long()]
+        return torch.cat((rewards, pads, encoded[..., self.pad_embedding :]), dim=-1)
+
+    def masked_logits(self, embeddings: torch.Tensor, mask: torch.Tensor) -> torch.Tensor:
+        return torch.where(unpack_mask(mask, self.mask_size) == 1, self.pi(embeddings), -1e10)
+
+    def forward(self, obs: dict[str, torch.Tensor]) -> torch.Tensor:
+        """Masked action logits"""
+        return self.masked_logits(self.embeddings(obs), obs["mask"])
+
+    @torch.jit.export
+    def logits_and_values(self, obs: dict[str, torch.Tensor]) -> tuple[torch.Tensor, torch.Tensor]:
+        embeddings = self.embeddings(obs)
+        return self.masked_logits(embeddings, obs["mask"]), self.vf(embeddings).squeeze(-1)
+
+
+class ActionSampler:
+    """
+    MultiDiscrete actions for a batch of logits in one pass, instead of a Categorical per head.
+
+    The heads' logits are gathered into a (..., heads, max_n) block padded with -inf, then sampled with the
+    Gumbel-max trick, or argmaxed without exploration.
+    """
+
+    def __init__(self, nvec, seed: int | None = None):
+        nvec = [int(n) for n in nvec]
+        offsets = np.cumsum([0, *nvec[:-1]])
+        # Index sum(nvec) is the -inf padding column
+        index = np.full((len(nvec), max(nvec)), sum(nvec))
+        for head, (offset, n) in enumerate(zip(offsets, nvec)):
+            index[head, :n] = offset + np.arange(n)
+        self.index = torch.as_tensor(index)
+        self.generator = torch.Generator()
+        # A fresh Generator starts from torch's fixed default seed, so unseeded samplers draw a nondeterministic one
+        if seed is None:
+            self.generator.seed()
+        else:
+            self.generator.manual_seed(seed)
+
+    def __call__(self, logits: torch.Tensor, explore: bool = True) -> torch.Tensor:
+        padding = logits.new_full((*logits.shape[:-1], 1), -torch.inf)
+        heads = torch.cat((logits, padding), dim=-1)[..., self.index]
+        if explore:
+            uniform = torch.rand(heads.shape, generator=self.generator, dtype=heads.dtype)
+            heads = heads - torch.log(-torch.log(uniform))
+        return heads.argmax(dim=-1)
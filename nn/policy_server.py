@@ -0,0 +1,201 @@
+"""Batched local policy serving for many RLEnvs at once.
+
+A PolicyServer loads a policy once and answers action requests from any number of PolicyClients, one per env,
+usually each in its own process. Requests that arrive together are stacked into one forward pass, so a sweep of
+many envs costs one batched inference per step instead of one batch-size-1 pass per env. Run
+``python -m nn.policy_server CHECKPOINT`` to measure games per second.
+"""
+
+import argparse
+import multiprocessing as mp
+import threading
+import time
+import traceback
+from multiprocessing.connection import Connection, wait
+from pathlib import Path
+
+import numpy as np
+import torch
+from ray.rllib.core import COMPONENT_LEARNER, COMPONENT_LEARNER_GROUP, COMPONENT_RL_MODULE, Columns
+from ray.rllib.core.rl_module import MultiRLModule, RLModule
+
+from nn.denbot import DenBot
+from nn.export import ExportedPolicy, load_exported
+from nn.inference import ActionSampler
+
+POLICY_ID = "denbot"
+
+
+def load_policy(path) -> RLModule | ExportedPolicy:
+    """The DenBot RLModule of an algorithm checkpoint, or the ExportedPolicy of an nn.export file"""
+    if Path(path).is_file():
+        return load_exported(path)
+    module = RLModule.from_checkpoint(Path(path, COMPONENT_LEARNER_GROUP, COMPONENT_LEARNER, COMPONENT_RL_MODULE).absolute())
+    if isinstance(module, MultiRLModule):
+        module = module[POLICY_ID]
+    return module
+
+
+class PolicyClient:
+    """One env's connection to a PolicyServer. Picklable, so it can be handed to a subprocess."""
+
+    def __init__(self, conn: Connection):
+        self.conn = conn
+
+    def act(self, obs: dict[str, dict[str, np.ndarray]]) -> dict[str, np.ndarray]:
+        """Actions for every agent of one env's obs, as returned by RLEnv.reset/step"""
+        agents = list(obs)
+        if not agents:
+            return {}
+        self.conn.send({key: np.stack([obs[agent][key] for agent in agents]) for key in obs[agents[0]]})
+        actions = self.conn.recv()
+        if isinstance(actions, str):
+            raise RuntimeError(f"Policy server failed:\n{actions}")  # noqa: TRY004 - the server's traceback, not a bad argument
+        return dict(zip(agents, actions))
+
+    def close(self) -> None:
+        """Tell the server this client is done, so it stops waiting for its requests"""
+        self.conn.send(None)
+
+
+class PolicyServer:
+    """
+    Serves a policy to num_clients PolicyClients from a background thread, over one pipe each.
+
+    After the first request of a round arrives, the server waits up to max_wait seconds for the requests of the
+    other open clients, stopping early once every one has a request in, then answers them all from one forward
+    pass. The obs go straight to the module without RLlib's env-to-module connectors, which for DenBot only batch
+    and tensorize. DenBots act through their FusedDenBot, as do ExportedPolicies.
+    """
+
+    def __init__(
+        self, module: RLModule | ExportedPolicy, num_clients: int, explore: bool = True, max_wait: float = 0.002, seed: int | None = None
+    ):
+        self.module = module
+        self.explore = explore
+        self.max_wait = max_wait
+        self.sampler = ActionSampler(module.nvec if isinstance(module, ExportedPolicy) else module.action_space.nvec, seed)
+        if isinstance(module, ExportedPolicy):
+            self._policy = module.model
+        elif isinstance(module, DenBot):
+            self._policy = module.fused()
+        else:
+            self._policy = lambda obs: module.forward_inference({Columns.OBS: obs})[Columns.ACTION_DIST_INPUTS]
+
+        ctx = mp.get_context("spawn")
+        pipes = [ctx.Pipe() for _ in range(num_clients)]
+        self._conns = [server_conn for server_conn, _ in pipes]
+        self.clients = [PolicyClient(client_conn) for _, client_conn in pipes]
+        self.batches = 0
+        self.rows = 0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @classmethod
+    def from_checkpoint(cls, path, num_clients: int, **kwargs) -> "PolicyServer":
+        return cls(load_policy(path), num_clients, **kwargs)
+
+    def start(self) -> "PolicyServer":
+        self._thread = threading.Thread(target=self._serve, name="policy-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def act(self, requests: list[dict[str, np.ndarray]]) -> list[np.ndarray]:
+        """(n_agents, 7) actions for each request's obs blocks, from one forward pass over all of them"""
+        sizes = [len(blocks["mask"]) for blocks in requests]
+        obs = {key: torch.as_tensor(np.concatenate([blocks[key] for blocks in requests])) for key in requests[0]}
+        with torch.no_grad():
+            actions = self.sampler(self._policy(obs), self.explore).numpy()
+        self.batches += 1
+        self.rows += len(actions)
+        return np.split(actions, np.cumsum(sizes[:-1]))
+
+    def _serve(self) -> None:
+        open_conns = list(self._conns)
+        while open_conns and not self._stop.is_set():
+            ready = wait(open_conns, timeout=0.1)
+            if not ready:
+                continue
+            deadline = time.perf_counter() + self.max_wait
+            while len(ready) < len(open_conns) and (remaining := deadline - time.perf_counter()) > 0:
+                ready += wait([conn for conn in open_conns if conn not in ready], timeout=remaining)
+
+            conns, requests = [], []
+            for conn in ready:
+                request = conn.recv()
+                if request is None:
+                    open_conns.remove(conn)
+                else:
+                    conns.append(conn)
+                    requests.append(request)
+            if not requests:
+                continue
+
+            try:
+                answers = self.act(requests)
+            except Exception:  # noqa: BLE001 - handed back to the clients, which raise it
+                answers = [traceback.format_exc()] * len(conns)
+            for conn, answer in zip(conns, answers):
+                conn.send(answer)
+
+
+def play(client: PolicyClient, env_config, episodes: int, seed: int, results) -> None:
+    """Play episodes in a fresh RLEnv, acting through client, and put (episodes, steps, seconds) on results"""
+    from env.env import RLEnv
+
+    np.random.seed(seed)
+    env = RLEnv(env_config)
+    steps = 0
+    start = time.perf_counter()
+    for _ in range(episodes):
+        obs, _ = env.reset()
+        done = False
+        while not done:
+            obs, _, terminated, truncated, _ = env.step(client.act(obs))
+            done = terminated["__all__"] or truncated["__all__"]
+            steps += 1
+    client.close()
+    results.put((episodes, steps, time.perf_counter() - start))
+    env.close()
+
+
+def main():
+    from conf.build_config import load_configs
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("checkpoint", help="algorithm checkpoint directory or nn.export file")
+    parser.add_argument("--envs", type=int, default=16, help="env processes, each with its own client")
+    parser.add_argument("--episodes", type=int, default=8, help="episodes per env")
+    parser.add_argument("--task", default="ball_hunt", help="env every process plays")
+    args = parser.parse_args()
+
+    env_config = load_configs().exp.env_config
+    env_config.curriculum["tasks"] = [{"envs": [args.task]}]
+    server = PolicyServer.from_checkpoint(args.checkpoint, args.envs).start()
+
+    ctx = mp.get_context("spawn")
+    results = ctx.Queue()
+    processes = [
+        ctx.Process(target=play, args=(client, env_config, args.episodes, seed, results)) for seed, client in enumerate(server.clients)
+    ]
+    for process in processes:
+        process.start()
+    episodes, steps, seconds = np.array([results.get() for _ in processes]).T
+    for process in processes:
+        process.join()
+    server.close()
+    # The players run side by side, so the slowest one's time is the sweep's, not counting process startup
+    print(
+        f"{episodes.sum():.0f} episodes, {steps.sum():.0f} env steps in {seconds.max():.1f}s: {episodes.sum() / seconds.max():.1f} games/s"
+    )
+    print(f"{server.batches} forward passes, {server.rows / max(server.batches, 1):.1f} agents each")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,3 @@
-import glob
-import os
 from pathlib import Path
 
 import dash
@@ -10,29 +8,24 @@ from dash.dependencies import Input, Output, State
 from conf.build_config import load_configs
 from env.env import RLEnv
 from load_latest import load_components_from_checkpoint, run_episode
+from training.checkpoint_index import CheckpointIndex
 
 torch.classes.__path__ = []
 
 # Initialize the Dash app
 app = dash.Dash(__name__)
+checkpoint_index = CheckpointIndex()
 
 def get_trials() -> list[str]:
-    trial_str = "ray_results/*/*/"
-    all_trials = glob.glob(trial_str, recursive=True)
-    trials = sorted(all_trials, key=os.path.getmtime, reverse=True)
-
-    return trials
+    return [str(trial) for trial in checkpoint_index.trials()]
 
 def get_checkpoints(trial_path: str) -> list[str]:
-    checkpoint_str = f"{trial_path}/checkpoint_*/"
-    all_checkpoints = glob.glob(checkpoint_str, recursive=True)
-    checkpoints = sorted(all_checkpoints, key=os.path.getmtime, reverse=True)
-
-    return checkpoints
+    return [str(checkpoint) for checkpoint in checkpoint_index.checkpoints(trial_path)]
 
 # Load configurations
 configs = load_configs()
 env_config = configs.exp.env_config
+trials = get_trials()
 
 # Define the app layout
 app.layout = html.Div([
@@ -40,8 +33,8 @@ app.layout = html.Div([
 
     dcc.Dropdown(
         id='trial-dropdown',
-        options=[{'label': Path(t).name, 'value': t} for t in get_trials()],
-        value=get_trials()[0] if get_trials() else None,
+        options=[{'label': Path(t).name, 'value': t} for t in trials],
+        value=trials[0] if trials else None,
         multi=False
     ),
 
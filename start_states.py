@@ -0,0 +1,40 @@
+"""Plot where an env's state mutator starts the ball and cars, per curriculum task, without running the sim."""
+
+import argparse
+
+import matplotlib.pyplot as plt
+import rlgym.rocket_league.common_values as cv
+from hydra import compose, initialize
+from hydra.utils import instantiate
+
+parser = argparse.ArgumentParser(description=__doc__)
+parser.add_argument("env", help="env name under conf/exp/env_config/envs")
+parser.add_argument("--tasks", type=int, nargs="+", default=[0, 5, 10])
+parser.add_argument("-n", type=int, default=2000, help="states per task")
+args = parser.parse_args()
+
+with initialize(version_base=None, config_path="conf"):
+    cfg = compose(config_name="train")
+mutator = instantiate(cfg.exp.env_config.envs[args.env].state_mutator)
+
+fig, axes = plt.subplots(2, len(args.tasks), figsize=(4 * len(args.tasks), 10), squeeze=False)
+for column, task in enumerate(args.tasks):
+    records = mutator.sample_batch(args.n, task)
+    ball_pos = records["ball_position"]
+    car_pos = records["car_position"].reshape(-1, 3)
+
+    top, side = axes[:, column]
+    top.scatter(ball_pos[:, 0], ball_pos[:, 1], s=2, label="ball")
+    top.scatter(car_pos[:, 0], car_pos[:, 1], s=2, label="cars")
+    top.set_xlim(-cv.SIDE_WALL_X, cv.SIDE_WALL_X)
+    top.set_ylim(-cv.BACK_WALL_Y, cv.BACK_WALL_Y)
+    top.set_aspect("equal")
+    top.set_title(f"{args.env} task {task}")
+    top.legend(loc="upper right")
+
+    side.hist([ball_pos[:, 2], car_pos[:, 2]], bins=50, label=["ball z", "car z"])
+    side.set_xlabel("Height")
+    side.legend()
+
+plt.tight_layout()
+plt.show()
@@ -0,0 +1,77 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from env.action_parser import SeerAction, SeerContinuousAction
+
+
+def _seer_controls(action) -> list[float]:
+    s = SeerAction
+    steer = s.steer_yaw[action[1]]
+    return [
+        s.throttle[action[0]],
+        steer,
+        s.pitch[action[2]],
+        steer,
+        s.roll[action[3]],
+        s.jump[action[4]],
+        s.boost[action[5]],
+        s.handbreak[action[6]],
+    ]
+
+
+def test_control_table_covers_action_space():
+    parser = SeerAction()
+    actions = np.array(list(itertools.product(*(range(n) for n in parser.nvec))))
+    assert parser.control_table.shape == (len(actions), 8)
+    # Shared by every parser, so none may write to them
+    for table in (parser.control_table, parser.flat_strides):
+        with pytest.raises(ValueError, match="read-only"):
+            table[0] = 0
+    parsed = parser.parse_actions({str(i): action for i, action in enumerate(actions)}, None)
+    for i, action in enumerate(actions):
+        assert np.array_equal(parsed[str(i)][0], _seer_controls(action))
+
+
+@pytest.mark.parametrize("repeats", [1, 4, 8])
+def test_seer_repeats(repeats):
+    parser = SeerAction(repeats=repeats)
+    action_space = parser.get_action_space("blue-0")
+    action_space.seed(0)
+    actions = {agent: action_space.sample() for agent in ("blue-0", "orange-0")}
+    parsed = parser.parse_actions(actions, None)
+    for agent, action in actions.items():
+        assert parsed[agent].shape == (repeats, 8)
+        assert np.all(parsed[agent] == _seer_controls(action))
+
+    buffer = parsed["blue-0"]
+    assert parser.parse_actions(actions, None)["blue-0"] is buffer
+
+
+def test_continuous_matches_insert():
+    parser = SeerContinuousAction(repeats=3)
+    actions = np.random.default_rng(0).uniform(-1, 1, size=(4, 7)).astype(np.float32)
+    parsed = parser.parse_actions({str(i): action for i, action in enumerate(actions)}, None)
+    for i, action in enumerate(actions):
+        expected = np.insert(action, 3, action[1])
+        expected[-3:] = expected[-3:] > 0
+        assert parsed[str(i)].dtype == np.float32
+        assert np.array_equal(parsed[str(i)], expected.reshape(1, -1).repeat(3, axis=0))
+
+
+def test_parse_batch():
+    parser = SeerAction(repeats=4)
+    agents = ["blue-0", "blue-1", "orange-0"]
+    actions = np.array([[0, 1, 2, 0, 1, 0, 1], [2, 4, 0, 1, 0, 1, 0], [1, 2, 2, 1, 0, 0, 0]])
+    block, index = parser.parse_batch(agents, actions)
+    assert block.shape == (3, 4, 8)
+    assert block.dtype == np.float32
+    assert block.flags.c_contiguous
+    for agent, action in zip(agents, actions):
+        assert np.all(block[index[agent]] == _seer_controls(action))
+
+    # The dict mode hands out views of the same block
+    views = parser.parse_actions(dict(zip(agents, actions)), None)
+    for agent in agents:
+        assert np.shares_memory(views[agent], block)
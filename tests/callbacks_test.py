@@ -0,0 +1,126 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from omegaconf import OmegaConf
+from ray.rllib.utils.metrics import ENV_RUNNER_RESULTS, EVALUATION_RESULTS
+
+from env.components import EnvSampler
+from env.env import RLEnv
+from env.state_mutators.random import Random
+from env.terminal_condition import BallTouchTermination, TimeoutCondition
+from training.callbacks import MIN_FOCUS_WEIGHT, CurriculumCallback, EpisodeData
+
+
+class StubMetricsLogger:
+    """Just what the callbacks read and write of a MetricsLogger"""
+
+    def __init__(self, values: dict | None = None):
+        self.values = values or {}
+        self.logged = []
+
+    def peek(self, key, default=None):
+        return self.values.get(key, default)
+
+    def log_dict(self, stats: dict, *, key: str, **kwargs):
+        self.logged.append((key, stats))
+
+    def log_value(self, key, value, **kwargs):
+        self.logged.append((key, value))
+
+
+BALL_HUNT_CURRICULUM = {"start": 0, "max": 10, "metric": {"key": "ball_hunt_ball_touched", "value": 0.8}}
+
+
+def curriculum_callback(curriculum_config: dict) -> CurriculumCallback:
+    """A CurriculumCallback with its config set, like conf.build_config.multi_callback does"""
+    return type("Callback", (CurriculumCallback,), {"curriculum_config": curriculum_config})()
+
+
+def test_focus_weights_skips_envs_without_curriculum():
+    callback = curriculum_callback(
+        {
+            "focus": 0.5,
+            "tasks": [{"envs": {"ball_hunt": 2, "kickoff": 1}}],
+            "envs": {"ball_hunt": BALL_HUNT_CURRICULUM},
+        }
+    )
+
+    logger = StubMetricsLogger({(EVALUATION_RESULTS, ENV_RUNNER_RESULTS, "ball_hunt_ball_touched"): 0.4})
+    weights = callback._focus_weights(logger, 0)
+    # Half way to its target, ball_hunt gives up a quarter of its weight, kickoff keeps all of its own
+    assert weights == {"ball_hunt": pytest.approx(1.5), "kickoff": 1}
+
+
+def test_focus_weights_with_every_env_at_target():
+    config = {
+        "tasks": [{"envs": {"ball_hunt": 2, "shooting": 1}}],
+        "envs": {
+            "ball_hunt": BALL_HUNT_CURRICULUM,
+            "shooting": {"start": 0, "max": 50, "metric": {"key": "shooting_goal_scored", "value": 0.9}},
+        },
+    }
+    logger = StubMetricsLogger(
+        {
+            (EVALUATION_RESULTS, ENV_RUNNER_RESULTS, "ball_hunt_ball_touched"): 0.9,
+            (EVALUATION_RESULTS, ENV_RUNNER_RESULTS, "shooting_goal_scored"): 1.0,
+        }
+    )
+    weights = curriculum_callback({**config, "focus": 0.5})._focus_weights(logger, 0)
+    assert weights == {"ball_hunt": pytest.approx(1), "shooting": pytest.approx(0.5)}
+
+    # Even a focus next to 1 leaves every env sampled
+    weights = curriculum_callback({**config, "focus": 0.99999})._focus_weights(logger, 0)
+    assert weights == {"ball_hunt": MIN_FOCUS_WEIGHT, "shooting": MIN_FOCUS_WEIGHT}
+    sampler = EnvSampler(weights)
+    assert {sampler.pick() for _ in range(200)} == {"ball_hunt", "shooting"}
+
+    for focus in (1, 1.5, -0.1):
+        with pytest.raises(ValueError, match="focus"):
+            curriculum_callback({**config, "focus": focus})
+
+
+def test_episode_data_logs_terms_and_done_conditions():
+    config = OmegaConf.create(
+        {
+            "envs": {
+                "ball_hunt": {
+                    "state_mutator": Random(),
+                    "rewards": {"ball_touch": 1, "facing_ball": 0.1},
+                    "termination_cond": BallTouchTermination(),
+                    "truncation_cond": TimeoutCondition(timeout_seconds=1),
+                }
+            },
+            "curriculum": {"tasks": [{"envs": ["ball_hunt"]}]},
+            "log_reward_terms": True,
+        },
+        flags={"allow_objects": True},
+    )
+    env = RLEnv(config)
+    np.random.seed(0)
+    env.reset()
+    total_reward = 0.0
+    done = False
+    while not done:
+        actions = {agent: env.action_spaces[agent].sample() for agent in env.agents}
+        _, rewards, terminated, truncated, _ = env.step(actions)
+        total_reward += sum(rewards.values())
+        done = terminated["__all__"] or truncated["__all__"]
+
+    logger = StubMetricsLogger()
+    vector_env = SimpleNamespace(envs=[SimpleNamespace(env=env)])
+    EpisodeData().on_episode_end(episode=None, metrics_logger=logger, env=vector_env, env_index=0)
+    logged = dict(logger.logged)
+    env.close()
+
+    # Per-agent returns of each weighted term, which add up to the episode's reward
+    term_returns = logged["reward_terms"]["ball_hunt"]
+    assert list(term_returns) == ["ball_touch", "facing_ball"]
+    assert sum(term_returns.values()) * len(env.agents) == pytest.approx(total_reward)
+
+    fired = logged["done_conditions"]["ball_hunt"]
+    assert fired["terminated"] == {"BallTouchTermination": int(bool(terminated["__all__"]))}
+    assert fired["truncated"] == {"TimeoutCondition": int("TimeoutCondition" in env.truncation_cond.fired)}
+    assert sum(fired["terminated"].values()) + sum(fired["truncated"].values()) >= 1
+    assert logged["ball_hunt-env"] == 0
+    assert logged["ball_hunt_ball_touched"] == fired["terminated"]["BallTouchTermination"]
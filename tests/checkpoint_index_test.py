@@ -0,0 +1,66 @@
+import json
+import os
+from types import SimpleNamespace
+
+from training.callbacks import CheckpointIndexCallback
+from training.checkpoint_index import CheckpointIndex
+
+
+def save_checkpoint(root, trial: str, number: int, mtime: float):
+    path = root / "denbot_1on0" / trial / f"checkpoint_{number:06d}"
+    path.mkdir(parents=True)
+    os.utime(path, (mtime, mtime))
+    return SimpleNamespace(path=str(path))
+
+
+def result(iteration: int, level: int, touched: float) -> dict:
+    return {
+        "training_iteration": iteration,
+        "env_runners": {"episode_return_mean": 1.5, "ball_hunt-env": level - 1},
+        "evaluation": {"env_runners": {"ball_hunt-env": level, "ball_hunt_ball_touched": touched, "ball_hunt_goal_scored": 0.1}},
+    }
+
+
+def test_callback_indexes_checkpoints(tmp_path):
+    callback = CheckpointIndexCallback(tmp_path, metrics=["ball_hunt_ball_touched"], num_to_keep=2)
+    for number in range(3):
+        trial = SimpleNamespace(last_result=result(10 * (number + 1), number, 0.5))
+        callback.on_checkpoint(number, [trial], trial, save_checkpoint(tmp_path, "a", number, 1000 + number))
+    trial = SimpleNamespace(last_result=result(10, 4, 0.9))
+    callback.on_checkpoint(0, [trial], trial, save_checkpoint(tmp_path, "b", 0, 1001.5))
+
+    # A fresh reader sees the same index, trials ordered by their newest checkpoint, and only num_to_keep per trial
+    index = CheckpointIndex(tmp_path)
+    assert index.trials() == [tmp_path / "denbot_1on0" / "a", tmp_path / "denbot_1on0" / "b"]
+    assert [path.name for path in index.checkpoints(tmp_path / "denbot_1on0" / "a")] == ["checkpoint_000002", "checkpoint_000001"]
+    assert index.latest() == tmp_path / "denbot_1on0" / "a" / "checkpoint_000002"
+    entry = index.entries[0]
+    assert entry["iteration"] == 30
+    # Evaluation results win over training ones, like the curriculum reads them
+    assert entry["tasks"] == {"ball_hunt": 2}
+    assert entry["metrics"] == {"episode_return_mean": 1.5, "ball_hunt_ball_touched": 0.5}
+
+    # Readers pick up writes from elsewhere without rescanning
+    trial = SimpleNamespace(last_result=result(20, 5, 1.0))
+    callback.on_checkpoint(1, [trial], trial, save_checkpoint(tmp_path, "b", 1, 1003))
+    assert index.latest() == tmp_path / "denbot_1on0" / "b" / "checkpoint_000001"
+
+
+def test_rebuild_keeps_known_entries(tmp_path):
+    assert CheckpointIndex(tmp_path / "missing").trials() == []
+    save_checkpoint(tmp_path, "old", 0, 1000)
+    save_checkpoint(tmp_path, "old", 1, 1001)
+
+    # No index yet, so the first read scans
+    index = CheckpointIndex(tmp_path)
+    assert [path.name for path in index.checkpoints()] == ["checkpoint_000001", "checkpoint_000000"]
+    assert index.entries[0]["iteration"] is None
+
+    callback = CheckpointIndexCallback(tmp_path)
+    trial = SimpleNamespace(last_result=result(10, 1, 0.5))
+    callback.on_checkpoint(0, [trial], trial, save_checkpoint(tmp_path, "new", 0, 1002))
+    save_checkpoint(tmp_path, "untracked", 0, 999)
+    index.rebuild()
+    entries = json.loads(index.file.read_text())["checkpoints"]
+    assert [entry["trial"] for entry in entries] == ["denbot_1on0/new", "denbot_1on0/old", "denbot_1on0/old", "denbot_1on0/untracked"]
+    assert entries[0]["iteration"] == 10
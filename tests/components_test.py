@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+from omegaconf import OmegaConf
+
+from env.components import EnvSampler, env_weights, plain_config, reward_table
+from env.env import RLEnv
+from env.state_mutators.random import Random
+from env.terminal_condition import BallTouchTermination, TimeoutCondition
+
+
+def test_env_weights():
+    assert env_weights(["a", "a", "b", "a"]) == {"a": 3, "b": 1}
+    assert env_weights({"a": 2, "b": 0.5}) == {"a": 2, "b": 0.5}
+
+
+@pytest.mark.parametrize("weights", [{"a": 3, "b": 1}, {"a": 1, "b": 2, "c": 0, "d": 5, "e": 0.5}, {"a": 1}])
+def test_env_sampler_frequencies(weights):
+    sampler = EnvSampler(weights)
+    np.random.seed(0)
+    picks = [sampler.pick() for _ in range(20000)]
+    total = sum(weights.values())
+    for name, weight in weights.items():
+        assert abs(picks.count(name) / len(picks) - weight / total) < 0.015
+
+
+def test_env_sampler_reweight():
+    sampler = EnvSampler({"a": 1, "b": 1})
+    sampler.reweight({"a": 0, "b": 1})
+    assert {sampler.pick() for _ in range(100)} == {"b"}
+    with pytest.raises(ValueError):
+        sampler.reweight({"a": 0, "b": 0})
+
+
+def test_plain_config():
+    config = OmegaConf.create({"tasks": [{"envs": ["a", "b"]}]})
+    assert plain_config(config) == {"tasks": [{"envs": ["a", "b"]}]}
+    assert plain_config(config.tasks) == [{"envs": ["a", "b"]}]
+    assert plain_config({"a": 1}) == {"a": 1}
+
+
+def test_components_built_once():
+    config = OmegaConf.create(
+        {
+            "envs": {
+                name: {
+                    "state_mutator": Random(blue_size=1, orange_size=size),
+                    "rewards": {"ball_touch": 1, "facing_ball": size},
+                    "termination_cond": BallTouchTermination(),
+                    "truncation_cond": TimeoutCondition(timeout_seconds=1),
+                }
+                for name, size in (("solo", 0), ("duel", 1))
+            },
+            "curriculum": {"tasks": [{"envs": ["solo", "duel", "duel"]}]},
+        },
+        flags={"allow_objects": True},
+    )
+    env = RLEnv(config)
+    reward_fns = {name: components.reward_fn for name, components in env.components.items()}
+    seen = set()
+    table = reward_table(config.envs)
+    for _ in range(20):
+        obs, _ = env.reset()
+        env_name = env.shared_info["env"]
+        seen.add(env_name)
+        assert np.array_equal(table[obs["blue-0"]["reward_id"]], env.reward_fn.reward_weights)
+        assert env.reward_fn is reward_fns[env_name]
+        assert env.state_mutator is config.envs[env_name].state_mutator
+        assert len(env.agents) == 1 + (env_name == "duel")
+    assert seen == {"solo", "duel"}
+
+    env.set_env_weights({"solo": 1, "duel": 0})
+    for _ in range(5):
+        env.reset()
+        assert env.shared_info["env"] == "solo"
+    env.close()
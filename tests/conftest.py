@@ -0,0 +1,27 @@
+import numpy as np
+import pytest
+from rlgym.rocket_league.api import GameState
+from rlgym.rocket_league.sim import RocketSimEngine
+
+from env.action_parser import SeerAction
+from env.state_mutators.random import Random
+
+
+@pytest.fixture
+def game_states() -> list[GameState]:
+    """A 3v3 kickoff-ish state followed by a few seconds of random driving"""
+    np.random.seed(0)
+    mutator = Random(blue_size=3, orange_size=3)
+    mutator.rng = np.random.default_rng(0)
+    parser = SeerAction()
+    action_space = parser.get_action_space("blue-0")
+    action_space.seed(0)
+
+    sim = RocketSimEngine()
+    initial_state = sim.create_base_state()
+    mutator.apply(initial_state, sim)
+    states = [sim.set_state(initial_state, {})]
+    for _ in range(40):
+        actions = {agent: action_space.sample() for agent in sim.agents}
+        states.append(sim.step(parser.parse_actions(actions, sim.state), {}))
+    return states
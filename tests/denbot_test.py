@@ -0,0 +1,123 @@
+import gymnasium as gym
+import numpy as np
+import pytest
+import torch
+from ray.rllib.core import Columns
+from ray.rllib.core.rl_module import RLModuleSpec
+
+from env.action_parser import SeerAction
+from env.denbot_obs import DenbotObs
+from env.denbot_reward import DenBotReward
+from nn.denbot import DenBot, unpack_mask
+
+REWARD_WEIGHTS = [DenBotReward(ball_touch=1).reward_weights.tolist(), DenBotReward(goal_scored=1, facing_ball=0.1).reward_weights.tolist()]
+
+
+def build_module(builder: DenbotObs, **model_config) -> DenBot:
+    spec = RLModuleSpec(
+        module_class=DenBot,
+        observation_space=builder.get_obs_space("blue-0"),
+        action_space=SeerAction().get_action_space("blue-0"),
+        model_config={"pi_hiddens": [32], "vf_hiddens": [32], "reward_weights": REWARD_WEIGHTS, **model_config},
+    )
+    return spec.build()
+
+
+def batch(obs: dict) -> dict:
+    return {
+        Columns.OBS: {key: torch.as_tensor(np.stack([agent_obs[key] for agent_obs in obs.values()])) for key in next(iter(obs.values()))}
+    }
+
+
+def test_unpack_mask():
+    masks = np.random.default_rng(0).integers(0, 2, (5, 22))
+    packed = torch.as_tensor(np.packbits(masks, axis=-1))
+    assert torch.equal(unpack_mask(packed, 22), torch.as_tensor(masks, dtype=torch.uint8))
+    unpacked = torch.as_tensor(masks)
+    assert unpack_mask(unpacked, 22) is unpacked
+
+
+def test_spec_without_reward_weights():
+    spec = RLModuleSpec(
+        module_class=DenBot,
+        observation_space=DenbotObs().get_obs_space("blue-0"),
+        action_space=SeerAction().get_action_space("blue-0"),
+        model_config={"pi_hiddens": [32], "vf_hiddens": [32]},
+    )
+    with pytest.raises(ValueError, match="rl_module_spec"):
+        spec.build()
+
+    # Checkpoints from before reward_id still have the per-step reward weights block
+    spec.observation_space = gym.spaces.Dict({**spec.observation_space.spaces, "rewards": gym.spaces.Box(-1, 1, (19,))})
+    with pytest.raises(ValueError, match="incompatible"):
+        spec.build()
+
+
+def test_compact_obs_forward(game_states):
+    full, compact = DenbotObs(num_reward_sets=2), DenbotObs(num_reward_sets=2, compact=True)
+    for builder in (full, compact):
+        builder.reset({"reward_id": 1})
+    # The training config's heads, so the float16 rounding goes through as many weights as it does in training
+    torch.manual_seed(0)
+    full_module = build_module(full, pi_hiddens=[1024, 1024], vf_hiddens=[1024, 1024])
+    compact_module = build_module(compact, pi_hiddens=[1024, 1024], vf_hiddens=[1024, 1024])
+    compact_module.load_state_dict(full_module.state_dict())
+
+    for state in game_states:
+        agents = list(state.cars)
+        full_batch, compact_batch = batch(full.build_obs(agents, state)), batch(compact.build_obs(agents, state))
+        with torch.no_grad():
+            full_logits = full_module.forward_inference(full_batch)[Columns.ACTION_DIST_INPUTS]
+            compact_logits = compact_module.forward_inference(compact_batch)[Columns.ACTION_DIST_INPUTS]
+            values = full_module.compute_values(full_batch), compact_module.compute_values(compact_batch)
+
+        # Same masked actions, and logits off by a thousandth of their spread, raw scalars like air time included
+        masked = full_logits == -1e10
+        assert torch.equal(masked, compact_logits == -1e10)
+        spread = full_logits[~masked].max() - full_logits[~masked].min()
+        assert (full_logits - compact_logits)[~masked].abs().max() < 1e-3 * spread
+        assert torch.allclose(*values, atol=1e-3 * spread)
+
+
+def _check_fused_inference(game_states, **model_config):
+    builder = DenbotObs(num_reward_sets=2)
+    builder.reset({"reward_id": 1})
+    plain, fused = build_module(builder), build_module(builder, **model_config)
+    assert fused.state_dict().keys() == plain.state_dict().keys()
+
+    state = game_states[-1]
+    obs_batch = batch(builder.build_obs(list(state.cars), state))
+    for _ in range(2):
+        with torch.no_grad():
+            expected = plain.forward_exploration(obs_batch)[Columns.ACTION_DIST_INPUTS]
+            expected_values = plain.compute_values(obs_batch)
+        # Weight syncs go through set_state, which refreshes the fused copy
+        fused.set_state(plain.get_state())
+        assert torch.allclose(fused.forward_exploration(obs_batch)[Columns.ACTION_DIST_INPUTS], expected, atol=1e-6)
+        assert torch.allclose(fused.forward_inference(obs_batch)[Columns.ACTION_DIST_INPUTS], expected, atol=1e-6)
+        logits, values = fused._inference_fn.logits_and_values(obs_batch[Columns.OBS])
+        assert torch.allclose(logits, expected, atol=1e-6)
+        assert torch.allclose(values, expected_values, atol=1e-6)
+        plain = build_module(builder)
+    return fused
+
+
+@pytest.mark.filterwarnings("error")
+def test_fused_inference(game_states):
+    # The default fused path never touches the deprecated torch.jit.script
+    fused = _check_fused_inference(game_states, fused_inference=True)
+    assert fused._inference_fn is fused.fused()
+
+
+@pytest.mark.filterwarnings("ignore:`torch.jit.script` is deprecated:FutureWarning")
+def test_script_inference(game_states, monkeypatch):
+    scripted = _check_fused_inference(game_states, script_inference=True)
+    assert isinstance(scripted._inference_fn, torch.jit.ScriptModule)
+
+    def unsupported(module):
+        raise RuntimeError("TorchScript is not supported")
+
+    monkeypatch.setattr(torch.jit, "script", unsupported)
+    with pytest.warns(UserWarning, match="running it eagerly"):
+        eager = _check_fused_inference(game_states, script_inference=True)
+    assert eager._inference_fn is eager.fused()
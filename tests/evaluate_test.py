@@ -0,0 +1,59 @@
+import threading
+
+import numpy as np
+import torch
+from omegaconf import OmegaConf
+from ray.rllib.core.rl_module import RLModuleSpec
+
+from env.components import reward_table
+from env.env import RLEnv
+from env.state_mutators.random import Random
+from env.terminal_condition import BallTouchTermination, TimeoutCondition
+from evaluate import run_episodes, summarize
+from nn.denbot import DenBot
+from nn.policy_server import PolicyServer
+
+
+def test_run_episodes_counts():
+    config = OmegaConf.create(
+        {
+            "envs": {
+                "solo": {
+                    "state_mutator": Random(),
+                    "rewards": {"ball_touch": 1},
+                    "termination_cond": BallTouchTermination(),
+                    "truncation_cond": TimeoutCondition(timeout_seconds=0.5),
+                }
+            },
+            "curriculum": {"tasks": [{"envs": ["solo"]}]},
+        },
+        flags={"allow_objects": True},
+    )
+    env = RLEnv(config)
+    torch.manual_seed(0)
+    module = RLModuleSpec(
+        module_class=DenBot,
+        observation_space=env.observation_spaces["blue-0"],
+        action_space=env.action_spaces["blue-0"],
+        model_config={"pi_hiddens": [16], "vf_hiddens": [16], "reward_weights": reward_table(config.envs).tolist()},
+    ).build()
+    server = PolicyServer(module, num_clients=1, explore=False).start()
+    counts = []
+
+    def play():
+        np.random.seed(0)
+        counts.extend(run_episodes(env, server.clients[0], 3) for _ in range(2))
+
+    thread = threading.Thread(target=play)
+    thread.start()
+    thread.join()
+    server.close()
+    env.close()
+
+    summary = summarize(counts)
+    assert summary["episodes"] == 6
+    # Every episode ends by a touch or the timeout, and the per-condition rates say which
+    assert summary["timeout"] == summary["truncated"].get("TimeoutCondition", 0)
+    assert summary["touch"] >= summary["terminated"].get("BallTouchTermination", 0)
+    assert summary["timeout"] + summary["terminated"].get("BallTouchTermination", 0) == 1
+    assert 0 < summary["mean_steps"] <= 0.5 * 120 / 8 + 1
@@ -0,0 +1,56 @@
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+import torch
+from ray.rllib.core.rl_module import RLModuleSpec
+
+from env.action_parser import SeerAction
+from env.denbot_obs import DenbotObs
+from env.denbot_reward import DenBotReward
+from nn.denbot import DenBot
+from nn.export import export_policy, load_exported
+from nn.policy_server import load_policy
+
+REWARD_WEIGHTS = [DenBotReward(ball_touch=1).reward_weights.tolist(), DenBotReward(goal_scored=1).reward_weights.tolist()]
+
+
+@pytest.fixture
+def module() -> DenBot:
+    torch.manual_seed(0)
+    return RLModuleSpec(
+        module_class=DenBot,
+        observation_space=DenbotObs(num_reward_sets=2).get_obs_space("blue-0"),
+        action_space=SeerAction().get_action_space("blue-0"),
+        model_config={"pi_hiddens": [32, 16], "vf_hiddens": [32], "reward_weights": REWARD_WEIGHTS},
+    ).build()
+
+
+@pytest.mark.parametrize("half", [False, True])
+def test_export_round_trip(module, game_states, tmp_path, half):
+    connector_state = {"mean_std": {"blue-0": {"mean": np.arange(3.0), "count": 7}}, "name": "dropped"}
+    path = export_policy(module, tmp_path / "policy.npz", half=half, connector_state=connector_state)
+    policy = load_policy(path)
+
+    builder = DenbotObs(num_reward_sets=2)
+    builder.reset({"reward_id": 1})
+    obs = builder.build_obs(list(game_states[0].cars), game_states[0])
+    blocks = {key: np.stack([agent_obs[key] for agent_obs in obs.values()]) for key in next(iter(obs.values()))}
+    expected = module.fused()({key: torch.as_tensor(value) for key, value in blocks.items()})
+    tolerance = 1e-2 if half else 1e-6
+    assert torch.allclose(policy.logits(blocks), expected, atol=tolerance)
+    assert list(policy.act(obs)) == list(obs)
+
+    assert np.array_equal(policy.nvec, module.action_space.nvec)
+    assert np.array_equal(policy.reward_weights, np.array(REWARD_WEIGHTS, dtype=np.float32))
+    assert policy.observation_space["reward_id"] == {"shape": [], "dtype": "int64", "n": 2}
+    assert np.array_equal(policy.observation_space["ball"]["low"], module.observation_space["ball"].low)
+    assert policy.connector_state == {"mean_std": {"blue-0": {"mean": pytest.approx(np.arange(3.0)), "count": 7}}}
+
+
+def test_loader_does_not_import_ray(module, tmp_path):
+    path = export_policy(module, tmp_path / "policy.npz")
+    code = f"import sys; from nn.export import load_exported; load_exported({str(path)!r}); print(any(m.startswith('ray') for m in sys.modules))"
+    assert subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout.strip() == "False"
+    assert load_exported(path).model.sizes == module.fused().sizes
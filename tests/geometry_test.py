@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+import rlgym.rocket_league.common_values as cv
+
+from env.geometry import (
+    BIG_PAD_INDICES,
+    BOOST_LOCATIONS,
+    BOOST_PAD_AMOUNTS,
+    GOAL_POSTS,
+    INVERTED_BOOST_LOCATIONS,
+    INVERTED_PAD_ORDER,
+    pad_distances,
+)
+
+
+def test_pad_amounts():
+    assert BOOST_PAD_AMOUNTS.shape == (len(cv.BOOST_LOCATIONS),)
+    assert np.all(BOOST_PAD_AMOUNTS[BIG_PAD_INDICES] == 100)
+    assert np.sum(BOOST_PAD_AMOUNTS == 12) == len(cv.BOOST_LOCATIONS) - len(BIG_PAD_INDICES)
+
+
+def test_inverted_pad_order():
+    assert np.allclose(INVERTED_BOOST_LOCATIONS, BOOST_LOCATIONS[INVERTED_PAD_ORDER], atol=2)
+
+
+@pytest.mark.parametrize("xy", [False, True])
+def test_pad_distances_match_norm(xy):
+    positions = np.random.default_rng(0).normal(scale=2000, size=(5, 3)).astype(np.float32)
+    dims = slice(0, 2) if xy else slice(None)
+    expected = np.stack([np.linalg.norm(BOOST_LOCATIONS[:, dims] - p[dims], axis=1) for p in positions])
+    assert np.array_equal(pad_distances(positions, xy=xy), expected)
+
+
+def test_constants_read_only():
+    with pytest.raises(ValueError):
+        GOAL_POSTS[0, 0] = 0
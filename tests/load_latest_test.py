@@ -0,0 +1,55 @@
+import time
+
+import torch
+from ray.rllib.core import COMPONENT_LEARNER, COMPONENT_LEARNER_GROUP, COMPONENT_RL_MODULE
+from ray.rllib.core.rl_module import RLModuleSpec
+
+from env.action_parser import SeerAction
+from env.denbot_obs import DenbotObs
+from env.denbot_reward import DenBotReward
+from load_latest import CheckpointWatcher, load_module_state
+from nn.denbot import DenBot
+from nn.policy_server import POLICY_ID
+from training.checkpoint_index import CheckpointIndex, checkpoint_entry
+
+
+def build_module(seed: int) -> DenBot:
+    torch.manual_seed(seed)
+    return RLModuleSpec(
+        module_class=DenBot,
+        observation_space=DenbotObs().get_obs_space("blue-0"),
+        action_space=SeerAction().get_action_space("blue-0"),
+        model_config={"pi_hiddens": [16], "vf_hiddens": [16], "reward_weights": [DenBotReward(ball_touch=1).reward_weights.tolist()]},
+    ).build()
+
+
+def save_checkpoint(index: CheckpointIndex, module: DenBot, number: int):
+    path = index.root / "denbot_1on0" / "trial" / f"checkpoint_{number:06d}"
+    module.save_to_path(path / COMPONENT_LEARNER_GROUP / COMPONENT_LEARNER / COMPONENT_RL_MODULE / POLICY_ID)
+    index.add(checkpoint_entry(index.root, path, {"training_iteration": number}))
+    return path
+
+
+def test_watcher_swaps_new_weights(tmp_path):
+    index = CheckpointIndex(tmp_path)
+    viewer = build_module(0)
+    first = save_checkpoint(index, viewer, 0).absolute()
+    fused = viewer.fused()
+    watcher = CheckpointWatcher(first, CheckpointIndex(tmp_path), interval=0.01).start()
+    time.sleep(0.05)
+    assert watcher.update(viewer) is None
+
+    trained = build_module(1)
+    second = save_checkpoint(index, trained, 1).absolute()
+    deadline = time.perf_counter() + 5
+    while (loaded := watcher.update(viewer)) is None and time.perf_counter() < deadline:
+        time.sleep(0.01)
+    watcher.close()
+
+    assert loaded == second
+    assert set(load_module_state(second)) == set(trained.state_dict())
+    # Same module and fused copy, with the new weights
+    assert viewer.fused() is fused
+    for name, value in trained.state_dict().items():
+        assert torch.equal(viewer.state_dict()[name], value)
+    assert torch.equal(fused.encoder.weight, trained.fused().encoder.weight)
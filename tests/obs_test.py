@@ -17,6 +17,74 @@ def default_car():
     return car
 
 
+def test_batch_obs_matches_agent_obs(game_states):
+    builder = obs.DenbotObs(num_reward_sets=3)
+    builder.reset({"reward_id": 2})
+
+    for state in game_states:
+        agents = list(state.cars.keys())
+        batch_obs = builder.build_obs(agents, state)
+        for agent in agents:
+            agent_obs = builder._build_agent_obs(agent, state)
+            for key, expected in agent_obs.items():
+                assert batch_obs[agent][key].dtype == expected.dtype, key
+                assert batch_obs[agent][key].shape == expected.shape, key
+                assert batch_obs[agent][key].tobytes() == expected.tobytes(), key
+
+
+def test_buffered_obs(game_states):
+    reference = obs.DenbotObs(num_reward_sets=3)
+    buffered = obs.DenbotObs(num_reward_sets=3, buffered=True)
+    copied = obs.DenbotObs(num_reward_sets=3, buffered=True, copy=True)
+    for builder in (reference, buffered, copied):
+        builder.reset({"reward_id": 1})
+
+    space = reference.get_obs_space("blue-0")
+    history = []
+    agents = list(game_states[0].cars.keys())
+    for state in game_states:
+        expected = reference.build_obs(agents, state)
+        views = buffered.build_obs(agents, state)
+        copies = copied.build_obs(agents, state)
+        history.append((expected, copies))
+        for agent in agents:
+            for key, subspace in space.items():
+                assert views[agent][key].dtype == subspace.dtype, key
+                assert np.array_equal(views[agent][key], expected[agent][key]), key
+                assert np.array_equal(copies[agent][key], expected[agent][key]), key
+
+    # Views are refilled in place, copies keep their step
+    assert buffered.build_obs(agents, game_states[0]) is views
+    for expected, copies in history:
+        for agent in agents:
+            assert np.array_equal(copies[agent]["agent"], expected[agent]["agent"])
+
+    # A new episode's reward_id reaches the views of the same agents
+    buffered.reset({"reward_id": 2})
+    views = buffered.build_obs(agents, game_states[0])
+    assert all(views[agent]["reward_id"] == 2 for agent in agents)
+
+
+def test_compact_obs(game_states):
+    full = obs.DenbotObs()
+    compact = obs.DenbotObs(compact=True)
+    buffered = obs.DenbotObs(buffered=True, compact=True)
+    for builder in (full, compact, buffered):
+        builder.reset({"reward_id": 0})
+
+    space = compact.get_obs_space("blue-0")
+    for state in game_states:
+        agents = list(state.cars.keys())
+        expected = full.build_obs(agents, state)
+        for built in (compact.build_obs(agents, state), buffered.build_obs(agents, state)):
+            for agent in agents:
+                assert space.contains(built[agent])
+                mask = np.unpackbits(built[agent]["mask"])[: obs.MASK_SIZE]
+                assert np.array_equal(mask, expected[agent]["mask"])
+                for key in ("pads", "ball", "agent"):
+                    assert np.array_equal(built[agent][key], expected[agent][key].astype(np.float16)), key
+
+
 @pytest.mark.parametrize(
     "v, expected",
     [
@@ -64,6 +132,23 @@ def test_pitch_angles(default_car, v, expected):
     assert np.isclose(encoders.planar_angle(ref, norm, np.array(v)), expected)
 
 
+def test_stacked_planar_angles():
+    rng = np.random.default_rng(0)
+    refs = rng.normal(size=(50, 3)).astype(np.float32)
+    normals = rng.normal(size=(50, 3)).astype(np.float32)
+    targets = rng.normal(size=(50, 3)).astype(np.float32)
+    # Degenerate rows hit each zero-norm fallback
+    normals[0] = 0
+    targets[1] = normals[1]
+    refs[2] = normals[2]
+
+    stacked = encoders.planar_angle(refs, normals, targets)
+    assert stacked.shape == (50,)
+    for ref, normal, target, angle in zip(refs, normals, targets, stacked):
+        assert angle == encoders.planar_angle(ref, normal, target)
+    assert np.all(stacked[:3] == 0)
+
+
 def test_fourier_encoder():
     x_min, x_max = -np.pi / 2, np.pi / 2
     x = np.linspace(-np.pi / 2, np.pi / 2, 5000)
@@ -0,0 +1,94 @@
+import threading
+
+import numpy as np
+import pytest
+import torch
+from ray.rllib.core import Columns
+from ray.rllib.core.rl_module import RLModuleSpec
+
+from env.action_parser import SeerAction
+from env.denbot_obs import DenbotObs
+from env.denbot_reward import DenBotReward
+from load_latest import action_sampler, sample_action
+from nn.denbot import DenBot
+from nn.policy_server import ActionSampler, PolicyServer
+
+NVEC = SeerAction().get_action_space("blue-0").nvec
+
+
+@pytest.fixture
+def module() -> DenBot:
+    torch.manual_seed(0)
+    return RLModuleSpec(
+        module_class=DenBot,
+        observation_space=DenbotObs().get_obs_space("blue-0"),
+        action_space=SeerAction().get_action_space("blue-0"),
+        model_config={"pi_hiddens": [32], "vf_hiddens": [32], "reward_weights": [DenBotReward(ball_touch=1).reward_weights.tolist()]},
+    ).build()
+
+
+def test_sampler_greedy_and_masked():
+    logits = torch.randn(64, int(NVEC.sum()))
+    sampler = ActionSampler(NVEC, seed=0)
+    greedy = sampler(logits, explore=False)
+    heads = torch.split(logits, list(NVEC), dim=-1)
+    assert torch.equal(greedy, torch.stack([head.argmax(-1) for head in heads], dim=-1))
+
+    # Masked logits are never sampled, the rest follow the softmax
+    logits = torch.zeros(20000, int(NVEC.sum()))
+    logits[:, 1] = -1e10
+    logits[:, 0] = np.log(3)
+    actions = sampler(logits).numpy()
+    assert np.all(actions < NVEC)
+    assert not np.any(actions[:, 0] == 1)
+    assert abs(np.mean(actions[:, 0] == 0) - 0.75) < 0.02
+
+
+def test_unseeded_samplers_differ():
+    logits = torch.zeros(8, int(NVEC.sum()))
+    sampler = ActionSampler(NVEC)
+    assert not torch.equal(sampler(logits), sampler(logits))
+    assert not torch.equal(ActionSampler(NVEC)(logits), ActionSampler(NVEC)(logits))
+    # sample_action keeps reusing one sampler rather than restarting its stream every step
+    space = SeerAction().get_action_space("blue-0")
+    assert action_sampler(tuple(NVEC.tolist())) is action_sampler(tuple(int(n) for n in space.nvec))
+    assert not torch.equal(torch.stack(sample_action(logits, space)), torch.stack(sample_action(logits, space)))
+
+
+def test_server_batches_clients(module, game_states):
+    builder = DenbotObs()
+    builder.reset({"reward_id": 0})
+    server = PolicyServer(module, num_clients=3, explore=False, max_wait=1).start()
+    states = game_states[:3]
+    results = {}
+
+    def play(client_id, state):
+        client = server.clients[client_id]
+        results[client_id] = client.act(builder.build_obs(list(state.cars), state))
+        client.close()
+
+    threads = [threading.Thread(target=play, args=(client_id, state)) for client_id, state in enumerate(states)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    server.close()
+
+    # Everyone arrived within max_wait, so one forward pass served them all
+    assert server.batches == 1
+    assert server.rows == sum(len(state.cars) for state in states)
+    for client_id, state in enumerate(states):
+        obs = builder.build_obs(list(state.cars), state)
+        batch = {key: torch.as_tensor(np.stack([agent_obs[key] for agent_obs in obs.values()])) for key in next(iter(obs.values()))}
+        expected = ActionSampler(NVEC)(module.forward_inference({Columns.OBS: batch})[Columns.ACTION_DIST_INPUTS], explore=False)
+        assert list(results[client_id]) == list(state.cars)
+        assert np.array_equal(np.stack(list(results[client_id].values())), expected.numpy())
+
+
+def test_server_errors_reach_clients(module):
+    server = PolicyServer(module, num_clients=1).start()
+    client = server.clients[0]
+    with pytest.raises(RuntimeError, match="Policy server failed"):
+        client.act({"blue-0": {"mask": np.ones(22)}})
+    client.close()
+    server.close()
@@ -0,0 +1,91 @@
+import copy
+import pickle
+
+import numpy as np
+import pytest
+
+from env.denbot_obs import DenbotObs
+from env.denbot_reward import APPLIED_TERMS, DenBotReward
+from env.step_cache import StepCache
+
+
+def _reference_rewards(reward_fn: DenBotReward, game_states) -> list[np.ndarray]:
+    reward_fn.reset({})
+    return [np.array([reward_fn.apply(agent, state) for agent in state.cars], dtype=np.float64) for state in game_states]
+
+
+def _batch_rewards(reward_fn: DenBotReward, game_states) -> list[tuple[np.ndarray, np.ndarray]]:
+    reward_fn.reset({})
+    return [reward_fn.apply_batch(list(state.cars), state) for state in game_states]
+
+
+@pytest.mark.parametrize("term", APPLIED_TERMS)
+def test_batch_term_matches_apply(term, game_states):
+    expected = _reference_rewards(DenBotReward(**{term: 0.7}), game_states)
+    batch = _batch_rewards(DenBotReward(**{term: 0.7}), game_states)
+    for want, (rewards, breakdown) in zip(expected, batch):
+        assert breakdown.shape == (len(want), 1)
+        # float64 BLAS dots can round differently depending on row alignment, so allow an ulp or so
+        np.testing.assert_allclose(rewards, want, rtol=1e-12)
+
+
+def test_batch_matches_apply(game_states):
+    weights = {term: i + 1 for i, term in enumerate(APPLIED_TERMS)}
+    expected = _reference_rewards(DenBotReward(**weights), game_states)
+    batch = _batch_rewards(DenBotReward(**weights), game_states)
+    for want, (rewards, breakdown) in zip(expected, batch):
+        assert breakdown.shape == (len(want), len(APPLIED_TERMS))
+        assert np.allclose(rewards, want)
+        assert np.allclose(breakdown.sum(axis=1), rewards)
+
+
+def test_zero_weight_terms_skipped():
+    reward_fn = DenBotReward(goal_scored=1, ball_touch=0.5, align_ball_goal=2)
+    assert reward_fn.terms == ("goal_scored", "ball_touch")
+    assert np.array_equal(reward_fn.term_weights, [1, 0.5])
+
+
+def test_batch_goal_scored(game_states):
+    state = game_states[-1]
+    state.goal_scored = True
+    reward_fn = DenBotReward(goal_scored=1)
+    expected = _reference_rewards(reward_fn, [state])[0]
+    rewards, _ = reward_fn.apply_batch(list(state.cars), state)
+    assert np.array_equal(rewards, expected)
+    assert np.sum(rewards == -1) == 3
+    assert np.all(rewards[rewards != -1] > 1)
+
+
+def test_episode_term_sums(game_states):
+    weights = {"ball_touch": 1, "facing_ball": 0.5, "boost_proximity": 0.1}
+    assert DenBotReward(**weights).episode_term_sums is None
+
+    reward_fn = DenBotReward(**weights, log_terms=True)
+    for _ in range(2):
+        reward_fn.reset({})
+        breakdowns = [reward_fn.apply_batch(list(state.cars), state)[1] for state in game_states]
+        assert np.allclose(reward_fn.episode_term_sums, np.sum(breakdowns, axis=(0, 1)))
+
+    # VectorRLEnv deepcopies the env config per arena, each copy keeps summing into its own array
+    for copied in (copy.deepcopy(reward_fn), pickle.loads(pickle.dumps(reward_fn))):
+        copied.reset({})
+        copied.apply_batch(list(game_states[0].cars), game_states[0])
+        assert np.allclose(copied.episode_term_sums, breakdowns[0].sum(axis=0))
+    assert np.allclose(reward_fn.episode_term_sums, np.sum(breakdowns, axis=(0, 1)))
+
+
+def test_shared_step_cache(game_states):
+    weights = {"facing_ball": 1, "distance_player_ball": 0.5, "velocity_player_to_ball": 0.1}
+    builder = DenbotObs()
+    shared, alone = DenBotReward(**weights), DenBotReward(**weights)
+    shared.reset({})
+    alone.reset({})
+    builder.reset({"reward_id": 0})
+    for state in game_states:
+        agents = list(state.cars)
+        cache = StepCache(agents, state)
+        builder.build_obs(agents, state, cache)
+        ball_vec_u = cache.ball_vec_u
+        rewards, _ = shared.apply_batch(agents, state, cache)
+        assert cache.ball_vec_u is ball_vec_u
+        assert np.array_equal(rewards, alone.apply_batch(agents, state)[0])
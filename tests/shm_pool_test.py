@@ -0,0 +1,53 @@
+import numpy as np
+
+from env.shm_pool import SharedMemoryPool
+from env.state_mutators.random import Random
+from env.terminal_condition import BallTouchTermination, TimeoutCondition
+from env.vector_env import VectorRLEnv
+
+CONFIG = {
+    "envs": {
+        "duel": {
+            "state_mutator": Random(blue_size=1, orange_size=1),
+            "rewards": {"ball_touch": 1, "facing_ball": 0.1, "boost_proximity": 0.05},
+            "termination_cond": BallTouchTermination(),
+            "truncation_cond": TimeoutCondition(timeout_seconds=0.5),
+        },
+    },
+    "curriculum": {"tasks": [{"envs": ["duel"]}]},
+}
+NUM_WORKERS = 2
+ARENAS = 2
+
+
+def _copy(out: dict[str, np.ndarray]) -> dict[str, np.ndarray]:
+    return {key: array.copy() for key, array in out.items()}
+
+
+def test_pool_matches_in_process_vector_envs():
+    rng = np.random.default_rng(0)
+    pool = SharedMemoryPool(CONFIG, num_workers=NUM_WORKERS, arenas_per_worker=ARENAS)
+    try:
+        outs = [_copy(pool.reset(seed=3))]
+        actions = rng.integers(0, [3, 5, 5, 3, 2, 2, 2], size=(12, *pool.actions.shape))
+        for step_actions in actions:
+            outs.append(_copy(pool.step(step_actions)))
+    finally:
+        pool.close()
+
+    # Each worker replays on its own, seeded the same way the pool seeds it
+    seeds = [int(child.generate_state(1)[0]) for child in np.random.SeedSequence(3).spawn(NUM_WORKERS)]
+    for worker, seed in enumerate(seeds):
+        np.random.seed(seed)
+        env = VectorRLEnv(CONFIG, ARENAS)
+        obs, _ = env.reset(seed=seed)
+        for step, out in enumerate(outs):
+            if step:
+                obs, rewards, _, truncated, info = env.step(actions[step - 1, worker, : len(env.rows)])
+                assert np.array_equal(out["reward"][worker, : len(env.rows)], rewards)
+                assert np.array_equal(out["truncated"][worker], truncated)
+                assert np.array_equal(out["reset"][worker], info["reset"])
+            n = len(env.rows)
+            assert np.all(out["valid"][worker, :n]) and not np.any(out["valid"][worker, n:])
+            for key, block in obs.items():
+                assert np.array_equal(out[key][worker, :n], block), key
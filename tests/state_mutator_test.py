@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+import rlgym.rocket_league.common_values as cv
+from rlgym.rocket_league.math import euler_to_rotation
+from rlgym.rocket_league.sim import RocketSimEngine
+
+from env.state_mutators.air_dribble import FieldAirDribble, WallAirDribble
+from env.state_mutators.airial import AirialState
+from env.state_mutators.ball_hunt import BallHunt, SpeedFlip
+from env.state_mutators.boost_gather import BoostGather
+from env.state_mutators.half_flip import HalfFlip
+from env.state_mutators.random import Random
+from env.state_mutators.shooting_drill import ShootingDrill
+from env.state_mutators.state_mutator import euler_rotations
+
+MUTATORS = {
+    "random": lambda: Random(blue_size=2, orange_size=1),
+    "airial": AirialState,
+    "ball_hunt": BallHunt,
+    "speed_flip": SpeedFlip,
+    "wall_air_dribble": WallAirDribble,
+    "field_air_dribble": FieldAirDribble,
+    "boost_gather": BoostGather,
+    "half_flip": HalfFlip,
+    "shooting": ShootingDrill,
+}
+
+
+@pytest.fixture(scope="module")
+def sim():
+    sim = RocketSimEngine()
+    yield sim
+    sim.close()
+
+
+@pytest.mark.parametrize("name", MUTATORS)
+@pytest.mark.parametrize("task", [0, 5])
+def test_sample_batch(name, task, sim):
+    mutator = MUTATORS[name]()
+    mutator.rng = np.random.default_rng(0)
+    records = mutator.sample_batch(200, task)
+    assert records.shape == (200,)
+    for field in records.dtype.names:
+        assert np.all(np.isfinite(records[field])), field
+
+    rotations = records["car_rotation"]
+    assert np.allclose(rotations @ np.swapaxes(rotations, -1, -2), np.eye(3))
+    assert np.allclose(np.linalg.det(rotations), 1)
+    assert np.all((records["car_boost"] >= 0) & (records["car_boost"] <= 100))
+    assert np.all(np.abs(records["ball_position"][:, 0]) < cv.SIDE_WALL_X)
+    assert np.all(np.abs(records["ball_position"][:, 1]) < cv.BACK_WALL_Y)
+
+    mutator.reset({"task": task})
+    initial_state = sim.create_base_state()
+    mutator.apply(initial_state, sim)
+    state = sim.set_state(initial_state, {})
+    assert [car.team_num for car in state.cars.values()] == records["car_team"][0].tolist()
+
+
+def test_sample_batch_is_seeded():
+    first, second = BallHunt(), BallHunt()
+    first.rng, second.rng = np.random.default_rng(1), np.random.default_rng(1)
+    assert np.array_equal(first.sample_batch(10, 3), second.sample_batch(10, 3))
+
+
+def test_teams_and_names(sim):
+    mutator = Random(blue_size=2, orange_size=2)
+    initial_state = sim.create_base_state()
+    mutator.apply(initial_state, sim)
+    assert list(initial_state.cars) == ["blue-0", "blue-1", "orange-0", "orange-1"]
+    assert [car.team_num for car in initial_state.cars.values()] == [cv.BLUE_TEAM] * 2 + [cv.ORANGE_TEAM] * 2
+
+
+def test_euler_rotations():
+    angles = np.random.default_rng(0).uniform(-2 * np.pi, 2 * np.pi, (20, 3))
+    rotations = euler_rotations(angles)
+    for pyr, rotation in zip(angles, rotations):
+        assert np.array_equal(rotation, euler_to_rotation(pyr))
+
+
+def test_curriculum_widens_ball_hunt():
+    mutator = BallHunt()
+    spread = [np.abs(mutator.sample_batch(500, task)["ball_position"][:, :2]).max(axis=0) for task in (1, 10)]
+    assert np.all(spread[0] < spread[1])
+    assert np.all(spread[0] <= [BallHunt.X_MAX / 10, BallHunt.Y_MAX / 10])
+
+
+def test_apply_indexes_a_batch(sim):
+    mutator = SpeedFlip()
+    mutator.rng = np.random.default_rng(2)
+    mutator.reset({"task": 3})
+    expected = mutator.sample_batch(SpeedFlip.APPLY_BATCH, 3)
+    # Reseeding drops whatever was drawn before
+    mutator.rng = np.random.default_rng(2)
+    for record in expected[:3]:
+        initial_state = sim.create_base_state()
+        mutator.apply(initial_state, sim)
+        assert np.array_equal(initial_state.ball.position, record["ball_position"])
+        assert np.array_equal(initial_state.cars["blue-0"].physics.rotation_mtx, record["car_rotation"][0])
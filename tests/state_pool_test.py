@@ -0,0 +1,29 @@
+import numpy as np
+from rlgym.rocket_league.sim import RocketSimEngine
+
+from env.state_mutators.ball_hunt import BallHunt
+from env.state_pool import StatePools
+
+
+def test_pools_match_sample_batch():
+    sim = RocketSimEngine()
+    mutator = BallHunt()
+    mutator.rng = np.random.default_rng(3)
+    expected = mutator.sample_batch(8, task=4)
+
+    pools = StatePools(size=8)
+    mutator.rng = np.random.default_rng(3)
+    # The first half of the pool is handed out before any refill is asked for
+    for record in expected[:4]:
+        state = sim.set_state(pools.take("ball_hunt", 4, mutator, sim), {})
+        assert list(state.cars) == ["blue-0"]
+        assert np.allclose(state.ball.position, record["ball_position"])
+        assert np.allclose(state.cars["blue-0"].physics.position, record["car_position"][0])
+        assert np.allclose(state.cars["blue-0"].physics.rotation_mtx, record["car_rotation"][0], atol=1e-6)
+
+    for _ in range(20):
+        pools.take("ball_hunt", 4, mutator, sim)
+    pools.take("ball_hunt", 5, mutator, sim)
+    assert list(pools.pools) == [("ball_hunt", 5)]
+    pools.close()
+    sim.close()
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from env.step_cache import StepCache
+from env.terminal_condition import (
+    AnyCondition,
+    BallMinHeight,
+    BallTouchTermination,
+    CarInFront,
+    CarMinHeight,
+    ConditionTree,
+    FullBoost,
+    GoalCondition,
+    MaxTouches,
+    NegativeY,
+    NoFlip,
+    NoTouchTimeoutCondition,
+    TimeoutCondition,
+)
+
+# Thresholds picked so most conditions flip somewhere within the fixture's few seconds
+CONDITIONS = {
+    "timeout": lambda: TimeoutCondition(timeout_seconds=2),
+    "no_touch_timeout": lambda: NoTouchTimeoutCondition(timeout_seconds=2),
+    "ball_touch": BallTouchTermination,
+    "car_in_front": lambda: CarInFront(buffer=0),
+    "no_flip": lambda: NoFlip(delay=0.1),
+    "ball_min_height": lambda: BallMinHeight(height=400, delay=1),
+    "car_min_height": lambda: CarMinHeight(height=100, delay=1),
+    "max_touches": lambda: MaxTouches(touches=0),
+    "full_boost": FullBoost,
+    "negative_y": NegativeY,
+    "goal": GoalCondition,
+}
+
+
+def _reference_dones(condition, game_states) -> np.ndarray:
+    condition.reset({})
+    return np.array([list(condition.is_done(list(state.cars), state).values()) for state in game_states])
+
+
+def _batch_dones(condition, game_states) -> np.ndarray:
+    condition.reset({})
+    return np.array([condition.done_batch(StepCache(list(state.cars), state)) for state in game_states])
+
+
+@pytest.mark.parametrize("name", CONDITIONS)
+def test_done_batch_matches_is_done(name, game_states):
+    expected = _reference_dones(CONDITIONS[name](), game_states)
+    dones = _batch_dones(CONDITIONS[name](), game_states)
+    assert dones.dtype == bool
+    assert np.array_equal(dones, expected)
+
+
+def test_done_batch_rows(game_states):
+    """A condition only sees its own rows of a cache stacked over several arenas"""
+    state = game_states[-1]
+    agents = list(state.cars)
+    cache = StepCache.from_arenas([agents[:2], agents], [state, state])
+    dones = CarInFront(buffer=0).done_batch(cache, slice(2, None))
+    assert np.array_equal(dones, list(CarInFront(buffer=0).is_done(agents, state).values()))
+
+
+def test_condition_tree(game_states):
+    tree = ConditionTree(AnyCondition([FullBoost(), AnyCondition([TimeoutCondition(1), FullBoost()]), MaxTouches(0)]))
+    assert tree.names == ["FullBoost", "TimeoutCondition", "FullBoost_1", "MaxTouches"]
+
+    tree.reset({})
+    agents = list(game_states[-1].cars)
+    for state in game_states:
+        dones = tree.evaluate(StepCache(agents, state))
+        assert np.array_equal(dones, list(tree.is_done(agents, state).values()))
+    # The timeout ends everyone, so the leaves after it are skipped
+    assert dones.all()
+    assert "TimeoutCondition" in tree.fired
+    assert "MaxTouches" not in tree.fired
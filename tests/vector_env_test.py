@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+
+from env.denbot_obs import DenbotObs
+from env.denbot_reward import DenBotReward
+from env.state_mutators.random import Random
+from env.terminal_condition import BallTouchTermination, TimeoutCondition
+from env.vector_env import VectorRLEnv
+
+REWARDS = {
+    "solo": {"ball_touch": 1, "facing_ball": 0.1, "boost_proximity": 0.05},
+    "duel": {"goal_scored": 1, "velocity_player_to_ball": 0.2, "boost_collect": 0.1},
+}
+
+
+@pytest.fixture
+def config():
+    return {
+        "envs": {
+            "solo": {
+                "state_mutator": Random(blue_size=1, orange_size=0),
+                "rewards": REWARDS["solo"],
+                "termination_cond": BallTouchTermination(),
+                "truncation_cond": TimeoutCondition(timeout_seconds=0.5),
+            },
+            "duel": {
+                "state_mutator": Random(blue_size=1, orange_size=1),
+                "rewards": REWARDS["duel"],
+                "termination_cond": BallTouchTermination(),
+                "truncation_cond": TimeoutCondition(timeout_seconds=1),
+            },
+        },
+        "curriculum": {"tasks": [{"envs": ["solo", "duel"]}]},
+    }
+
+
+def test_vector_env_matches_single_arena_passes(config):
+    np.random.seed(0)
+    vector_env = VectorRLEnv(config, num_arenas=4)
+    obs, info = vector_env.reset(seed=0)
+    action_space = vector_env.action_parser.get_action_space("blue-0")
+    action_space.seed(0)
+
+    def reference_reward(arena):
+        reward_fn = DenBotReward(**REWARDS[arena.shared_info["env"]])
+        reward_fn.reset({})
+        return reward_fn
+
+    builder = DenbotObs(num_reward_sets=len(vector_env.arenas[0].components))
+    reference_rewards = [reference_reward(arena) for arena in vector_env.arenas]
+    resets = 0
+    for _ in range(30):
+        actions = np.array([action_space.sample() for _ in vector_env.rows])
+        obs, rewards, terminated, truncated, info = vector_env.step(actions)
+        resets += info["reset"].sum()
+        assert len(rewards) == len(vector_env.rows)
+
+        for k, (arena, row) in enumerate(zip(vector_env.arenas, vector_env.arena_rows)):
+            builder.reset(arena.shared_info)
+            expected = builder.build_obs(arena.agents, arena.state)
+            for i, agent in enumerate(arena.agents):
+                for key, block in obs.items():
+                    assert np.array_equal(block[row][i], expected[agent][key]), key
+
+            if info["reset"][k]:
+                assert np.all(rewards[row] == 0)
+                reference_rewards[k] = reference_reward(arena)
+            else:
+                expected_rewards, _ = reference_rewards[k].apply_batch(arena.agents, arena.state)
+                assert np.array_equal(rewards[row], expected_rewards)
+        assert not np.any(vector_env.needs_reset != (terminated | truncated))
+    assert resets > 0
+
+
+def test_arenas_have_own_mutators(config):
+    vector_env = VectorRLEnv(config, num_arenas=3)
+    vector_env.reset(seed=1)
+    mutators = [arena.components["solo"].state_mutator for arena in vector_env.arenas]
+    assert len({id(mutator) for mutator in mutators}) == 3
+    ball_positions = {tuple(arena.state.ball.position) for arena in vector_env.arenas}
+    assert len(ball_positions) == 3
+
+
+def test_pipelined_matches_serial(config):
+    runs = []
+    for chunks in (1, 3):
+        np.random.seed(2)
+        vector_env = VectorRLEnv(config, num_arenas=4, pipeline_chunks=chunks)
+        obs, _ = vector_env.reset(seed=2)
+        action_space = vector_env.action_parser.get_action_space("blue-0")
+        action_space.seed(2)
+        steps = [obs]
+        for _ in range(30):
+            actions = np.array([action_space.sample() for _ in vector_env.rows])
+            steps.append(vector_env.step(actions))
+        vector_env.close()
+        runs.append(steps)
+
+    serial, pipelined = runs
+    for key, block in serial[0].items():
+        assert np.array_equal(block, pipelined[0][key]), key
+    for (obs, *results, info), (pipelined_obs, *pipelined_results, pipelined_info) in zip(serial[1:], pipelined[1:]):
+        for key, block in obs.items():
+            assert np.array_equal(block, pipelined_obs[key]), key
+        for result, pipelined_result in zip(results, pipelined_results):
+            assert np.array_equal(result, pipelined_result)
+        assert info["rows"] == pipelined_info["rows"]
+        assert np.array_equal(info["reset"], pipelined_info["reset"])
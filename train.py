@@ -9,6 +9,7 @@ from ray.tune import CheckpointConfig, RunConfig, TuneConfig, Tuner
 from ray.tune.experiment.trial import Trial
 
 from conf.build_config import build_exp_config
+from training.callbacks import CheckpointIndexCallback
 from training.stoppers import CurriculumStopper
 
 
@@ -21,18 +22,22 @@ def main(hydra_cfg: DictConfig):
     current_dir = pathlib.Path(__file__).parent.resolve()
 
     algo_config = build_exp_config(hydra_cfg.exp)
+    storage_path = os.path.join(current_dir, "ray_results")
+    num_to_keep = 5
+    metrics = [env_curriculum["metric"]["key"] for env_curriculum in algo_config.env_config["curriculum"]["envs"].values()]
     tuner = Tuner(
         algo_config.algo_class,
         param_space=algo_config,
         run_config=RunConfig(
             name="denbot_1on0",
-            storage_path=os.path.join(current_dir, "ray_results"),
+            storage_path=storage_path,
             checkpoint_config=CheckpointConfig(
-                num_to_keep=5,
+                num_to_keep=num_to_keep,
                 checkpoint_frequency=10,
                 checkpoint_at_end=True,
             ),
             stop=CurriculumStopper(),
+            callbacks=[CheckpointIndexCallback(storage_path, metrics, num_to_keep)],
         ),
         tune_config=TuneConfig(num_samples=1, trial_dirname_creator=dirname_fn),
     )
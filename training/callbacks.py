@@ -12,8 +12,15 @@ from ray.rllib.policy import Policy
 from ray.rllib.utils.metrics import ENV_RUNNER_RESULTS, EVALUATION_RESULTS
 from ray.rllib.utils.metrics.metrics_logger import MetricsLogger
 from ray.rllib.utils.typing import EpisodeType, PolicyID
+from ray.tune import Callback
+from ray.tune.experiment.trial import Trial
 
+from env.components import env_weights, plain_config
 from env.env import RLEnv
+from training.checkpoint_index import DEFAULT_METRICS, CheckpointIndex, checkpoint_entry
+
+# Smallest weight focus leaves an env with
+MIN_FOCUS_WEIGHT = 1e-3
 
 
 class EpisodeData(RLlibCallback):
@@ -31,6 +38,30 @@ class EpisodeData(RLlibCallback):
         policies: dict[PolicyID, Policy] | None = None,
         **kwargs,
     ) -> None:
+        # Reward terms of the episode that just ended, as per-agent returns
+        my_env: RLEnv = env.envs[env_index].env
+        if (term_sums := my_env.reward_fn.episode_term_sums) is not None:
+            term_returns = term_sums / len(my_env.agents)
+            metrics_logger.log_dict(
+                {my_env.shared_info["env"]: dict(zip(my_env.reward_fn.terms, term_returns.tolist()))},
+                key="reward_terms",
+                reduce="mean",
+                ema_coeff=0.2,
+            )
+
+        # How often each leaf condition was among the ones that ended the episode
+        metrics_logger.log_dict(
+            {
+                my_env.shared_info["env"]: {
+                    kind: {name: int(name in cond.fired) for name in cond.names}
+                    for kind, cond in (("terminated", my_env.termination_cond), ("truncated", my_env.truncation_cond))
+                }
+            },
+            key="done_conditions",
+            reduce="mean",
+            ema_coeff=0.2,
+        )
+
         # Hate this
         for env in env.envs:
             my_env: RLEnv = env.env
@@ -77,6 +108,12 @@ class EpisodeData(RLlibCallback):
 class CurriculumCallback(RLlibCallback):
     curriculum_config: dict[str, Any]
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        focus = self.curriculum_config.get("focus", 0)
+        if not 0 <= focus < 1:
+            raise ValueError(f"curriculum.focus must be in [0, 1), at 1 or more envs at their target would get no weight, got {focus}")
+
     def on_train_result(self, *, algorithm: Algorithm, metrics_logger: MetricsLogger | None = None, result: dict, **kwargs) -> None:
         meta_task = algorithm._counters["meta_task"]
         task_envs = self.curriculum_config["tasks"][meta_task]["envs"]
@@ -115,8 +152,37 @@ class CurriculumCallback(RLlibCallback):
             algorithm.env_runner_group.foreach_env_runner(func=_remote_fn)
             algorithm.eval_env_runner_group.foreach_env_runner(func=_remote_fn)
 
+        if self.curriculum_config.get("focus", 0):
+            weights = self._focus_weights(metrics_logger, meta_task)
+
+            def _remote_fn(env_runner):
+                for env in env_runner.env.envs:
+                    my_env: RLEnv = env.env
+                    my_env.set_env_weights(weights)
+
+            # Evaluation keeps the configured weights, its success metrics drive the focus
+            algorithm.env_runner_group.foreach_env_runner(func=_remote_fn)
+
         return super().on_train_result(algorithm=algorithm, metrics_logger=metrics_logger, result=result, **kwargs)
 
+    def _focus_weights(self, metrics_logger: MetricsLogger, meta_task: int) -> dict[str, float]:
+        """
+        The task's configured env weights, with a focus share of them moved toward the envs furthest below their
+        success metric target. Envs at their target keep 1 - focus of their weight so they are not forgotten.
+        """
+        focus = self.curriculum_config["focus"]
+        weights = env_weights(plain_config(self.curriculum_config["tasks"][meta_task]["envs"]))
+        for env, weight in weights.items():
+            # Envs without a curriculum have no success metric to focus on, they keep their configured weight
+            if (env_curriculum := self.curriculum_config["envs"].get(env)) is None:
+                continue
+            env_metric = env_curriculum["metric"]
+            metric = metrics_logger.peek((EVALUATION_RESULTS, ENV_RUNNER_RESULTS, env_metric["key"]), default=0) or 0
+            success = min(max(metric / env_metric["value"], 0), 1)
+            # Floored, so a task whose envs all reached their target still samples them
+            weights[env] = max(weight * (1 - focus * success), MIN_FOCUS_WEIGHT)
+        return weights
+
     def _should_promote(self, metrics_logger: MetricsLogger, env: str, env_curriculum: dict[str, Any]) -> bool:
         env_metric = env_curriculum["metric"]
         metric = metrics_logger.peek((EVALUATION_RESULTS, ENV_RUNNER_RESULTS, env_metric["key"]), default=0)
@@ -131,3 +197,18 @@ class CurriculumCallback(RLlibCallback):
             # print(f"{env} complete!")
             return True
         return False
+
+
+class CheckpointIndexCallback(Callback):
+    """
+    Tune callback adding every checkpoint a trial saves to the CheckpointIndex of ray_results, with the trial's
+    latest result, so tools can find checkpoints without scanning the directory tree.
+    """
+
+    def __init__(self, storage_path, metrics: list[str] | tuple[str, ...] = (), num_to_keep: int | None = None):
+        self.index = CheckpointIndex(storage_path)
+        self.metrics = (*DEFAULT_METRICS, *metrics)
+        self.num_to_keep = num_to_keep
+
+    def on_checkpoint(self, iteration: int, trials: list[Trial], trial: Trial, checkpoint, **info) -> None:
+        self.index.add(checkpoint_entry(self.index.root, checkpoint.path, trial.last_result, self.metrics), self.num_to_keep)
@@ -0,0 +1,133 @@
+"""Persistent index of the checkpoints under ray_results.
+
+Tools used to find checkpoints with a recursive glob of ray_results plus an mtime sort on every call, which takes
+seconds once a box has hundreds of trials. Instead, CheckpointIndexCallback adds every checkpoint Tune saves to
+ray_results/checkpoint_index.json, along with its trial, training iteration, mtime, env task levels and key metrics,
+and tools read the index. ``python -m training.checkpoint_index`` rebuilds it from a scan of ray_results, for trials
+trained before the index existed.
+"""
+
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any
+
+from ray.rllib.utils.metrics import ENV_RUNNER_RESULTS, EPISODE_LEN_MEAN, EPISODE_RETURN_MEAN, EVALUATION_RESULTS
+from ray.tune.result import TRAINING_ITERATION
+
+INDEX_FILE = "checkpoint_index.json"
+DEFAULT_METRICS = (EPISODE_RETURN_MEAN, EPISODE_LEN_MEAN)
+
+
+def checkpoint_entry(root: Path, path, result: dict | None = None, metrics: tuple[str, ...] = DEFAULT_METRICS) -> dict[str, Any]:
+    """
+    Index entry of the checkpoint at path, with what result says about it. Paths are relative to root, so the
+    tree can be moved. Task levels are the curriculum's {env}-env metrics and metrics are looked up in the
+    evaluation results first, as the curriculum does, then in the training ones.
+    """
+    path = Path(os.path.relpath(path, root))
+    result = result or {}
+    runner_results = [result.get(EVALUATION_RESULTS, {}).get(ENV_RUNNER_RESULTS, {}), result.get(ENV_RUNNER_RESULTS, {})]
+    tasks, values = {}, {}
+    for results in reversed(runner_results):
+        tasks.update({key.removesuffix("-env"): value for key, value in results.items() if key.endswith("-env")})
+        values.update({key: results[key] for key in metrics if isinstance(results.get(key), int | float)})
+    return {
+        "trial": str(path.parent),
+        "path": str(path),
+        "iteration": result.get(TRAINING_ITERATION),
+        "mtime": (root / path).stat().st_mtime,
+        "tasks": tasks,
+        "metrics": values,
+    }
+
+
+class CheckpointIndex:
+    """
+    The checkpoint index of a ray_results directory. Reads reload the index file only when its mtime changed, so
+    dashboards can ask on every interaction. Writes replace the file atomically, readers never see half of one.
+    """
+
+    def __init__(self, root="ray_results"):
+        self.root = Path(root)
+        self.file = self.root / INDEX_FILE
+        self._entries: list[dict[str, Any]] = []
+        self._mtime: float | None = None
+
+    @property
+    def entries(self) -> list[dict[str, Any]]:
+        """Every indexed checkpoint, newest first. Rebuilt from a scan if there is no index yet."""
+        try:
+            mtime = self.file.stat().st_mtime
+        except FileNotFoundError:
+            if not self.root.is_dir():
+                return []
+            return self.rebuild()
+        if mtime != self._mtime:
+            self._entries = json.loads(self.file.read_text())["checkpoints"]
+            self._mtime = mtime
+        return self._entries
+
+    def add(self, entry: dict[str, Any], num_to_keep: int | None = None) -> None:
+        """
+        Index a new checkpoint. Entries whose directory is gone are dropped, and so are all but the num_to_keep
+        newest of the entry's trial, since Tune deletes those right after its checkpoint callbacks run.
+        """
+        entries = [entry] + [e for e in self.entries if e["path"] != entry["path"] and (self.root / e["path"]).is_dir()]
+        if num_to_keep is not None:
+            trial = [e for e in entries if e["trial"] == entry["trial"]]
+            stale = {e["path"] for e in trial[num_to_keep:]}
+            entries = [e for e in entries if e["path"] not in stale]
+        self._write(entries)
+
+    def rebuild(self) -> list[dict[str, Any]]:
+        """
+        Index every checkpoint directory under root from a scan. Checkpoints already indexed keep their entries,
+        the others have no iteration, task levels or metrics.
+        """
+        known = {entry["path"]: entry for entry in json.loads(self.file.read_text())["checkpoints"]} if self.file.exists() else {}
+        paths = [path for path in self.root.glob("*/*/checkpoint_*") if path.is_dir()]
+        self._write([known.get(os.path.relpath(path, self.root)) or checkpoint_entry(self.root, path) for path in paths])
+        return self._entries
+
+    def trials(self) -> list[Path]:
+        """Trial directories with checkpoints, most recently checkpointed first"""
+        return [self.root / trial for trial in dict.fromkeys(entry["trial"] for entry in self.entries)]
+
+    def checkpoints(self, trial=None) -> list[Path]:
+        """Checkpoint directories, of one trial directory or all of them, newest first"""
+        entries = self.entries
+        if trial is not None:
+            trial = os.path.relpath(trial, self.root)
+            entries = [entry for entry in entries if entry["trial"] == trial]
+        return [self.root / entry["path"] for entry in entries]
+
+    def latest(self) -> Path:
+        if not (checkpoints := self.checkpoints()):
+            raise FileNotFoundError(f"No checkpoints under {self.root}")
+        return checkpoints[0]
+
+    def _write(self, entries: list[dict[str, Any]]) -> None:
+        entries = sorted(entries, key=lambda entry: entry["mtime"], reverse=True)
+        tmp = self.file.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({"updated": time.time(), "checkpoints": entries}, indent=1))
+        tmp.replace(self.file)
+        self._entries = entries
+        self._mtime = self.file.stat().st_mtime
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("root", nargs="?", default="ray_results")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = CheckpointIndex(args.root)
+    entries = index.rebuild()
+    print(f"Indexed {len(entries)} checkpoints of {len(index.trials())} trials in {time.perf_counter() - start:.2f}s to {index.file}")
+
+
+if __name__ == "__main__":
+    main()